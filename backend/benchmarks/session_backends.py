@@ -0,0 +1,87 @@
+"""Compare ops/sec of the file and SQLite session backends.
+
+Run from the backend directory: ``python benchmarks/session_backends.py --sessions 5000``.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for path in (BACKEND_DIR, BACKEND_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from liedetect.utils.session_backends import FileSessionBackend, SessionBackend, SqliteSessionBackend  # noqa: E402
+
+
+def _payload(session_id: str) -> Dict[str, object]:
+    return {
+        'sessionId': session_id,
+        'media': {'answerer': {'key': f'sessions/{session_id}/answerer.mp4', 'bucket': None, 'localPath': None, 'contentType': 'video/mp4'}},
+        'summary': {'lieProbability': 0.42, 'comparisonVector': [0.125] * 8},
+        'transcript': 'lorem ipsum ' * 40
+    }
+
+
+def _rate(count: int, fn: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - started)
+
+
+def bench(backend: SessionBackend, sessions: int, batch: int) -> Dict[str, float]:
+    ids = [f'bench-{idx}' for idx in range(sessions)]
+
+    def put_each() -> None:
+        for session_id in ids:
+            backend.put(session_id, _payload(session_id))
+
+    def get_each() -> None:
+        for session_id in ids:
+            backend.get(session_id)
+
+    def update_each() -> None:
+        for session_id in ids:
+            backend.update_fields(session_id, {'llmVector': {'calm': 0.5}})
+
+    def get_batched() -> None:
+        for start in range(0, sessions, batch):
+            backend.get_many(ids[start:start + batch])
+
+    def put_batched() -> None:
+        for start in range(0, sessions, batch):
+            backend.put_many({session_id: _payload(session_id) for session_id in ids[start:start + batch]})
+
+    return {
+        'put': _rate(sessions, put_each),
+        'get': _rate(sessions, get_each),
+        'update_field': _rate(sessions, update_each),
+        'get_many': _rate(sessions, get_batched),
+        'put_many': _rate(sessions, put_batched),
+        'scan_ids': _rate(sessions, lambda: sum(1 for _ in backend.iter_ids()))
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backends = {
+            'file': FileSessionBackend(Path(tmpdir) / 'meta'),
+            'sqlite': SqliteSessionBackend(Path(tmpdir) / 'sessions.db')
+        }
+        results = {name: bench(backend, args.sessions, args.batch) for name, backend in backends.items()}
+        for backend in backends.values():
+            backend.close()
+
+    print(f"{'op':<14}" + ''.join(f'{name:>14}' for name in results))
+    for op in results['file']:
+        print(f'{op:<14}' + ''.join(f'{results[name][op]:>12.0f}/s' for name in results))
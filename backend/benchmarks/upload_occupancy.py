@@ -0,0 +1,129 @@
+"""Load test: Flask worker occupancy for proxied vs presigned direct-to-S3 uploads.
+
+Runs against moto's in-process S3 stand-in. For each mode, ``--clients`` threads
+upload ``--size-mb`` each; the script reports the time spent inside Flask
+handlers (worker-seconds) and the peak number of handlers busy at once.
+
+Run from the backend directory: ``python benchmarks/upload_occupancy.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for path in (BACKEND_DIR, BACKEND_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+
+import boto3  # noqa: E402
+import requests  # noqa: E402
+from flask import g  # noqa: E402
+from moto import mock_s3  # noqa: E402
+
+from liedetect import create_app  # noqa: E402
+from liedetect.config import settings  # noqa: E402
+from liedetect.routes import media  # noqa: E402
+from liedetect.services import storage  # noqa: E402
+from liedetect.services.storage import StorageService  # noqa: E402
+from liedetect.utils.session_backends import FileSessionBackend  # noqa: E402
+from liedetect.utils.session_store import SessionStore  # noqa: E402
+
+BUCKET = 'liedetect-bench'
+
+
+class Occupancy:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.peak = 0
+        self.worker_seconds = 0.0
+
+    def enter(self) -> None:
+        with self._lock:
+            self.busy += 1
+            self.peak = max(self.peak, self.busy)
+
+    def leave(self, elapsed: float) -> None:
+        with self._lock:
+            self.busy -= 1
+            self.worker_seconds += elapsed
+
+
+def _instrumented_client(occupancy: Occupancy):
+    app = create_app()
+
+    @app.before_request
+    def start_timer():
+        occupancy.enter()
+        g.started = time.perf_counter()
+
+    @app.teardown_request
+    def stop_timer(_exc):
+        occupancy.leave(time.perf_counter() - g.started)
+
+    return app.test_client()
+
+
+def proxied_upload(client, session_id: str, body: bytes) -> None:
+    response = client.put(f'/upload/{session_id}/answerer', data=body, content_type='video/mp4')
+    assert response.status_code == 201, response.get_json()
+
+
+def presigned_upload(client, session_id: str, body: bytes) -> None:
+    presigned = client.post('/upload/presign', json={'sessionId': session_id, 'sizeBytes': len(body)}).get_json()
+    parts = []
+    for part in presigned['parts']:
+        start = (part['partNumber'] - 1) * presigned['partSize']
+        response = requests.put(part['url'], data=body[start:start + presigned['partSize']])
+        response.raise_for_status()
+        parts.append({'partNumber': part['partNumber'], 'etag': response.headers['ETag']})
+    response = client.post('/upload/complete', json={'sessionId': session_id, 'uploadId': presigned['uploadId'], 'parts': parts})
+    assert response.status_code == 201, response.get_json()
+
+
+def run(mode: str, clients: int, size_mb: int) -> Dict[str, float]:
+    occupancy = Occupancy()
+    client = _instrumented_client(occupancy)
+    body = os.urandom(size_mb * 1024 * 1024)
+    upload = proxied_upload if mode == 'proxied' else presigned_upload
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(lambda idx: upload(client, f'{mode}-{idx}', body), range(clients)))
+    wall = time.perf_counter() - started
+    return {
+        'wall_s': wall,
+        'worker_s': occupancy.worker_seconds,
+        'worker_s_per_upload': occupancy.worker_seconds / clients,
+        'peak_busy_workers': occupancy.peak
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--size-mb', type=int, default=32)
+    args = parser.parse_args()
+
+    settings.s3_bucket = BUCKET
+    settings.use_mock_services = False
+    with tempfile.TemporaryDirectory() as tmpdir, mock_s3():
+        boto3.client('s3', region_name=settings.aws_region).create_bucket(Bucket=BUCKET)
+        storage.session_store = SessionStore(FileSessionBackend(Path(tmpdir)), flush_interval_s=0)
+        media.storage_service = StorageService()
+        results = {mode: run(mode, args.clients, args.size_mb) for mode in ('proxied', 'presigned')}
+
+    print(f"{'mode':<12}{'wall s':>10}{'worker s':>12}{'worker s/upload':>18}{'peak busy':>12}")
+    for mode, row in results.items():
+        print(f"{mode:<12}{row['wall_s']:>10.2f}{row['worker_s']:>12.2f}{row['worker_s_per_upload']:>18.3f}{row['peak_busy_workers']:>12}")
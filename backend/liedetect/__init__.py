@@ -6,6 +6,8 @@ import os
 from .config import settings
 from .routes.media import media_bp
 from .routes.inference import inference_bp
+from .services.jobs import job_runner
+from .utils.metrics import metrics
 
 
 logger = logging.getLogger("liedetect")
@@ -19,10 +21,18 @@ def create_app() -> Flask:
 
     app.register_blueprint(media_bp)
     app.register_blueprint(inference_bp)
+    if settings.jobs_enabled:
+        # Worker threads need a long-lived process; on Lambda requests run the work inline.
+        job_runner.start()
+        metrics.register('jobs', job_runner.stats)
 
     @app.get("/health")
     def health_check():
         return {"status": "ok", "environment": settings.env}
 
+    @app.get("/metrics")
+    def metrics_snapshot():
+        return metrics.snapshot()
+
     logger.info("LieDetect backend initialized", extra={"env": settings.env})
     return app
@@ -14,10 +14,44 @@ class Settings:
     macro_endpoint: Optional[str] = os.getenv("MACRO_MODEL_ENDPOINT")
     micro_endpoint: Optional[str] = os.getenv("MICRO_MODEL_ENDPOINT")
     whisper_model: str = os.getenv("WHISPER_MODEL", "whisper-1")
+    whisper_timeout_s: float = float(os.getenv("WHISPER_TIMEOUT_S", "300"))
+    whisper_workers: int = int(os.getenv("WHISPER_WORKERS", "4"))
+    whisper_segment_s: float = float(os.getenv("WHISPER_SEGMENT_S", "120"))
+    whisper_max_segment_s: float = float(os.getenv("WHISPER_MAX_SEGMENT_S", "300"))
+    whisper_overlap_s: float = float(os.getenv("WHISPER_OVERLAP_S", "1.0"))
+    whisper_silence_db: float = float(os.getenv("WHISPER_SILENCE_DB", "-35"))
+    whisper_min_silence_s: float = float(os.getenv("WHISPER_MIN_SILENCE_S", "0.4"))
+    llm_memo_db_path: Path = field(default_factory=lambda: Path(os.getenv("LLM_MEMO_DB_PATH", os.path.join(os.getenv("LOCAL_MEDIA_ROOT", "storage"), "llm_memo.db"))))
+    llm_memo_ttl_s: float = float(os.getenv("LLM_MEMO_TTL_S", str(7 * 24 * 3600)))
+    llm_memo_max_entries: int = int(os.getenv("LLM_MEMO_MAX_ENTRIES", "10000"))
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+    http_pool_size: int = int(os.getenv("HTTP_POOL_SIZE", "16"))
+    http_max_concurrency: int = int(os.getenv("HTTP_MAX_CONCURRENCY", "8"))
+    http_timeout_s: float = float(os.getenv("HTTP_TIMEOUT_S", "60"))
+    http_max_retries: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    http_backoff_s: float = float(os.getenv("HTTP_BACKOFF_S", "0.5"))
+    http_backoff_max_s: float = float(os.getenv("HTTP_BACKOFF_MAX_S", "8"))
     allowed_origins_raw: str = os.getenv("ALLOWED_ORIGINS", "")
     local_media_root: Path = field(default_factory=lambda: Path(os.getenv("LOCAL_MEDIA_ROOT", "storage")))
     max_upload_mb: int = int(os.getenv("MAX_UPLOAD_MB", "500"))
     use_mock_services: bool = os.getenv("USE_MOCK_SERVICES", "false").lower() == "true"
+    upload_part_mb: int = int(os.getenv("UPLOAD_PART_MB", "8"))
+    upload_concurrency: int = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+    presign_expiry_s: int = int(os.getenv("PRESIGN_EXPIRY_S", "3600"))
+    media_cache_mb: int = int(os.getenv("MEDIA_CACHE_MB", "2048"))
+    analysis_fan_out: bool = os.getenv("ANALYSIS_FAN_OUT", "true").lower() == "true"
+    analysis_max_workers: int = int(os.getenv("ANALYSIS_MAX_WORKERS", "3"))
+    endpoint_timeout_s: float = float(os.getenv("ENDPOINT_TIMEOUT_S", "30"))
+    session_backend: str = os.getenv("SESSION_BACKEND", "file")
+    session_db_path: Path = field(default_factory=lambda: Path(os.getenv("SESSION_DB_PATH", os.path.join(os.getenv("LOCAL_MEDIA_ROOT", "storage"), "sessions.db"))))
+    session_cache_size: int = int(os.getenv("SESSION_CACHE_SIZE", "0"))
+    session_flush_interval_s: float = float(os.getenv("SESSION_FLUSH_INTERVAL_S", "0"))
+    jobs_enabled: bool = os.getenv("JOBS_ENABLED", "false").lower() == "true"
+    job_db_path: Path = field(default_factory=lambda: Path(os.getenv("JOB_DB_PATH", os.path.join(os.getenv("LOCAL_MEDIA_ROOT", "storage"), "jobs.db"))))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_lease_s: float = float(os.getenv("JOB_LEASE_S", "60"))
+    job_poll_interval_s: float = float(os.getenv("JOB_POLL_INTERVAL_S", "0.5"))
+    job_wait_max_s: float = float(os.getenv("JOB_WAIT_MAX_S", "30"))
 
     @property
     def allowed_origins(self) -> List[str]:
@@ -1,75 +1,114 @@
 from __future__ import annotations
 
+import json
 from http import HTTPStatus
+from typing import Any, Dict, Optional
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 
-from ..services.analysis import analysis_service
-from ..services.lie_llm import lie_llm_service
-from ..services.vector_math import final_lie_score, llm_alignment_score
-from ..services.whisper import whisper_service
-from ..utils.session_store import session_store
+from ..config import settings
+from ..services.jobs import iter_liedetect, job_queue, job_runner, job_view
 
 inference_bp = Blueprint('inference', __name__)
 
+STREAM_TYPES = ('text/event-stream', 'application/x-ndjson')
+
 
 @inference_bp.post('/liedetect')
 def run_liedetect():
+    return _submit('liedetect')
+
+
+@inference_bp.post('/transcript')
+def transcript():
+    return _submit('transcript')
+
+
+@inference_bp.get('/jobs/<job_id>')
+def get_job(job_id: str):
+    # Long-poll: ?wait=<seconds> holds the request until the job finishes (or, with ?version=<n>,
+    # until it changes past that version, e.g. a new partial result), capped at JOB_WAIT_MAX_S.
+    if not settings.jobs_enabled:
+        return jsonify({'error': 'Background jobs are disabled'}), HTTPStatus.NOT_FOUND
+    try:
+        wait_s = min(float(request.args.get('wait', 0)), settings.job_wait_max_s)
+        version = request.args.get('version', type=int)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number'}), HTTPStatus.BAD_REQUEST
+
+    job = job_queue.wait(job_id, wait_s, version) if wait_s > 0 else job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': f'Unknown job: {job_id}'}), HTTPStatus.NOT_FOUND
+    return jsonify(job_view(job))
+
+
+def _submit(kind: str):
     payload = request.get_json(silent=True) or {}
     session_id = payload.get('sessionId')
     if not session_id:
         return jsonify({'error': 'sessionId is required'}), HTTPStatus.BAD_REQUEST
+    if not settings.jobs_enabled:
+        stream_type = _stream_type() if kind == 'liedetect' else None
+        return _stream_inline(session_id, stream_type) if stream_type else _run_inline(kind, session_id)
 
     try:
-        summary = analysis_service.run(session_id)
-        current_app.logger.info('liedetect-run', extra={'session_id': session_id})
+        job, created = job_runner.submit(kind, session_id)
     except ValueError as exc:
-        current_app.logger.warning('liedetect-error', extra={'session_id': session_id, 'error': str(exc)})
+        current_app.logger.warning(f'{kind}-error', extra={'session_id': session_id, 'error': str(exc)})
         return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
 
-    response = {'sessionId': session_id, 'summary': summary}
-    return jsonify(response)
+    current_app.logger.info(f'{kind}-submitted', extra={'session_id': session_id, 'job_id': job['jobId'], 'queued': created})
+    response = jsonify(job_view(job))
+    response.headers['Location'] = f"/jobs/{job['jobId']}"
+    return response, HTTPStatus.ACCEPTED if job['status'] not in ('succeeded', 'failed') else HTTPStatus.OK
 
 
-@inference_bp.post('/transcript')
-def transcript():
-    payload = request.get_json(silent=True) or {}
-    session_id = payload.get('sessionId')
-    if not session_id:
-        return jsonify({'error': 'sessionId is required'}), HTTPStatus.BAD_REQUEST
+def _run_inline(kind: str, session_id: str):
+    # Synchronous mode (the default, and what Lambda runs): do the work inside the request and
+    # return the handler's result directly, with the status codes these endpoints used before
+    # jobs existed. Any transcription failure is a 400; for liedetect a bad session is a 400, all
+    # endpoints failing is a 502 and anything else reaches the 500 handler.
+    try:
+        result = job_runner.run_inline(kind, session_id)
+    except Exception as exc:
+        if kind != 'transcript' and not isinstance(exc, (ValueError, RuntimeError)):
+            raise
+        current_app.logger.warning(f'{kind}-error', extra={'session_id': session_id, 'error': str(exc)})
+        status = HTTPStatus.BAD_GATEWAY if kind == 'liedetect' and isinstance(exc, RuntimeError) else HTTPStatus.BAD_REQUEST
+        return jsonify({'error': str(exc)}), status
+    current_app.logger.info(f'{kind}-run', extra={'session_id': session_id})
+    return jsonify(result)
 
-    session = session_store.get(session_id)
-    if session and session.get('transcript'):
-        enriched = _maybe_enrich_summary(session_id, session['transcript'])
-        return jsonify({'sessionId': session_id, 'transcript': session['transcript'], 'summary': enriched})
 
+def _stream_type() -> Optional[str]:
+    best = request.accept_mimetypes.best_match(('application/json', *STREAM_TYPES))
+    return best if best in STREAM_TYPES else None
+
+
+def _stream_inline(session_id: str, stream_type: str):
+    # Inline liedetect for clients that ask for a stream: one `endpoint` event per model as it
+    # lands, `vector` once audio and macro are combined, then a terminal `summary` (or `error`).
+    # POST, so nothing reconnects and re-runs the analysis; with jobs enabled, poll the job's
+    # partial result instead.
     try:
-        transcript_text = whisper_service.transcribe(session_id)
-        current_app.logger.info('transcript-generated', extra={'session_id': session_id})
-    except Exception as exc:
-        # Return a client-friendly error and avoid hanging the request
-        current_app.logger.warning('transcript-error', extra={'session_id': session_id, 'error': str(exc)})
+        events = iter_liedetect(session_id)
+    except ValueError as exc:
+        current_app.logger.warning('liedetect-error', extra={'session_id': session_id, 'error': str(exc)})
         return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
 
-    enriched_summary = _maybe_enrich_summary(session_id, transcript_text)
-    return jsonify({'sessionId': session_id, 'transcript': transcript_text, 'summary': enriched_summary})
-
+    def generate():
+        try:
+            for event, data in events:
+                yield _encode_event(stream_type, event, data)
+        except RuntimeError as exc:
+            current_app.logger.warning('liedetect-error', extra={'session_id': session_id, 'error': str(exc)})
+            yield _encode_event(stream_type, 'error', {'error': str(exc)})
 
-def _maybe_enrich_summary(session_id: str, transcript_text: str):
-    session = session_store.get(session_id)
-    summary = (session or {}).get('summary')
-    if not summary:
-        return summary
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate()), mimetype=stream_type, headers=headers)
 
-    llm_vector = lie_llm_service.emotion_weights(transcript_text, session_id)
-    alignment = llm_alignment_score(summary.get('comparisonVector', []), llm_vector)
-    final_score = final_lie_score(summary.get('microScore', 0.0), alignment)
 
-    summary.update({
-        'llmVector': llm_vector,
-        'alignmentScore': alignment,
-        'lieProbability': final_score
-    })
-    session_store.set_summary(session_id, summary)
-    current_app.logger.info('summary-updated', extra={'session_id': session_id, 'alignment': alignment, 'lieProbability': final_score})
-    return summary
+def _encode_event(stream_type: str, event: str, data: Dict[str, Any]) -> str:
+    if stream_type == 'text/event-stream':
+        return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    return json.dumps({'event': event, 'data': data}, separators=(',', ':')) + '\n'
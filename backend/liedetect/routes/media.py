@@ -35,6 +35,75 @@ def upload_media():
     return jsonify(response), HTTPStatus.CREATED
 
 
+@media_bp.put('/upload/<session_id>/<role>')
+def stream_media(session_id: str, role: str):
+    # Read the raw body straight from the WSGI stream; touching request.form/files would spool it first.
+    role = role.lower()
+    try:
+        record = storage_service.save_media_stream(session_id, role, request.stream, request.mimetype or 'video/mp4')
+        current_app.logger.info('media-stream-upload', extra={'session_id': session_id, 'role': role, 'key': record.key})
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
+
+    response = {
+        'sessionId': session_id,
+        'role': role,
+        'videoKey': record.key,
+        'bucket': record.bucket,
+        'contentType': record.content_type,
+        'sha256': record.sha256
+    }
+    return jsonify(response), HTTPStatus.CREATED
+
+
+@media_bp.post('/upload/presign')
+def presign_upload():
+    payload = request.get_json(silent=True) or {}
+    session_id = payload.get('sessionId')
+    role = (payload.get('role') or 'answerer').lower()
+    try:
+        size_bytes = int(payload.get('sizeBytes') or 0)
+        upload = storage_service.create_presigned_upload(session_id, role, size_bytes, payload.get('contentType') or 'video/mp4')
+        current_app.logger.info('media-presign', extra={'session_id': session_id, 'role': role, 'parts': len(upload['parts'])})
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
+
+    return jsonify({'sessionId': session_id, 'role': role, **upload}), HTTPStatus.CREATED
+
+
+@media_bp.post('/upload/complete')
+def complete_upload():
+    payload = request.get_json(silent=True) or {}
+    session_id = payload.get('sessionId')
+    role = (payload.get('role') or 'answerer').lower()
+    try:
+        record = storage_service.complete_presigned_upload(session_id, role, payload.get('uploadId'), payload.get('parts') or [])
+        current_app.logger.info('media-upload', extra={'session_id': session_id, 'role': role, 'key': record.key})
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
+
+    response = {
+        'sessionId': session_id,
+        'role': role,
+        'videoKey': record.key,
+        'bucket': record.bucket,
+        'contentType': record.content_type
+    }
+    return jsonify(response), HTTPStatus.CREATED
+
+
+@media_bp.post('/upload/abort')
+def abort_upload():
+    payload = request.get_json(silent=True) or {}
+    session_id = payload.get('sessionId')
+    role = (payload.get('role') or 'answerer').lower()
+    try:
+        storage_service.abort_presigned_upload(session_id, role, payload.get('uploadId'))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), HTTPStatus.BAD_REQUEST
+    return jsonify({'sessionId': session_id, 'role': role, 'aborted': True})
+
+
 @media_bp.get('/session/<session_id>')
 def get_session(session_id: str):
     payload = session_store.get(session_id)
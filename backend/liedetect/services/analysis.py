@@ -1,15 +1,51 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from ..config import settings
+from ..utils.metrics import metrics
 from ..utils.session_store import session_store
 from .sage_maker import sagemaker_gateway
-from .vector_math import average_vectors, fuse_lie_scores
+from .vector_math import FUSION_WEIGHTS, average_vectors, fuse_lie_scores
+
+logger = logging.getLogger(__name__)
+
+EndpointOutcome = Tuple[Dict[str, object], float, Optional[str]]
+AnalysisEvent = Tuple[str, Dict[str, object]]
 
 
 class AnalysisService:
+    def __init__(
+        self,
+        fan_out: bool = settings.analysis_fan_out,
+        max_workers: int = settings.analysis_max_workers,
+        timeout_s: float = settings.endpoint_timeout_s
+    ) -> None:
+        self._fan_out = fan_out
+        self._max_workers = max(max_workers, 1)
+        self._timeout_s = timeout_s
+
     def run(self, session_id: str) -> Dict[str, object]:
+        summary: Dict[str, object] = {}
+        for event, data in self.stream(session_id):
+            if event == 'summary':
+                summary = data
+        return summary
+
+    def stream(self, session_id: str) -> Iterator[AnalysisEvent]:
+        """Yield ``(event, data)`` pairs as the analysis progresses.
+
+        One ``endpoint`` event per model as it completes (fastest first), a ``vector`` event once
+        the audio and macro emotion vectors can be combined, then the fused ``summary``, which is
+        also persisted. Session validation happens here, before the first event is requested.
+        """
+        payload = self._payload(session_id)
+        return self._stream(session_id, payload)
+
+    def _payload(self, session_id: str) -> Dict[str, object]:
         session = session_store.get(session_id)
         if not session:
             raise ValueError(f"Unknown session: {session_id}")
@@ -19,25 +55,58 @@ class AnalysisService:
         if not media_record:
             raise ValueError("Session has no uploaded media")
 
-        payload = {
+        return {
             'sessionId': session_id,
             'videoKey': media_record.get('key'),
             'bucket': media_record.get('bucket'),
             'role': 'answerer' if media.get('answerer') else 'questioner'
         }
 
-        audio_result = self._invoke_endpoint(settings.audio_endpoint, payload)
-        macro_result = self._invoke_endpoint(settings.macro_endpoint, payload)
-        micro_result = self._invoke_endpoint(settings.micro_endpoint, payload)
+    def _stream(self, session_id: str, payload: Dict[str, object]) -> Iterator[AnalysisEvent]:
+        started = time.perf_counter()
+        endpoints = {
+            'audio': settings.audio_endpoint,
+            'macro': settings.macro_endpoint,
+            'micro': settings.micro_endpoint
+        }
+        outcomes: Dict[str, EndpointOutcome] = {}
+        for name, outcome in self._iter_endpoints(endpoints, payload):
+            if not outcomes:
+                metrics.observe('analysis.first_result', (time.perf_counter() - started) * 1000)
+            outcomes[name] = outcome
+            result, latency_ms, error = outcome
+            event: Dict[str, object] = {
+                'name': name,
+                'lieScore': result.get('lie_score', 0.0),
+                'emotionVector': result.get('emotion_vector', []),
+                'latencyMs': latency_ms
+            }
+            if error:
+                event['error'] = error
+            yield 'endpoint', event
+            if name in ('audio', 'macro') and 'audio' in outcomes and 'macro' in outcomes:
+                yield 'vector', {'comparisonVector': self._combined_vector(outcomes)}
+
+        failures = {name: error for name, (_, _, error) in outcomes.items() if error}
+        configured = [name for name, endpoint in endpoints.items() if endpoint]
+        if configured and all(name in failures for name in configured):
+            raise RuntimeError(f"All model endpoints failed: {failures}")
+
+        audio_result = outcomes['audio'][0]
+        macro_result = outcomes['macro'][0]
+        micro_result = outcomes['micro'][0]
+        latencies = {name: outcomes[name][1] for name in endpoints}
 
         audio_vector = audio_result.get('emotion_vector', []) or [0.0] * 8
         macro_vector = macro_result.get('emotion_vector', []) or [0.0] * 8
-        combined_vector = average_vectors([audio_vector, macro_vector])
+        combined_vector = self._combined_vector(outcomes)
 
+        # A failed branch has no score, not a score of zero: fuse over the branches that answered.
         lie_probability = fuse_lie_scores(
             audio_result.get('lie_score', 0.0),
             macro_result.get('lie_score', 0.0),
-            micro_result.get('lie_score', 0.0)
+            micro_result.get('lie_score', 0.0),
+            weights=[0.0 if name in failures else weight for name, weight in zip(endpoints, FUSION_WEIGHTS)]
         )
 
         summary = {
@@ -47,15 +116,79 @@ class AnalysisService:
             'microScore': micro_result.get('lie_score', 0.0),
             'comparisonVector': combined_vector,
             'audioVector': audio_vector,
-            'macroVector': macro_vector
+            'macroVector': macro_vector,
+            'latencyMs': latencies,
+            'criticalPath': max(latencies, key=latencies.get)
         }
+        if failures:
+            summary['failedEndpoints'] = failures
         session_store.set_summary(session_id, summary)
-        return summary
+        metrics.observe('analysis.total', (time.perf_counter() - started) * 1000)
+        yield 'summary', summary
+
+    @staticmethod
+    def _combined_vector(outcomes: Dict[str, EndpointOutcome]) -> List[float]:
+        vectors = [
+            outcomes[name][0].get('emotion_vector', []) or [0.0] * 8
+            for name in ('audio', 'macro') if not outcomes[name][2]
+        ]
+        return average_vectors(vectors)
+
+    def _iter_endpoints(self, endpoints: Dict[str, str | None], payload: Dict[str, object]) -> Iterator[Tuple[str, EndpointOutcome]]:
+        if not self._fan_out:
+            for name, endpoint in endpoints.items():
+                yield name, self._timed_invoke(endpoint, payload)
+            return
+
+        # Fan out so the slowest model, not the sum of all three, sets the wall-clock time, and
+        # hand each result on as soon as it lands. The pool belongs to this request, so other
+        # requests' calls (or stuck ones) never queue ahead of ours, and each branch's deadline
+        # starts when it starts running rather than when it was submitted.
+        executor = ThreadPoolExecutor(max_workers=min(self._max_workers, len(endpoints)), thread_name_prefix='liedetect-endpoint')
+        started: Dict[str, float] = {}
+        pending: Dict[Future, str] = {
+            executor.submit(self._run_branch, name, endpoint, payload, started): name
+            for name, endpoint in endpoints.items()
+        }
+        try:
+            while pending:
+                deadlines = [started[name] + self._timeout_s for name in pending.values() if name in started]
+                timeout = max(min(deadlines) - time.monotonic(), 0.0) if deadlines else self._timeout_s
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+                now = time.monotonic()
+                for future, name in list(pending.items()):
+                    if name in started and now - started[name] >= self._timeout_s:
+                        del pending[future]
+                        logger.warning('endpoint-timeout', extra={'branch': name, 'timeout_s': self._timeout_s})
+                        yield name, (self._empty_result(), round(self._timeout_s * 1000, 1), f"timed out after {self._timeout_s}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_branch(self, name: str, endpoint_name: str | None, payload: Dict[str, object], started: Dict[str, float]) -> EndpointOutcome:
+        started[name] = time.monotonic()
+        return self._timed_invoke(endpoint_name, payload)
+
+    def _timed_invoke(self, endpoint_name: str | None, payload: Dict[str, object]) -> EndpointOutcome:
+        started = time.perf_counter()
+        try:
+            result = self._invoke_endpoint(endpoint_name, payload)
+            error = None
+        except Exception as exc:
+            logger.warning('endpoint-error', extra={'endpoint': endpoint_name, 'error': str(exc)})
+            result, error = self._empty_result(), str(exc)
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        return result, latency_ms, error
 
     def _invoke_endpoint(self, endpoint_name: str | None, payload: Dict[str, object]) -> Dict[str, object]:
         if not endpoint_name:
-            return {'lie_score': 0.0, 'emotion_vector': []}
+            return self._empty_result()
         return sagemaker_gateway.invoke(endpoint_name, payload)
 
+    @staticmethod
+    def _empty_result() -> Dict[str, object]:
+        return {'lie_score': 0.0, 'emotion_vector': []}
+
 
 analysis_service = AnalysisService()
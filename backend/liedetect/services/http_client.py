@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import settings
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClient:
+    """Shared outbound HTTP client for third-party APIs.
+
+    One ``requests.Session`` keeps keep-alive connections pooled across threads. Every call
+    has an overall deadline, retries connection errors and 429/5xx responses with full-jitter
+    exponential backoff (honouring ``Retry-After`` in full), and waits on a semaphore so at most
+    ``max_concurrency`` requests are in flight. Latency, retries and errors are reported to
+    the metrics registry under ``http.<name>``.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        max_concurrency: int = 8,
+        timeout_s: float = 60.0,
+        max_retries: int = 3,
+        backoff_s: float = 0.5,
+        backoff_max_s: float = 8.0
+    ) -> None:
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.max_concurrency = max(max_concurrency, 1)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def post(self, url: str, name: str = 'default', **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, name=name, **kwargs)
+
+    def request(self, method: str, url: str, name: str = 'default', timeout_s: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures until ``timeout_s`` (total) runs out.
+
+        Returns the final response, which may still carry a retryable status once retries or
+        time are exhausted; the caller decides whether to ``raise_for_status``. Raises
+        ``requests.Timeout`` when no attempt could be made in time, or the last connection
+        error.
+        """
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        rewind = _file_positions(kwargs.get('files'))
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+                    raise requests.Timeout(f'{method} {url}: deadline exceeded')
+                try:
+                    with self._lock:
+                        self._in_flight += 1
+                    for handle, position in rewind:
+                        handle.seek(position)
+                    response: Optional[requests.Response] = self._session.request(
+                        method, url, timeout=max(deadline - time.monotonic(), 0.001), **kwargs
+                    )
+                    error: Optional[Exception] = None
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    response, error = None, exc
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+                    self._slots.release()
+
+                if error is None and response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self._backoff(attempt, response)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    if error is not None:
+                        raise error
+                    return response
+                attempt += 1
+                metrics.incr(f'http.{name}.retries')
+                logger.info('Retrying %s %s in %.2fs (attempt %d): %s', method, url, delay, attempt, error or response.status_code)
+                if response is not None:
+                    response.close()
+                time.sleep(delay)
+        except Exception:
+            metrics.incr(f'http.{name}.errors')
+            raise
+        finally:
+            metrics.incr(f'http.{name}.requests')
+            metrics.observe(f'http.{name}', (time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'inFlight': self._in_flight, 'maxConcurrency': self.max_concurrency}
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        # Retry-After is the server's floor, not a hint: it is not capped, and when it outlasts the
+        # deadline ``request`` hands back the response rather than retrying early.
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_s * 2 ** attempt))
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def _file_positions(files: Any) -> List[tuple]:
+    # Multipart bodies are read during an attempt; remember where each stream started so retries resend it whole.
+    if not files:
+        return []
+    values = files.values() if isinstance(files, dict) else [item[1] for item in files]
+    positions = []
+    for value in values:
+        handle = value[1] if isinstance(value, (tuple, list)) else value
+        if hasattr(handle, 'seek') and hasattr(handle, 'tell'):
+            positions.append((handle, handle.tell()))
+    return positions
+
+
+http_client = HttpClient(
+    pool_size=settings.http_pool_size,
+    max_concurrency=settings.http_max_concurrency,
+    timeout_s=settings.http_timeout_s,
+    max_retries=settings.http_max_retries,
+    backoff_s=settings.http_backoff_s,
+    backoff_max_s=settings.http_backoff_max_s
+)
+metrics.register('httpClient', http_client.stats)
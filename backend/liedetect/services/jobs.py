@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.job_queue import JobQueue
+from ..utils.metrics import metrics
+from ..utils.session_store import session_store
+from .analysis import AnalysisEvent, analysis_service
+from .lie_llm import lie_llm_service
+from .vector_math import final_lie_score, llm_alignment_score
+from .whisper import whisper_service
+
+logger = logging.getLogger(__name__)
+
+# report(stage, progress, partial=None): ``partial`` is the JSON result so far, served with the job.
+Reporter = Callable[..., None]
+JobHandler = Callable[[str, Reporter], Dict[str, Any]]
+
+
+def enrich_summary(session_id: str, transcript_text: str) -> Optional[Dict[str, Any]]:
+    """Fold the LieLLM reading of ``transcript_text`` into the session's stored summary, if there is one."""
+    session = session_store.get(session_id)
+    summary = (session or {}).get('summary')
+    if not summary:
+        return summary
+
+    llm_vector = lie_llm_service.emotion_weights(transcript_text, session_id)
+    alignment = llm_alignment_score(summary.get('comparisonVector', []), llm_vector)
+    final_score = final_lie_score(summary.get('microScore', 0.0), alignment)
+
+    summary.update({
+        'llmVector': llm_vector,
+        'alignmentScore': alignment,
+        'lieProbability': final_score
+    })
+    session_store.set_summary(session_id, summary)
+    logger.info('summary-updated', extra={'session_id': session_id, 'alignment': alignment, 'lieProbability': final_score})
+    return summary
+
+
+def iter_liedetect(session_id: str) -> Iterator[AnalysisEvent]:
+    """``analysis_service.stream`` events with the final ``summary`` enriched by any stored transcript.
+
+    The session is validated before this returns, so a bad session raises ``ValueError`` here
+    rather than from the first ``next``.
+    """
+    session_store.invalidate(session_id)
+    events = analysis_service.stream(session_id)
+
+    def enriched() -> Iterator[AnalysisEvent]:
+        for event, data in events:
+            if event == 'summary':
+                transcript_text = (session_store.get(session_id) or {}).get('transcript')
+                if transcript_text:
+                    # The transcript may have landed first; fold its LLM reading in now rather than never.
+                    data = enrich_summary(session_id, transcript_text) or data
+            yield event, data
+
+    return enriched()
+
+
+def run_liedetect(session_id: str, report: Reporter) -> Dict[str, Any]:
+    report('analysing', 0.1)
+    summary: Dict[str, Any] = {}
+    partial: Dict[str, Any] = {'endpoints': {}}
+    for event, data in iter_liedetect(session_id):
+        # Each model's score (and the combined vector) is published on the job as it lands, so
+        # long-polling clients can show it before the fused summary exists.
+        if event == 'endpoint':
+            partial['endpoints'][data['name']] = data
+            report(f"{data['name']}-scored", 0.1 + 0.2 * len(partial['endpoints']), partial)
+        elif event == 'vector':
+            partial['comparisonVector'] = data['comparisonVector']
+            report('vector-combined', 0.1 + 0.2 * len(partial['endpoints']), partial)
+        elif event == 'summary':
+            summary = data
+    return {'sessionId': session_id, 'summary': summary}
+
+
+def run_transcript(session_id: str, report: Reporter) -> Dict[str, Any]:
+    transcript_text = (session_store.get(session_id) or {}).get('transcript')
+    if not transcript_text:
+        report('transcribing', 0.1)
+        transcript_text = whisper_service.transcribe(session_id)
+    report('enriching', 0.8)
+    summary = enrich_summary(session_id, transcript_text)
+    return {'sessionId': session_id, 'transcript': transcript_text, 'summary': summary}
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    'liedetect': run_liedetect,
+    'transcript': run_transcript
+}
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """``job`` as served to clients.
+
+    A finished job's summary and transcript are read live from the session rather than from
+    the stored result: a later job (transcript enrichment after analysis, say) may have
+    updated them since, and resubmitting the earlier job must not hand back the old values.
+    """
+    if job['status'] != 'succeeded' or not job['result']:
+        return job
+    session_store.invalidate(job['sessionId'])
+    session = session_store.get(job['sessionId']) or {}
+    result = dict(job['result'])
+    for field in ('summary', 'transcript'):
+        if field in result and session.get(field) is not None:
+            result[field] = session[field]
+    return {**job, 'result': result}
+
+
+def media_fingerprint(session_id: str) -> str:
+    """Digest of the session's media records; a re-upload changes it and so warrants a fresh job."""
+    session = session_store.get(session_id)
+    if not session:
+        raise ValueError(f"Unknown session: {session_id}")
+    media = session.get('media') or {}
+    if not media:
+        raise ValueError("Session has no uploaded media")
+    return hashlib.sha256(json.dumps(media, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+class JobRunner:
+    """Worker threads executing queued jobs, with per-kind handlers.
+
+    Each worker claims one job at a time, reports progress through the queue and stores the
+    handler's JSON result. A heartbeat thread renews the lease of running jobs every third
+    of ``lease_s`` so other processes do not reclaim them. With jobs disabled the same
+    handlers run inline through ``run_inline``.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        workers: int = settings.job_workers,
+        lease_s: float = settings.job_lease_s
+    ) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.lease_s = lease_s
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._running: Dict[str, str] = {}
+
+    def submit(self, kind: str, session_id: str) -> Tuple[Dict[str, Any], bool]:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job, created = self.queue.submit(kind, session_id, media_fingerprint(session_id))
+        metrics.incr(f'jobs.{kind}.submitted' if created else f'jobs.{kind}.deduplicated')
+        return job, created
+
+    def run_inline(self, kind: str, session_id: str) -> Dict[str, Any]:
+        """Execute ``kind`` on the calling thread without queueing it and return its result."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        session_store.invalidate(session_id)
+        started = time.perf_counter()
+        try:
+            return self.handlers[kind](session_id, lambda stage, progress, partial=None: None)
+        finally:
+            metrics.observe(f'jobs.{kind}', (time.perf_counter() - started) * 1000)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+                for index in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        self.queue.wake()
+        for thread in self._threads:
+            thread.join(timeout_s)
+        self._threads = []
+
+    def run_once(self) -> bool:
+        """Claim and execute one job on the calling thread; returns False when the queue is empty."""
+        job = self.queue.claim(self.lease_s)
+        if job is None:
+            return False
+        self._execute(job)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            busy = len(self._running)
+        return {**self.queue.stats(), 'workers': self.workers, 'busy': busy}
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.run_once():
+                    self.queue.wait_for_change(self.queue.poll_interval_s)
+            except Exception:
+                logger.exception('job-worker-error')
+                self._stop.wait(self.queue.poll_interval_s)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease_s / 3):
+            with self._lock:
+                job_ids = list(self._running)
+            self.queue.touch(job_ids)
+
+    def _execute(self, job: Dict[str, Any]) -> None:
+        job_id, kind, session_id = job['jobId'], job['kind'], job['sessionId']
+        with self._lock:
+            self._running[job_id] = kind
+        metrics.observe(f'jobs.{kind}.queued', max(time.time() - job['createdAt'], 0.0) * 1000)
+        started = time.perf_counter()
+        try:
+            # The job may have been queued by another process; do not trust cached session state.
+            session_store.invalidate(session_id)
+            result = self.handlers[kind](
+                session_id, lambda stage, progress, partial=None: self.queue.report(job_id, stage, progress, partial)
+            )
+            self.queue.succeed(job_id, result)
+            logger.info('job-succeeded', extra={'job_id': job_id, 'kind': kind, 'session_id': session_id})
+        except Exception as exc:
+            metrics.incr(f'jobs.{kind}.failed')
+            logger.warning('job-failed', extra={'job_id': job_id, 'kind': kind, 'session_id': session_id, 'error': str(exc)})
+            self.queue.fail(job_id, str(exc))
+        finally:
+            metrics.observe(f'jobs.{kind}', (time.perf_counter() - started) * 1000)
+            with self._lock:
+                self._running.pop(job_id, None)
+
+
+job_queue = JobQueue(settings.job_db_path, poll_interval_s=settings.job_poll_interval_s)
+job_runner = JobRunner(job_queue, HANDLERS)
@@ -1,43 +1,71 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import time
 from typing import Dict
 
-import requests
-
 from ..config import settings
+from ..utils.memo_cache import MemoCache
+from ..utils.metrics import metrics
 from ..utils.session_store import session_store
+from .http_client import http_client
+
+SYSTEM_PROMPT = (
+    "You analyze transcripts for deceptive cues. Return a JSON object with emotion weights "
+    "for angry, calm, disgust, fearful, happy, neutral, sad, surprised between 0 and 1."
+)
+# Bump whenever SYSTEM_PROMPT or response parsing changes so memoised weights are not reused.
+PROMPT_VERSION = 1
 
 
 class LieLLMService:
-    def __init__(self) -> None:
+    def __init__(self, memo: MemoCache | None = None) -> None:
         self._api_key = os.getenv('OPENAI_API_KEY')
         self._model = os.getenv('LIE_LLM_MODEL', 'gpt-4o-mini')
+        self._memo = memo or MemoCache(settings.llm_memo_db_path, settings.llm_memo_ttl_s, settings.llm_memo_max_entries)
 
     def emotion_weights(self, transcript: str, session_id: str) -> Dict[str, float]:
         if settings.use_mock_services or not self._api_key:
             weights = self._mock_weights()
         else:
-            weights = self._invoke_openai(transcript)
+            weights = self._memoised_weights(transcript)
         session_store.set_llm_vector(session_id, weights)
         return weights
 
+    def memo_key(self, transcript: str) -> str:
+        transcript_hash = hashlib.sha256(transcript.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{self._model}:{PROMPT_VERSION}:{transcript_hash}".encode('utf-8')).hexdigest()
+
+    def _memoised_weights(self, transcript: str) -> Dict[str, float]:
+        key = self.memo_key(transcript)
+        weights = self._memo.get(key)
+        if weights is not None:
+            metrics.incr('llm.memo.hits')
+            return weights
+        started = time.perf_counter()
+        weights = self._invoke_openai(transcript)
+        cost_ms = (time.perf_counter() - started) * 1000
+        metrics.observe('llm.openai', cost_ms)
+        self._memo.put(key, weights, cost_ms)
+        return weights
+
+    def memo_stats(self) -> Dict[str, object]:
+        return self._memo.stats()
+
     def _invoke_openai(self, transcript: str) -> Dict[str, float]:
-        prompt = (
-            "You analyze transcripts for deceptive cues. Return a JSON object with emotion weights "
-            "for angry, calm, disgust, fearful, happy, neutral, sad, surprised between 0 and 1."
-        )
         payload = {
             'model': self._model,
             'messages': [
-                {'role': 'system', 'content': prompt},
+                {'role': 'system', 'content': SYSTEM_PROMPT},
                 {'role': 'user', 'content': transcript}
             ],
             'response_format': {'type': 'json_object'}
         }
-        response = requests.post(
-            'https://api.openai.com/v1/chat/completions',
+        response = http_client.post(
+            f'{settings.openai_base_url}/chat/completions',
+            name='openai.chat',
             headers={'Authorization': f'Bearer {self._api_key}', 'Content-Type': 'application/json'},
             data=json.dumps(payload)
         )
@@ -60,3 +88,4 @@ class LieLLMService:
 
 
 lie_llm_service = LieLLMService()
+metrics.register('llmMemo', lie_llm_service.memo_stats)
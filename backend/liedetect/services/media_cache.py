@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Iterator
+
+from ..config import settings
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCache:
+    """Content-addressed, byte-bounded LRU of media downloaded from S3.
+
+    Entries are keyed by bucket/key/ETag, so a re-uploaded object gets a fresh entry.
+    Concurrent requests for the same entry share a single download, and entries in use
+    are pinned against eviction.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._pins: Dict[str, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        existing = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    stat = entry.stat()
+                    existing.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(existing):
+            self._entries[name] = size
+            self._bytes += size
+        self._evict()
+
+    @staticmethod
+    def entry_name(bucket: str, key: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{bucket}/{key}/{etag}".encode('utf-8')).hexdigest()
+        return digest + PurePosixPath(key).suffix
+
+    @contextmanager
+    def lease(self, bucket: str, key: str, etag: str, download: Callable[[Path], None]) -> Iterator[Path]:
+        """Yield the cached file for ``bucket/key@etag``, downloading it on a miss.
+
+        The entry is pinned until the block exits, so eviction triggered by other callers
+        never removes a file that is still being read.
+        """
+        name = self._acquire(bucket, key, etag, download)
+        try:
+            yield self.root / name
+        finally:
+            with self._lock:
+                self._pins[name] -= 1
+                if not self._pins[name]:
+                    del self._pins[name]
+                self._evict()
+
+    def _acquire(self, bucket: str, key: str, etag: str, download: Callable[[Path], None]) -> str:
+        name = self.entry_name(bucket, key, etag)
+        path = self.root / name
+        waited = False
+        while True:
+            with self._lock:
+                if name in self._entries and path.exists():
+                    self._entries.move_to_end(name)
+                    self._hits += 0 if waited else 1
+                    self._pins[name] = self._pins.get(name, 0) + 1
+                    os.utime(path)
+                    return name
+                future = self._inflight.get(name)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self._inflight[name] = future
+                    self._misses += 1
+                else:
+                    self._coalesced += 1
+
+            if not owner:
+                # Wait for the shared download, then pin it through the hit path above.
+                future.result()
+                waited = True
+                continue
+
+            tmp_path = self.root / f".{name}.{threading.get_ident()}.part"
+            try:
+                download(tmp_path)
+                os.replace(tmp_path, path)
+                size = path.stat().st_size
+                with self._lock:
+                    self._bytes += size - self._entries.pop(name, 0)
+                    self._entries[name] = size
+                    self._pins[name] = self._pins.get(name, 0) + 1
+                    self._evict()
+                future.set_result(path)
+                return name
+            except BaseException as exc:
+                future.set_exception(exc)
+                raise
+            finally:
+                tmp_path.unlink(missing_ok=True)
+                with self._lock:
+                    self._inflight.pop(name, None)
+
+    def _evict(self) -> None:
+        # Pinned entries are skipped; the budget is enforced again when they are released.
+        for name in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            if name in self._pins:
+                continue
+            size = self._entries.pop(name)
+            self._bytes -= size
+            self._evictions += 1
+            try:
+                (self.root / name).unlink()
+            except FileNotFoundError:
+                pass
+            logger.info('media-cache-evict', extra={'entry': name, 'bytes': size})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'pinned': len(self._pins),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes
+            }
+
+
+media_cache = MediaCache(settings.local_media_root / 'cache', settings.media_cache_mb * 1024 * 1024)
+metrics.register('mediaCache', media_cache.stats)
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+import hashlib
+import math
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
 
 import boto3
+from botocore.exceptions import ClientError
 from werkzeug.datastructures import FileStorage
 
 from ..config import settings
 from ..utils.session_store import MediaRecord, session_store
+from .media_cache import MediaCache, media_cache
+
+STREAM_CHUNK_BYTES = 1024 * 1024
+S3_MIN_PART_MB = 5
+S3_MAX_PARTS = 10000
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    chunks: List[bytes] = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(min(remaining, STREAM_CHUNK_BYTES))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
 
 
 class StorageService:
@@ -20,28 +44,32 @@ class StorageService:
     def s3_enabled(self) -> bool:
         return self._s3_client is not None and settings.s3_bucket is not None
 
-    def save_media(self, session_id: str, role: str, file: FileStorage) -> MediaRecord:
+    def media_key(self, session_id: str, role: str) -> str:
         if not session_id:
             raise ValueError("session_id is required")
         if role not in {"questioner", "answerer"}:
             raise ValueError("role must be 'questioner' or 'answerer'")
+        return f"{settings.s3_prefix}/{session_id}/{role}.mp4"
 
-        key = f"{settings.s3_prefix}/{session_id}/{role}.mp4"
-        content_type = file.mimetype or 'video/mp4'
+    def save_media(self, session_id: str, role: str, file: FileStorage) -> MediaRecord:
+        file.stream.seek(0)
+        return self.save_media_stream(session_id, role, file.stream, file.mimetype or 'video/mp4')
+
+    def save_media_stream(self, session_id: str, role: str, stream: BinaryIO, content_type: str = 'video/mp4') -> MediaRecord:
+        """Pipe ``stream`` into S3 multipart parts or the local media root, hashing on the fly.
+
+        Memory is bounded by ``UPLOAD_CONCURRENCY`` in-flight parts of ``UPLOAD_PART_MB`` each.
+        """
+        key = self.media_key(session_id, role)
+        digest = hashlib.sha256()
         local_path: Optional[Path] = None
+        etag: Optional[str] = None
 
         if self.s3_enabled:
-            file.stream.seek(0)
-            self._s3_client.upload_fileobj(
-                Fileobj=file.stream,
-                Bucket=settings.s3_bucket,  # type: ignore[arg-type]
-                Key=key,
-                ExtraArgs={'ContentType': content_type}
-            )
+            etag = self._stream_to_s3(stream, key, content_type, digest)
         else:
             local_path = settings.local_media_root / key
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            file.save(local_path)
+            self._stream_to_file(stream, local_path, digest)
 
         record = MediaRecord(
             session_id=session_id,
@@ -49,27 +77,193 @@ class StorageService:
             key=key,
             bucket=settings.s3_bucket,
             local_path=str(local_path) if local_path else None,
-            content_type=content_type
+            content_type=content_type,
+            sha256=digest.hexdigest(),
+            etag=etag
+        )
+        session_store.update_media(session_id, role, record)
+        return record
+
+    def create_presigned_upload(self, session_id: str, role: str, size_bytes: int, content_type: str = 'video/mp4') -> Dict[str, Any]:
+        """Start a multipart upload the client fills directly through presigned part URLs."""
+        key = self.media_key(session_id, role)
+        if not self.s3_enabled:
+            raise ValueError("Direct uploads require S3 storage")
+        if size_bytes <= 0:
+            raise ValueError("sizeBytes must be positive")
+        if size_bytes > self._max_upload_bytes():
+            raise ValueError(f"sizeBytes exceeds the {settings.max_upload_mb} MB upload limit")
+
+        part_size = self._part_size()
+        part_count = math.ceil(size_bytes / part_size)
+        if part_count > S3_MAX_PARTS:
+            part_size = math.ceil(size_bytes / S3_MAX_PARTS)
+            part_count = math.ceil(size_bytes / part_size)
+
+        bucket = settings.s3_bucket
+        upload_id = self._s3_client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)['UploadId']
+        parts = [
+            {
+                'partNumber': part_number,
+                'url': self._s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': bucket, 'Key': key, 'UploadId': upload_id, 'PartNumber': part_number},
+                    ExpiresIn=settings.presign_expiry_s
+                )
+            }
+            for part_number in range(1, part_count + 1)
+        ]
+        return {
+            'videoKey': key,
+            'bucket': bucket,
+            'uploadId': upload_id,
+            'partSize': part_size,
+            'parts': parts,
+            'expiresIn': settings.presign_expiry_s
+        }
+
+    def complete_presigned_upload(self, session_id: str, role: str, upload_id: str, parts: List[Dict[str, Any]]) -> MediaRecord:
+        """Finish a direct upload and register it without the backend touching the bytes."""
+        key = self.media_key(session_id, role)
+        if not self.s3_enabled:
+            raise ValueError("Direct uploads require S3 storage")
+        if not upload_id or not parts:
+            raise ValueError("uploadId and parts are required")
+
+        bucket = settings.s3_bucket
+        try:
+            completed = sorted(({'PartNumber': int(part['partNumber']), 'ETag': part['etag']} for part in parts), key=lambda part: part['PartNumber'])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError("parts must be a list of {partNumber, etag}") from exc
+        try:
+            self._s3_client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': completed})
+            head = self._s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as exc:
+            raise ValueError(f"Could not complete upload: {exc.response['Error'].get('Message', exc)}") from exc
+        if head.get('ContentLength', 0) > self._max_upload_bytes():
+            # The presigned parts bound the size only loosely; the limit is enforced on what was stored.
+            self._s3_client.delete_object(Bucket=bucket, Key=key)
+            raise ValueError(f"Upload exceeds the {settings.max_upload_mb} MB upload limit")
+
+        record = MediaRecord(
+            session_id=session_id,
+            role=role,
+            key=key,
+            bucket=bucket,
+            local_path=None,
+            content_type=head.get('ContentType') or 'video/mp4',
+            etag=head['ETag'].strip('"')
         )
         session_store.update_media(session_id, role, record)
         return record
 
-    def ensure_local_path(self, record: MediaRecord) -> Path:
+    def abort_presigned_upload(self, session_id: str, role: str, upload_id: str) -> None:
+        key = self.media_key(session_id, role)
+        if not self.s3_enabled:
+            raise ValueError("Direct uploads require S3 storage")
+        try:
+            self._s3_client.abort_multipart_upload(Bucket=settings.s3_bucket, Key=key, UploadId=upload_id)
+        except ClientError as exc:
+            raise ValueError(f"Could not abort upload: {exc.response['Error'].get('Message', exc)}") from exc
+
+    @staticmethod
+    def _max_upload_bytes() -> int:
+        return settings.max_upload_mb * 1024 * 1024
+
+    def _part_size(self) -> int:
+        return max(settings.upload_part_mb, S3_MIN_PART_MB) * 1024 * 1024
+
+    def _stream_to_file(self, stream: BinaryIO, destination: Path, digest: hashlib._Hash) -> int:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{destination.name}.{threading.get_ident()}.part")
+        written = 0
+        try:
+            with open(tmp_path, 'wb') as handle:
+                while True:
+                    chunk = stream.read(STREAM_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    written += len(chunk)
+            if not written:
+                raise ValueError("Upload body is empty")
+            os.replace(tmp_path, destination)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return written
+
+    def _stream_to_s3(self, stream: BinaryIO, key: str, content_type: str, digest: hashlib._Hash) -> str:
+        """Upload ``stream`` as S3 multipart parts and return the completed object's ETag."""
+        bucket = settings.s3_bucket
+        part_size = self._part_size()
+        concurrency = max(settings.upload_concurrency, 1)
+        upload_id = self._s3_client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)['UploadId']
+        slots = threading.BoundedSemaphore(concurrency)
+        futures: Dict[int, Future] = {}
+        written = 0
+
+        def upload_part(part_number: int, body: bytes) -> str:
+            try:
+                response = self._s3_client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body)
+                return response['ETag']
+            finally:
+                slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='s3-part') as pool:
+                part_number = 1
+                while True:
+                    # Block before reading the next part so at most `concurrency` parts sit in memory.
+                    slots.acquire()
+                    for future in futures.values():
+                        if future.done() and future.exception():
+                            slots.release()
+                            future.result()
+                    body = _read_exactly(stream, part_size)
+                    if not body:
+                        slots.release()
+                        break
+                    digest.update(body)
+                    written += len(body)
+                    futures[part_number] = pool.submit(upload_part, part_number, body)
+                    part_number += 1
+                parts = [{'PartNumber': number, 'ETag': future.result()} for number, future in sorted(futures.items())]
+            if not parts:
+                raise ValueError("Upload body is empty")
+            completed = self._s3_client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
+        except BaseException:
+            self._s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+        return completed['ETag'].strip('"')
+
+    @contextmanager
+    def local_media(self, record: MediaRecord, cache: MediaCache | None = None) -> Iterator[Path]:
+        """Yield a local path for ``record``; S3 objects are served through the pinned media cache."""
+        cache = cache or media_cache
         if record.local_path:
             path = Path(record.local_path)
-            if path.exists():
-                return path
+            # Paths inside the cache go through it below so LRU order, pinning and ETag checks stay current.
+            if path.exists() and cache.root not in path.parents:
+                yield path
+                return
         if not self.s3_enabled:
             raise FileNotFoundError("Local media file is unavailable")
         if not record.bucket or not record.key:
             raise FileNotFoundError("Media record missing bucket/key")
 
-        download_path = settings.local_media_root / record.key
-        download_path.parent.mkdir(parents=True, exist_ok=True)
-        self._s3_client.download_file(record.bucket, record.key, str(download_path))  # type: ignore[arg-type]
-        record.local_path = str(download_path)
-        session_store.update_media_path(record)
-        return download_path
+        # Uploads record the ETag; only records from before that need a HEAD to find it.
+        etag = record.etag or self._s3_client.head_object(Bucket=record.bucket, Key=record.key)['ETag'].strip('"')
+        with cache.lease(
+            record.bucket,
+            record.key,
+            etag,
+            lambda destination: self._s3_client.download_file(record.bucket, record.key, str(destination))
+        ) as download_path:
+            if record.local_path != str(download_path):
+                record.local_path = str(download_path)
+                session_store.update_media_path(record)
+            yield download_path
 
 
 storage_service = StorageService()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.metrics import metrics
+from .http_client import HttpClient, http_client
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIBE_SAMPLE_RATE = 16000
+_SILENCE_START = re.compile(r'silence_start: (-?[\d.]+)')
+_SILENCE_END = re.compile(r'silence_end: (-?[\d.]+)')
+
+
+@dataclass
+class Segment:
+    """One upload: ``[start_s, end_s)`` of the recording. ``core_start_s`` is where the part this
+    segment is responsible for begins; audio before it is overlap shared with the previous segment."""
+
+    index: int
+    start_s: float
+    core_start_s: float
+    end_s: float
+
+
+def extract_audio(source: Path, destination: Path) -> Path:
+    """Decode only the audio track of ``source`` to 16 kHz mono PCM WAV (what Whisper uses internally)."""
+    _run_ffmpeg(['-i', str(source), '-vn', '-ac', '1', '-ar', str(TRANSCRIBE_SAMPLE_RATE), '-c:a', 'pcm_s16le', '-y', str(destination)])
+    return destination
+
+
+def detect_silences(audio_path: Path, noise_db: float, min_silence_s: float) -> List[Tuple[float, float]]:
+    """``(start_s, end_s)`` of each silent stretch, from ffmpeg's silencedetect filter."""
+    output = _run_ffmpeg(['-i', str(audio_path), '-af', f'silencedetect=noise={noise_db}dB:d={min_silence_s}', '-f', 'null', '-'])
+    starts = [float(value) for value in _SILENCE_START.findall(output)]
+    ends = [float(value) for value in _SILENCE_END.findall(output)]
+    return [(max(start, 0.0), end) for start, end in zip(starts, ends)]
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+
+def _run_ffmpeg(arguments: List[str]) -> str:
+    if not ffmpeg_available():
+        raise RuntimeError('ffmpeg is required for transcription audio extraction')
+    result = subprocess.run(['ffmpeg', '-nostdin', '-hide_banner', *arguments], capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+    return result.stderr
+
+
+def wav_duration(audio_path: Path) -> float:
+    with wave.open(str(audio_path), 'rb') as audio:
+        return audio.getnframes() / audio.getframerate()
+
+
+def plan_segments(
+    duration_s: float,
+    silences: List[Tuple[float, float]],
+    target_s: float,
+    max_s: float,
+    overlap_s: float
+) -> List[Segment]:
+    """Split ``[0, duration_s)`` into segments of about ``target_s``, never longer than ``max_s``.
+
+    Each cut is placed at the middle of the silence closest to ``target_s`` into the segment
+    (searching from half the target up to ``max_s``); with no silence in range the segment
+    is cut hard at ``max_s``. A segment following a hard cut starts ``overlap_s`` early so
+    words straddling the cut are heard whole by one of the two requests; a cut in silence
+    splits no word and gets no overlap.
+    """
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    segments: List[Segment] = []
+    core_start = 0.0
+    hard_cut = False
+    while core_start < duration_s:
+        start = max(core_start - overlap_s, 0.0) if hard_cut else core_start
+        if duration_s - core_start <= max_s:
+            cut, hard_cut = duration_s, False
+        else:
+            ideal = core_start + target_s
+            candidates = [point for point in midpoints if core_start + target_s / 2 <= point <= core_start + max_s]
+            hard_cut = not candidates
+            cut = core_start + max_s if hard_cut else min(candidates, key=lambda point: abs(point - ideal))
+        segments.append(Segment(len(segments), start, core_start, cut))
+        core_start = cut
+    return segments
+
+
+def cut_wav(audio_path: Path, segment: Segment, destination: Path) -> Path:
+    with wave.open(str(audio_path), 'rb') as source:
+        rate = source.getframerate()
+        source.setpos(int(segment.start_s * rate))
+        frames = source.readframes(int((segment.end_s - segment.start_s) * rate))
+        with wave.open(str(destination), 'wb') as target:
+            target.setparams(source.getparams())
+            target.writeframes(frames)
+    return destination
+
+
+def stitch(segments: List[Segment], responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-segment Whisper ``verbose_json`` responses into one timeline.
+
+    Timestamps are shifted to recording time, and each piece belongs to the segment whose
+    own span ``[core_start_s, end_s)`` contains its midpoint, so a phrase heard by both sides
+    of an overlap is kept exactly once: by whichever request heard most of it.
+    """
+    pieces: List[Dict[str, Any]] = []
+    last = len(segments) - 1
+    for position, (segment, response) in enumerate(zip(segments, responses)):
+        parts = response.get('segments') or [{'start': 0.0, 'end': segment.end_s - segment.start_s, 'text': response.get('text', '')}]
+        for part in parts:
+            start = segment.start_s + float(part.get('start', 0.0))
+            end = segment.start_s + float(part.get('end', 0.0))
+            text = (part.get('text') or '').strip()
+            midpoint = (start + end) / 2
+            if not text or (position and midpoint < segment.core_start_s) or (position < last and midpoint >= segment.end_s):
+                continue
+            pieces.append({'start': round(start, 3), 'end': round(end, 3), 'text': text})
+    return {'text': ' '.join(piece['text'] for piece in pieces), 'segments': pieces}
+
+
+class TranscriptionPipeline:
+    """Audio-only, silence-aligned, concurrent Whisper transcription of one recording."""
+
+    def __init__(
+        self,
+        client: HttpClient | None = None,
+        base_url: str = settings.openai_base_url,
+        api_key: Optional[str] = None,
+        model: str = settings.whisper_model,
+        workers: int = settings.whisper_workers,
+        segment_s: float = settings.whisper_segment_s,
+        max_segment_s: float = settings.whisper_max_segment_s,
+        overlap_s: float = settings.whisper_overlap_s,
+        timeout_s: float = settings.whisper_timeout_s
+    ) -> None:
+        self.client = client or http_client
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.model = model
+        self.workers = max(workers, 1)
+        self.segment_s = segment_s
+        self.max_segment_s = max(max_segment_s, segment_s)
+        self.overlap_s = overlap_s
+        self.timeout_s = timeout_s
+
+    def transcribe(self, media_path: Path, content_type: Optional[str] = None) -> Dict[str, Any]:
+        if not ffmpeg_available():
+            # Without ffmpeg (e.g. a Lambda deployed without the ffmpeg layer) fall back to sending
+            # the whole file in one request, as before segmenting existed.
+            logger.warning('ffmpeg-missing', extra={'media': media_path.name})
+            metrics.incr('whisper.whole_file')
+            response = self._transcribe_file(media_path, content_type or 'audio/mpeg')
+            return {**stitch([Segment(0, 0.0, 0.0, 0.0)], [response]), 'chunks': 1}
+        with tempfile.TemporaryDirectory(prefix='transcribe-') as tmpdir:
+            workdir = Path(tmpdir)
+            audio_path = extract_audio(media_path, workdir / 'audio.wav')
+            duration = wav_duration(audio_path)
+            silences = detect_silences(audio_path, settings.whisper_silence_db, settings.whisper_min_silence_s) if duration > self.max_segment_s else []
+            return self.transcribe_wav(audio_path, plan_segments(duration, silences, self.segment_s, self.max_segment_s, self.overlap_s), workdir)
+
+    def transcribe_wav(self, audio_path: Path, segments: List[Segment], workdir: Path) -> Dict[str, Any]:
+        """Upload each segment of a PCM WAV concurrently and stitch the results in order."""
+        if not segments:
+            return {'text': '', 'segments': [], 'chunks': 0}
+        files = [cut_wav(audio_path, segment, workdir / f'segment-{segment.index:04d}.wav') for segment in segments] if len(segments) > 1 else [audio_path]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(segments)), thread_name_prefix='whisper') as pool:
+            responses = list(pool.map(self._transcribe_file, files))
+        metrics.incr('whisper.segments', len(segments))
+        return {**stitch(segments, responses), 'chunks': len(segments)}
+
+    def _transcribe_file(self, path: Path, content_type: str = 'audio/wav') -> Dict[str, Any]:
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        with open(path, 'rb') as audio_file:
+            response = self.client.post(
+                f'{self.base_url}/audio/transcriptions',
+                name='openai.whisper',
+                timeout_s=self.timeout_s,
+                headers=headers,
+                data={'model': self.model, 'response_format': 'verbose_json'},
+                files={'file': (path.name, audio_file, content_type)}
+            )
+        response.raise_for_status()
+        return response.json()
@@ -4,6 +4,8 @@ from typing import Dict, Iterable, List, Sequence
 
 from ml.common.emotions import EMOTION_TO_INDEX
 
+FUSION_WEIGHTS = (0.35, 0.35, 0.30)
+
 
 def average_vectors(vectors: Iterable[Sequence[float]]) -> List[float]:
     vectors = list(vectors)
@@ -32,7 +34,7 @@ def cosine_similarity(vec_a: Sequence[float], vec_b: Sequence[float]) -> float:
 
 
 def fuse_lie_scores(audio: float, macro: float, micro: float, weights: Sequence[float] | None = None) -> float:
-    weights = list(weights or (0.35, 0.35, 0.30))
+    weights = list(weights or FUSION_WEIGHTS)
     total = sum(weights)
     normalized = [w / total for w in weights]
     fused = audio * normalized[0] + macro * normalized[1] + micro * normalized[2]
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+TERMINAL_STATUSES = frozenset({'succeeded', 'failed'})
+
+
+class JobQueue:
+    """Durable FIFO of background jobs in a WAL-mode SQLite database.
+
+    A job runs one ``kind`` of work for one session. Submitting the same kind, session
+    and input ``fingerprint`` again returns the existing job instead of queueing a new one,
+    unless that job failed, in which case it is queued again. A running job holds a lease
+    that its worker renews with ``touch``; ``claim`` hands out jobs whose lease expired, so
+    work orphaned by a dead worker process is picked up again. Every change bumps the job's
+    ``version``, which ``wait`` uses for long-polling; waiters in this process are woken
+    immediately and other processes are seen within ``poll_interval_s``. Progress reports may
+    carry ``partial`` results, which are served with the job until it finishes. The database
+    is created on first use.
+    """
+
+    def __init__(self, db_path: Path, poll_interval_s: float = 0.5) -> None:
+        self.db_path = db_path
+        self.poll_interval_s = poll_interval_s
+        self._local = threading.local()
+        self._changed = threading.Condition()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, session_id TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "status TEXT NOT NULL, stage TEXT, progress REAL NOT NULL DEFAULT 0, partial TEXT, result TEXT, "
+                "error TEXT, attempts INTEGER NOT NULL DEFAULT 0, version INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'partial' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN partial TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_session ON jobs (kind, session_id, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._schema_ready = True
+
+    def submit(self, kind: str, session_id: str, fingerprint: str = '') -> Tuple[Dict[str, Any], bool]:
+        """Queue ``kind`` for ``session_id``; returns the job and whether new work was queued."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND session_id = ? ORDER BY created_at DESC LIMIT 1",
+                (kind, session_id)
+            ).fetchone()
+            if row and row['fingerprint'] == fingerprint and row['status'] != 'failed':
+                conn.execute("COMMIT")
+                return self._to_dict(row), False
+            if row and row['fingerprint'] == fingerprint:
+                job_id = row['id']
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', stage = NULL, progress = 0, partial = NULL, error = NULL, "
+                    "version = version + 1, updated_at = ? WHERE id = ?", (now, job_id)
+                )
+            else:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, session_id, fingerprint, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 'queued', ?, ?)", (job_id, kind, session_id, fingerprint, now, now)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._notify()
+        return self.get(job_id), True
+
+    def claim(self, lease_s: float) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued (or lease-expired) job to ``running`` and return it."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND updated_at < ?) "
+                "ORDER BY created_at LIMIT 1", (now - lease_s,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', partial = NULL, attempts = attempts + 1, "
+                    "version = version + 1, updated_at = ? WHERE id = ?", (now, row['id'])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if not row:
+            return None
+        self._notify()
+        return self.get(row['id'])
+
+    def report(self, job_id: str, stage: str, progress: float, partial: Any = None) -> None:
+        """Record progress; ``partial`` (JSON), when given, replaces the job's partial result."""
+        progress = min(max(progress, 0.0), 1.0)
+        if partial is None:
+            self._update(job_id, "stage = ?, progress = ?", (stage, progress))
+        else:
+            self._update(
+                job_id, "stage = ?, progress = ?, partial = ?",
+                (stage, progress, json.dumps(partial, separators=(",", ":")))
+            )
+
+    def succeed(self, job_id: str, result: Any) -> None:
+        self._update(
+            job_id, "status = 'succeeded', stage = 'done', progress = 1, result = ?, error = NULL",
+            (json.dumps(result, separators=(",", ":")),)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._update(job_id, "status = 'failed', error = ?", (error,))
+
+    def touch(self, job_ids: List[str]) -> None:
+        """Renew the lease of running jobs without waking long-pollers."""
+        if job_ids:
+            placeholders = ",".join("?" * len(job_ids))
+            self._connection().execute(
+                f"UPDATE jobs SET updated_at = ? WHERE status = 'running' AND id IN ({placeholders})",
+                (time.time(), *job_ids)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def wait(self, job_id: str, timeout_s: float, after_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once it has finished or moved past ``after_version``, or at the timeout."""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in TERMINAL_STATUSES:
+                return job
+            if after_version is not None and job['version'] > after_version:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            self.wait_for_change(min(remaining, self.poll_interval_s))
+
+    def wait_for_change(self, timeout_s: float) -> None:
+        with self._changed:
+            self._changed.wait(timeout_s)
+
+    def wake(self) -> None:
+        self._notify()
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {'queued': 0, 'running': 0, 'succeeded': 0, 'failed': 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _update(self, job_id: str, assignments: str, params: tuple) -> None:
+        self._connection().execute(
+            f"UPDATE jobs SET {assignments}, version = version + 1, updated_at = ? WHERE id = ?",
+            (*params, time.time(), job_id)
+        )
+        self._notify()
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'jobId': row['id'],
+            'kind': row['kind'],
+            'sessionId': row['session_id'],
+            'status': row['status'],
+            'stage': row['stage'],
+            'progress': round(row['progress'], 3),
+            'attempts': row['attempts'],
+            'version': row['version'],
+            'partial': json.loads(row['partial']) if row['partial'] else None,
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'createdAt': row['created_at'],
+            'updatedAt': row['updated_at']
+        }
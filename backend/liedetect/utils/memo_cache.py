@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class MemoCache:
+    """Persistent memo of expensive call results in SQLite, with a TTL and an LRU size bound.
+
+    Each entry remembers how long the original call took, so hits report the latency they
+    saved. The database is created on first use, not at construction. ``max_entries <= 0``
+    disables the cache.
+    """
+
+    def __init__(self, db_path: Path, ttl_s: float, max_entries: int) -> None:
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._saved_ms = 0.0
+        self._schema_ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if self._schema_ready:
+                return
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS memo ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, cost_ms REAL NOT NULL, "
+                    "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used)")
+            self._schema_ready = True
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute("SELECT value, cost_ms, created_at FROM memo WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_s > 0 and now - row[2] > self.ttl_s:
+                conn.execute("DELETE FROM memo WHERE key = ?", (key,))
+                with self._lock:
+                    self._expired += 1
+                row = None
+            if row:
+                conn.execute("UPDATE memo SET last_used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._saved_ms += row[1]
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any, cost_ms: float) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO memo (key, value, cost_ms, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), cost_ms, now, now)
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM memo").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                with self._lock:
+                    self._evictions += excess
+
+    def stats(self) -> Dict[str, Any]:
+        entries = 0
+        if self.enabled and (self._schema_ready or self.db_path.exists()):
+            entries = self._connection().execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': entries,
+                'maxEntries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hitRate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'savedMs': round(self._saved_ms, 1)
+            }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """Process-local counters, timings and gauge providers exposed on /metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(name, {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0})
+            timing['count'] += 1
+            timing['totalMs'] += value_ms
+            timing['maxMs'] = max(timing['maxMs'], value_ms)
+
+    def register(self, name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        with self._lock:
+            self._providers[name] = provider
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {
+                name: {**timing, 'avgMs': round(timing['totalMs'] / timing['count'], 2) if timing['count'] else 0.0}
+                for name, timing in self._timings.items()
+            }
+            providers = dict(self._providers)
+        return {
+            'counters': counters,
+            'timings': timings,
+            **{name: provider() for name, provider in providers.items()}
+        }
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List
+
+from ..config import settings
+from .session_backends import FileSessionBackend, SessionBackend, SqliteSessionBackend
+
+
+def _batches(ids: Iterator[str], size: int) -> Iterator[List[str]]:
+    while True:
+        batch = list(islice(ids, size))
+        if not batch:
+            return
+        yield batch
+
+
+def migrate(source: SessionBackend, target: SessionBackend, batch_size: int = 500) -> int:
+    """Bulk-copy every session from ``source`` into ``target``; returns the number copied."""
+    copied = 0
+    for batch in _batches(source.iter_ids(), batch_size):
+        payloads = source.get_many(batch)
+        target.put_many(payloads)
+        copied += len(payloads)
+    return copied
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import the JSON session tree into the SQLite session backend')
+    parser.add_argument('--source', type=Path, default=settings.local_media_root / 'meta')
+    parser.add_argument('--target', type=Path, default=settings.session_db_path)
+    parser.add_argument('--batch-size', type=int, default=500)
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    target_backend = SqliteSessionBackend(args.target)
+    count = migrate(FileSessionBackend(args.source), target_backend, args.batch_size)
+    target_backend.close()
+    print(f"Migrated {count} sessions into {args.target} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SQLITE_MAX_VARIABLES = 500
+
+
+class SessionBackend(ABC):
+    """Persistence engine behind SessionStore.
+
+    Backends store one JSON-serialisable payload per session id. Engines that can
+    rewrite individual top-level fields in place set ``supports_partial_updates`` so
+    the store sends only the fields that changed.
+    """
+
+    supports_partial_updates = False
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, payload: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def iter_ids(self) -> Iterator[str]:
+        ...
+
+    def get_many(self, session_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        for session_id in session_ids:
+            payload = self.get(session_id)
+            if payload is not None:
+                found[session_id] = payload
+        return found
+
+    def put_many(self, payloads: Dict[str, Dict[str, Any]]) -> None:
+        for session_id, payload in payloads.items():
+            self.put(session_id, payload)
+
+    def update_fields(self, session_id: str, fields: Dict[str, Any]) -> None:
+        payload = self.get(session_id) or {}
+        payload.update(fields)
+        self.put(session_id, payload)
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        for session_id, fields in updates.items():
+            self.update_fields(session_id, fields)
+
+    def close(self) -> None:
+        pass
+
+
+class FileSessionBackend(SessionBackend):
+    """One compact JSON document per session under ``meta_root``."""
+
+    def __init__(self, meta_root: Path) -> None:
+        self.meta_root = meta_root
+        self.meta_root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        return self.meta_root / f"{session_id}.json"
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(session_id)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def put(self, session_id: str, payload: Dict[str, Any]) -> None:
+        path = self._path(session_id)
+        # Thread ids repeat across processes, so the pid keeps concurrent workers' temp files apart.
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def iter_ids(self) -> Iterator[str]:
+        with os.scandir(self.meta_root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and not entry.name.startswith("."):
+                    yield entry.name[:-len(".json")]
+
+
+class SqliteSessionBackend(SessionBackend):
+    """Single-file SQLite engine in WAL mode with JSON1 field-level updates."""
+
+    supports_partial_updates = True
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is still used by one thread only; check_same_thread is off so
+            # close() can release every thread's connection.
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT payload FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, session_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(session_ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        conn = self._connection()
+        for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+            chunk = ids[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT session_id, payload FROM sessions WHERE session_id IN ({placeholders})", chunk
+            )
+            for session_id, payload in rows:
+                found[session_id] = json.loads(payload)
+        return found
+
+    def put(self, session_id: str, payload: Dict[str, Any]) -> None:
+        self.put_many({session_id: payload})
+
+    def put_many(self, payloads: Dict[str, Dict[str, Any]]) -> None:
+        now = self._now()
+        rows = [
+            (session_id, json.dumps(payload, separators=(",", ":")), now)
+            for session_id, payload in payloads.items()
+        ]
+        with self._connection() as conn:
+            conn.executemany("INSERT OR REPLACE INTO sessions (session_id, payload, updated_at) VALUES (?, ?, ?)", rows)
+
+    def update_fields(self, session_id: str, fields: Dict[str, Any]) -> None:
+        self.update_many({session_id: fields})
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        now = self._now()
+        with self._connection() as conn:
+            for session_id, fields in updates.items():
+                if not fields:
+                    continue
+                set_args: List[str] = []
+                params: List[Any] = [session_id, json.dumps(fields, separators=(",", ":")), now]
+                for field, value in fields.items():
+                    set_args.append("?, json(?)")
+                    params.extend([f'$."{field}"', json.dumps(value, separators=(",", ":"))])
+                conn.execute(
+                    "INSERT INTO sessions (session_id, payload, updated_at) VALUES (?, ?, ?) "
+                    f"ON CONFLICT(session_id) DO UPDATE SET payload = json_set(sessions.payload, {', '.join(set_args)}), "
+                    "updated_at = excluded.updated_at",
+                    params
+                )
+
+    def iter_ids(self) -> Iterator[str]:
+        for (session_id,) in self._connection().execute("SELECT session_id FROM sessions ORDER BY session_id"):
+            yield session_id
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads still holding a closed connection reconnect on their next call.
+        self._local = threading.local()
+
+
+def create_backend(kind: str, meta_root: Path, db_path: Path) -> SessionBackend:
+    if kind == "file":
+        return FileSessionBackend(meta_root)
+    if kind == "sqlite":
+        return SqliteSessionBackend(db_path)
+    raise ValueError(f"Unknown session backend: {kind}")
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import json
+import atexit
+import copy
+import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from ..config import settings
+from .session_backends import SessionBackend, create_backend
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -17,68 +23,189 @@ class MediaRecord:
     bucket: Optional[str]
     local_path: Optional[str]
     content_type: str
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
 
 
 class SessionStore:
-    def __init__(self, meta_root: Path) -> None:
-        self.meta_root = meta_root
-        self.meta_root.mkdir(parents=True, exist_ok=True)
-
-    def _path(self, session_id: str) -> Path:
-        return self.meta_root / f"{session_id}.json"
+    """Session metadata store with an in-process LRU cache and write-behind persistence.
+
+    Mutations land in the cache and are marked dirty; a background flusher coalesces
+    repeated mutations of the same session into one write to the backend, sending
+    only the changed top-level fields when the backend supports it. A flush interval
+    of 0 writes through on every mutation.
+
+    Both are opt-in. The defaults (cache size 0, flush interval 0) read every session
+    fresh from the backend and write every mutation through, which is what multi-process
+    and Lambda deployments need: the cache is per process and never revalidated, and a
+    frozen or recycled process would lose unflushed writes.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        cache_size: int = settings.session_cache_size,
+        flush_interval_s: float = settings.session_flush_interval_s
+    ) -> None:
+        self.backend = backend
+        self._cache_size = max(cache_size, 0)
+        self._flush_interval_s = flush_interval_s
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty: Dict[str, int] = {}
+        self._dirty_fields: Dict[str, Set[str]] = {}
+        self._version = 0
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval_s > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name='session-store-flusher', daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def _cached(self, session_id: str) -> Optional[Dict[str, Any]]:
+        if not self._cache_size and session_id not in self._dirty:
+            # Caching disabled: always read what other processes may have written since.
+            self._cache.pop(session_id, None)
+        payload = self._cache.get(session_id)
+        if payload is None:
+            payload = self.backend.get(session_id)
+            if payload is None:
+                return None
+            self._cache[session_id] = payload
+            self._evict(keep=session_id)
+        self._cache.move_to_end(session_id)
+        return payload
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # Only clean entries are evicted; dirty ones stay until the flusher persists them.
+        overflow = len(self._cache) - self._cache_size
+        if overflow <= 0:
+            return
+        for session_id in list(self._cache):
+            if overflow <= 0:
+                break
+            if session_id != keep and session_id not in self._dirty:
+                del self._cache[session_id]
+                overflow -= 1
+        if overflow > 0:
+            self._wake.set()
 
     def _load(self, session_id: str) -> Dict[str, Any]:
-        path = self._path(session_id)
-        if not path.exists():
-            return {
+        payload = self._cached(session_id)
+        if payload is None:
+            payload = {
                 "sessionId": session_id,
                 "media": {},
                 "createdAt": datetime.now(timezone.utc).isoformat()
             }
-        return json.loads(path.read_text(encoding="utf-8"))
-
-    def _save(self, session_id: str, payload: Dict[str, Any]) -> None:
-        payload["updatedAt"] = datetime.now(timezone.utc).isoformat()
-        path = self._path(session_id)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            self._cache[session_id] = payload
+            self._dirty_fields.setdefault(session_id, set()).update(payload)
+            self._evict(keep=session_id)
+        return payload
+
+    def _mutate(self, session_id: str, field: str, mutator: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            payload = self._load(session_id)
+            mutator(payload)
+            payload["updatedAt"] = datetime.now(timezone.utc).isoformat()
+            self._version += 1
+            self._dirty[session_id] = self._version
+            self._dirty_fields.setdefault(session_id, set()).update((field, "updatedAt"))
+        if self._flusher is None:
+            self.flush()
+
+    def flush(self) -> int:
+        """Persist every dirty session; returns the number of sessions written."""
+        with self._io_lock:
+            with self._lock:
+                versions = dict(self._dirty)
+                if self.backend.supports_partial_updates:
+                    updates = {
+                        session_id: {field: copy.deepcopy(self._cache[session_id][field]) for field in self._dirty_fields.pop(session_id, ())}
+                        for session_id in versions
+                    }
+                else:
+                    updates = {session_id: copy.deepcopy(self._cache[session_id]) for session_id in versions}
+                    self._dirty_fields.clear()
+            if not updates:
+                return 0
+            try:
+                if self.backend.supports_partial_updates:
+                    self.backend.update_many(updates)
+                else:
+                    self.backend.put_many(updates)
+            except Exception:
+                with self._lock:
+                    for session_id, fields in updates.items():
+                        self._dirty_fields.setdefault(session_id, set()).update(fields)
+                raise
+            with self._lock:
+                for session_id, version in versions.items():
+                    # A session mutated again while we were writing stays dirty for the next pass.
+                    if self._dirty.get(session_id) == version:
+                        del self._dirty[session_id]
+                self._evict()
+        return len(updates)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval_s)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('session-flush-failed')
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=5)
+        self.flush()
+        self.backend.close()
 
     def update_media(self, session_id: str, role: str, record: MediaRecord) -> None:
-        payload = self._load(session_id)
-        payload.setdefault("media", {})[role] = {
-            "key": record.key,
-            "bucket": record.bucket,
-            "localPath": record.local_path,
-            "contentType": record.content_type
-        }
-        self._save(session_id, payload)
+        def apply(payload: Dict[str, Any]) -> None:
+            payload.setdefault("media", {})[role] = {
+                "key": record.key,
+                "bucket": record.bucket,
+                "localPath": record.local_path,
+                "contentType": record.content_type,
+                "sha256": record.sha256,
+                "etag": record.etag
+            }
+        self._mutate(session_id, "media", apply)
 
     def update_media_path(self, record: MediaRecord) -> None:
-        payload = self._load(record.session_id)
-        media = payload.setdefault("media", {}).setdefault(record.role, {})
-        media["localPath"] = record.local_path
-        self._save(record.session_id, payload)
+        def apply(payload: Dict[str, Any]) -> None:
+            media = payload.setdefault("media", {}).setdefault(record.role, {})
+            media["localPath"] = record.local_path
+        self._mutate(record.session_id, "media", apply)
 
     def set_transcript(self, session_id: str, transcript: str) -> None:
-        payload = self._load(session_id)
-        payload["transcript"] = transcript
-        self._save(session_id, payload)
+        self._mutate(session_id, "transcript", lambda payload: payload.update(transcript=transcript))
+
+    def set_transcript_segments(self, session_id: str, segments: List[Dict[str, Any]]) -> None:
+        self._mutate(session_id, "transcriptSegments", lambda payload: payload.update(transcriptSegments=copy.deepcopy(segments)))
 
     def set_summary(self, session_id: str, summary: Dict[str, Any]) -> None:
-        payload = self._load(session_id)
-        payload["summary"] = summary
-        self._save(session_id, payload)
+        self._mutate(session_id, "summary", lambda payload: payload.update(summary=copy.deepcopy(summary)))
 
     def set_llm_vector(self, session_id: str, vector: Dict[str, float]) -> None:
-        payload = self._load(session_id)
-        payload["llmVector"] = vector
-        self._save(session_id, payload)
+        self._mutate(session_id, "llmVector", lambda payload: payload.update(llmVector=dict(vector)))
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a clean cached copy so the next read goes to the backend."""
+        with self._lock:
+            if session_id not in self._dirty:
+                self._cache.pop(session_id, None)
 
     def get(self, session_id: str) -> Optional[Dict[str, Any]]:
-        path = self._path(session_id)
-        if not path.exists():
-            return None
-        return json.loads(path.read_text(encoding="utf-8"))
+        with self._lock:
+            payload = self._cached(session_id)
+            return copy.deepcopy(payload) if payload is not None else None
 
     def get_media_record(self, session_id: str, role: str) -> Optional[MediaRecord]:
         payload = self.get(session_id)
@@ -93,8 +220,12 @@ class SessionStore:
             key=entry.get('key'),
             bucket=entry.get('bucket'),
             local_path=entry.get('localPath'),
-            content_type=entry.get('contentType', 'video/mp4')
+            content_type=entry.get('contentType', 'video/mp4'),
+            sha256=entry.get('sha256'),
+            etag=entry.get('etag')
         )
 
 
-session_store = SessionStore(settings.local_media_root / "meta")
+session_store = SessionStore(
+    create_backend(settings.session_backend, settings.local_media_root / "meta", settings.session_db_path)
+)
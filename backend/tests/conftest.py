@@ -0,0 +1,14 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Settings and the module-level stores read these at import, so point them at a scratch
+# directory before any test module imports liedetect; nothing lands in backend/storage.
+_scratch = tempfile.mkdtemp(prefix='liedetect-tests-')
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+
+os.environ['LOCAL_MEDIA_ROOT'] = _scratch
+os.environ['SESSION_DB_PATH'] = os.path.join(_scratch, 'sessions.db')
+os.environ['LLM_MEMO_DB_PATH'] = os.path.join(_scratch, 'llm_memo.db')
+os.environ['JOB_DB_PATH'] = os.path.join(_scratch, 'jobs.db')
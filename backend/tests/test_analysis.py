@@ -0,0 +1,182 @@
+import json
+import time
+
+import pytest
+
+import liedetect
+from liedetect.config import settings
+from liedetect.services import analysis, jobs
+from liedetect.services.analysis import AnalysisService
+from liedetect.services.jobs import JobRunner
+from liedetect.utils.job_queue import JobQueue
+from liedetect.utils.metrics import metrics
+from liedetect.utils.session_backends import FileSessionBackend
+from liedetect.utils.session_store import MediaRecord, SessionStore
+
+
+DELAYS = {'audio-ep': 0.2, 'macro-ep': 0.2, 'micro-ep': 0.2}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SessionStore(FileSessionBackend(tmp_path / 'meta'), flush_interval_s=0)
+    store.update_media('s1', 'answerer', MediaRecord('s1', 'answerer', 'sessions/s1/answerer.mp4', 'bucket', None, 'video/mp4'))
+    monkeypatch.setattr(analysis, 'session_store', store)
+    monkeypatch.setattr(settings, 'audio_endpoint', 'audio-ep')
+    monkeypatch.setattr(settings, 'macro_endpoint', 'macro-ep')
+    monkeypatch.setattr(settings, 'micro_endpoint', 'micro-ep')
+    return store
+
+
+@pytest.fixture
+def slow_gateway(monkeypatch):
+    def invoke(endpoint_name, payload):
+        delay = DELAYS[endpoint_name]
+        if delay < 0:
+            raise RuntimeError(f"{endpoint_name} unavailable")
+        time.sleep(delay)
+        return {'lie_score': 0.5, 'emotion_vector': [0.125] * 8}
+
+    monkeypatch.setattr(analysis.sagemaker_gateway, 'invoke', invoke)
+    return DELAYS
+
+
+def test_fan_out_runs_endpoints_concurrently(store, slow_gateway):
+    service = AnalysisService(fan_out=True, max_workers=3, timeout_s=5)
+    started = time.perf_counter()
+    summary = service.run('s1')
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert set(summary['latencyMs']) == {'audio', 'macro', 'micro'}
+    assert all(latency >= 200 for latency in summary['latencyMs'].values())
+    assert 'failedEndpoints' not in summary
+    assert store.get('s1')['summary'] == summary
+
+
+def test_timeout_returns_partial_results(store, slow_gateway, monkeypatch):
+    monkeypatch.setitem(slow_gateway, 'micro-ep', 1.0)
+    service = AnalysisService(fan_out=True, max_workers=3, timeout_s=0.3)
+    summary = service.run('s1')
+
+    assert summary['audioScore'] == 0.5
+    assert summary['microScore'] == 0.0
+    assert 'micro' in summary['failedEndpoints']
+    assert summary['criticalPath'] == 'micro'
+    # The missing micro score is left out of the fusion rather than counted as 0.0.
+    assert summary['lieProbability'] == 0.5
+
+
+def test_deadline_starts_when_branch_runs(store, slow_gateway):
+    # With one worker the branches run back to back; time spent queued must not count.
+    service = AnalysisService(fan_out=True, max_workers=1, timeout_s=0.3)
+    summary = service.run('s1')
+
+    assert 'failedEndpoints' not in summary
+    assert summary['lieProbability'] == 0.5
+
+
+def test_sequential_mode_isolates_endpoint_errors(store, slow_gateway, monkeypatch):
+    monkeypatch.setitem(slow_gateway, 'macro-ep', -1)
+    service = AnalysisService(fan_out=False)
+    summary = service.run('s1')
+
+    assert summary['macroScore'] == 0.0
+    assert summary['failedEndpoints'] == {'macro': 'macro-ep unavailable'}
+    assert summary['comparisonVector'] == [0.125] * 8
+    assert summary['lieProbability'] == 0.5
+
+
+def test_all_endpoints_failing_raises(store, slow_gateway, monkeypatch):
+    for endpoint in list(slow_gateway):
+        monkeypatch.setitem(slow_gateway, endpoint, -1)
+    service = AnalysisService(fan_out=True, max_workers=3, timeout_s=1)
+    with pytest.raises(RuntimeError):
+        service.run('s1')
+
+
+def test_stream_emits_results_as_they_land(store, slow_gateway, monkeypatch):
+    monkeypatch.setitem(slow_gateway, 'audio-ep', 0.05)
+    monkeypatch.setitem(slow_gateway, 'macro-ep', 0.1)
+    monkeypatch.setitem(slow_gateway, 'micro-ep', 0.4)
+    service = AnalysisService(fan_out=True, max_workers=3, timeout_s=5)
+    started = time.perf_counter()
+    arrivals = []
+    for event, data in service.stream('s1'):
+        arrivals.append((event, data.get('name'), time.perf_counter() - started))
+
+    assert [(event, name) for event, name, _ in arrivals] == [
+        ('endpoint', 'audio'), ('endpoint', 'macro'), ('vector', None), ('endpoint', 'micro'), ('summary', None)
+    ]
+    assert arrivals[0][2] < 0.3
+    assert metrics.snapshot()['timings']['analysis.first_result']['count'] >= 1
+    assert store.get('s1')['summary']['criticalPath'] == 'micro'
+
+
+def test_liedetect_job_publishes_partial_results(store, slow_gateway, tmp_path, monkeypatch):
+    monkeypatch.setitem(slow_gateway, 'audio-ep', 0.05)
+    monkeypatch.setitem(slow_gateway, 'macro-ep', 0.1)
+    monkeypatch.setitem(slow_gateway, 'micro-ep', 0.3)
+    monkeypatch.setattr(jobs, 'analysis_service', AnalysisService(fan_out=True, max_workers=3, timeout_s=5))
+    monkeypatch.setattr(jobs, 'session_store', store)
+    queue = JobQueue(tmp_path / 'jobs.db', poll_interval_s=0.05)
+    reports = []
+    report = queue.report
+
+    def recording_report(job_id, stage, progress, partial=None):
+        reports.append((stage, json.loads(json.dumps(partial))))
+        report(job_id, stage, progress, partial)
+
+    monkeypatch.setattr(queue, 'report', recording_report)
+    runner = JobRunner(queue, jobs.HANDLERS, workers=0)
+    job, _ = runner.submit('liedetect', 's1')
+    assert runner.run_once()
+
+    partials = [partial for _, partial in reports if partial]
+    assert list(partials[0]['endpoints']) == ['audio']
+    assert 'comparisonVector' in partials[2] and 'micro' not in partials[2]['endpoints']
+    done = queue.get(job['jobId'])
+    assert done['status'] == 'succeeded'
+    assert set(done['partial']['endpoints']) == {'audio', 'macro', 'micro'}
+    assert done['result']['summary']['lieProbability'] == store.get('s1')['summary']['lieProbability']
+    queue.close()
+
+
+@pytest.fixture
+def inline_client(store, monkeypatch):
+    monkeypatch.setattr(settings, 'jobs_enabled', False)
+    monkeypatch.setattr(jobs, 'analysis_service', AnalysisService(fan_out=True, max_workers=3, timeout_s=5))
+    monkeypatch.setattr(jobs, 'session_store', store)
+    return liedetect.create_app().test_client()
+
+
+def test_inline_liedetect_streams_ndjson(inline_client, store, slow_gateway, monkeypatch):
+    monkeypatch.setitem(slow_gateway, 'micro-ep', 0.4)
+    response = inline_client.post('/liedetect', json={'sessionId': 's1'}, headers={'Accept': 'application/x-ndjson'}, buffered=False)
+    assert response.mimetype == 'application/x-ndjson'
+    started = time.perf_counter()
+    first = json.loads(next(response.response))
+    assert first['event'] == 'endpoint' and time.perf_counter() - started < 0.35
+
+    lines = [first] + [json.loads(line) for line in response.response]
+    assert [line['event'] for line in lines].count('endpoint') == 3
+    assert lines[-1]['event'] == 'summary'
+    assert lines[-1]['data']['lieProbability'] == store.get('s1')['summary']['lieProbability']
+
+
+def test_inline_liedetect_streams_server_sent_events(inline_client, store, slow_gateway, monkeypatch):
+    response = inline_client.post('/liedetect', json={'sessionId': 's1'}, headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    events = [block.split('\n') for block in response.get_data(as_text=True).split('\n\n') if block]
+    assert [lines[0] for lines in events].count('event: endpoint') == 3
+    assert events[-1][0] == 'event: summary'
+
+    for endpoint in list(slow_gateway):
+        monkeypatch.setitem(slow_gateway, endpoint, -1)
+    failed = inline_client.post('/liedetect', json={'sessionId': 's1'}, headers={'Accept': 'text/event-stream'})
+    assert failed.get_data(as_text=True).split('\n\n')[-2].startswith('event: error')
+
+    missing = inline_client.post('/liedetect', json={'sessionId': 'missing'}, headers={'Accept': 'text/event-stream'})
+    assert missing.status_code == 400
+    plain = inline_client.post('/liedetect', json={'sessionId': 's1'})
+    assert plain.is_json
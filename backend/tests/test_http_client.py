@@ -0,0 +1,121 @@
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from liedetect.services.http_client import HttpClient
+from liedetect.utils.metrics import metrics
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.bodies.append(body)
+            server.ports.add(self.client_address[1])
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            status, headers = server.script.pop(0) if server.script else (200, {})
+        time.sleep(server.delay_s)
+        payload = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with server.lock:
+            server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.script, server.bodies, server.ports = [], [], set()
+    server.active = server.peak = 0
+    server.delay_s = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/v1/test'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_5xx_then_succeeds(stub):
+    stub.script = [(503, {}), (502, {})]
+    client = HttpClient(backoff_s=0.01)
+    before = metrics.snapshot()['counters'].get('http.stub.retries', 0)
+    response = client.post(stub.url, name='stub', data=b'x')
+    assert response.status_code == 200
+    assert len(stub.bodies) == 3
+    assert metrics.snapshot()['counters']['http.stub.retries'] - before == 2
+    assert metrics.snapshot()['timings']['http.stub']['count'] >= 1
+
+
+def test_honours_retry_after_and_gives_up(stub):
+    stub.script = [(429, {'Retry-After': '0'})] * 3
+    client = HttpClient(max_retries=2, backoff_s=5)
+    started = time.monotonic()
+    response = client.post(stub.url, data=b'x')
+    assert response.status_code == 429
+    assert len(stub.bodies) == 3
+    assert time.monotonic() - started < 2
+
+
+def test_retry_after_beyond_deadline_returns_response(stub):
+    stub.script = [(429, {'Retry-After': '30'})]
+    client = HttpClient(timeout_s=5, backoff_max_s=0.1)
+    started = time.monotonic()
+    response = client.post(stub.url, data=b'x')
+    assert response.status_code == 429
+    assert len(stub.bodies) == 1
+    assert time.monotonic() - started < 1
+
+
+def test_keep_alive_reuses_connection(stub):
+    client = HttpClient()
+    for _ in range(5):
+        assert client.post(stub.url, data=b'x').status_code == 200
+    assert len(stub.ports) == 1
+
+
+def test_deadline_bounds_a_stalled_call(stub):
+    stub.delay_s = 1.0
+    client = HttpClient(max_retries=0)
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.post(stub.url, timeout_s=0.2, data=b'x')
+    assert time.monotonic() - started < 0.9
+
+
+def test_concurrency_limit(stub):
+    stub.delay_s = 0.1
+    client = HttpClient(max_concurrency=2)
+    threads = [threading.Thread(target=client.post, args=(stub.url,), kwargs={'data': b'x'}) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stub.bodies) == 6
+    assert stub.peak <= 2
+
+
+def test_retry_resends_whole_file(stub):
+    stub.script = [(500, {})]
+    client = HttpClient(backoff_s=0.01)
+    upload = io.BytesIO(b'audio-bytes')
+    response = client.post(stub.url, files={'file': ('clip.wav', upload, 'audio/wav')})
+    assert response.status_code == 200
+    assert all(b'audio-bytes' in body for body in stub.bodies)
@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pytest
+
+import liedetect
+from liedetect.config import settings
+from liedetect.routes import inference
+from liedetect.services import jobs
+from liedetect.services.jobs import JobRunner
+from liedetect.utils.job_queue import JobQueue
+from liedetect.utils.session_backends import FileSessionBackend
+from liedetect.utils.session_store import MediaRecord, SessionStore
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.db', poll_interval_s=0.05)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SessionStore(FileSessionBackend(tmp_path / 'meta'), flush_interval_s=0)
+    store.update_media('s1', 'answerer', MediaRecord('s1', 'answerer', 'sessions/s1/answerer.mp4', None, None, 'video/mp4'))
+    monkeypatch.setattr(jobs, 'session_store', store)
+    return store
+
+
+def test_duplicate_submission_returns_existing_job(queue):
+    job, created = queue.submit('liedetect', 's1', 'fp')
+    again, created_again = queue.submit('liedetect', 's1', 'fp')
+    assert created and not created_again
+    assert again['jobId'] == job['jobId']
+
+    queue.fail(queue.claim(lease_s=60)['jobId'], 'boom')
+    retried, created = queue.submit('liedetect', 's1', 'fp')
+    assert created and retried['jobId'] == job['jobId'] and retried['status'] == 'queued'
+
+    _, created = queue.submit('liedetect', 's1', 'new-upload')
+    assert created
+    assert queue.stats()['queued'] == 2
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job, _ = queue.submit('transcript', 's1')
+    assert queue.claim(lease_s=60)['jobId'] == job['jobId']
+    assert queue.claim(lease_s=60) is None
+    time.sleep(0.05)
+    reclaimed = queue.claim(lease_s=0.01)
+    assert reclaimed['jobId'] == job['jobId'] and reclaimed['attempts'] == 2
+
+
+def test_long_poll_wakes_on_completion(queue):
+    job, _ = queue.submit('liedetect', 's1')
+    timer = threading.Timer(0.1, queue.succeed, args=(job['jobId'], {'ok': True}))
+    timer.start()
+    started = time.monotonic()
+    done = queue.wait(job['jobId'], timeout_s=5)
+    assert done['status'] == 'succeeded' and done['result'] == {'ok': True}
+    assert time.monotonic() - started < 1
+
+
+def test_runner_executes_once_per_session(queue, store):
+    calls = []
+
+    def handler(session_id, report):
+        calls.append(session_id)
+        report('working', 0.5)
+        time.sleep(0.1)
+        return {'sessionId': session_id}
+
+    runner = JobRunner(queue, {'liedetect': handler}, workers=2, lease_s=60)
+    runner.start()
+    try:
+        submitted = [runner.submit('liedetect', 's1')[0] for _ in range(5)]
+        assert len({job['jobId'] for job in submitted}) == 1
+        done = queue.wait(submitted[0]['jobId'], timeout_s=5)
+    finally:
+        runner.stop()
+
+    assert done['status'] == 'succeeded' and done['result'] == {'sessionId': 's1'}
+    assert calls == ['s1']
+
+
+def test_runner_records_failures(queue, store):
+    def handler(session_id, report):
+        raise RuntimeError('All model endpoints failed')
+
+    runner = JobRunner(queue, {'liedetect': handler}, workers=0)
+    job, _ = runner.submit('liedetect', 's1')
+    assert runner.run_once()
+    failed = queue.get(job['jobId'])
+    assert failed['status'] == 'failed' and 'endpoints failed' in failed['error']
+
+    with pytest.raises(ValueError):
+        runner.submit('liedetect', 'missing')
+
+
+def _handlers(store):
+    def liedetect_handler(session_id, report):
+        report('analysing', 0.5)
+        store.set_summary(session_id, {'lieProbability': 0.4})
+        return {'sessionId': session_id, 'summary': store.get(session_id)['summary']}
+
+    def transcript_handler(session_id, report):
+        store.set_transcript(session_id, 'hello')
+        store.set_summary(session_id, {'lieProbability': 0.9, 'alignmentScore': 0.1})
+        return {'sessionId': session_id, 'transcript': 'hello', 'summary': store.get(session_id)['summary']}
+
+    return {'liedetect': liedetect_handler, 'transcript': transcript_handler}
+
+
+@pytest.fixture
+def client_for(queue, store, monkeypatch):
+    def build(jobs_enabled):
+        runner = JobRunner(queue, _handlers(store), workers=0)
+        monkeypatch.setattr(settings, 'jobs_enabled', jobs_enabled)
+        monkeypatch.setattr(liedetect, 'job_runner', runner)
+        monkeypatch.setattr(inference, 'job_runner', runner)
+        monkeypatch.setattr(inference, 'job_queue', queue)
+        return liedetect.create_app().test_client(), runner
+    return build
+
+
+def test_job_routes_submit_poll_and_resubmit(client_for, queue):
+    client, runner = client_for(True)
+
+    submitted = client.post('/liedetect', json={'sessionId': 's1'})
+    assert submitted.status_code == 202
+    job = submitted.get_json()
+    assert submitted.headers['Location'] == f"/jobs/{job['jobId']}"
+    assert client.get(f"/jobs/{job['jobId']}").get_json()['status'] == 'queued'
+
+    assert runner.run_once()
+    done = client.get(f"/jobs/{job['jobId']}?wait=1&version={job['version']}").get_json()
+    assert done['status'] == 'succeeded' and done['result']['summary'] == {'lieProbability': 0.4}
+
+    again = client.post('/liedetect', json={'sessionId': 's1'})
+    assert again.status_code == 200 and again.get_json()['jobId'] == job['jobId']
+
+    transcript = client.post('/transcript', json={'sessionId': 's1'})
+    assert transcript.status_code == 202
+    assert runner.run_once()
+    # The finished analysis job reports the summary as enriched by the later transcript job.
+    refreshed = client.post('/liedetect', json={'sessionId': 's1'}).get_json()
+    assert refreshed['result']['summary']['lieProbability'] == 0.9
+
+    assert client.get('/jobs/unknown').status_code == 404
+    assert client.post('/liedetect', json={'sessionId': 'missing'}).status_code == 400
+
+
+def test_job_long_poll_returns_on_progress(client_for, queue):
+    client, _ = client_for(True)
+    job = client.post('/transcript', json={'sessionId': 's1'}).get_json()
+    threading.Timer(0.1, queue.report, args=(job['jobId'], 'transcribing', 0.1)).start()
+    started = time.monotonic()
+    polled = client.get(f"/jobs/{job['jobId']}?wait=5&version={job['version']}").get_json()
+    assert polled['stage'] == 'transcribing' and polled['version'] > job['version']
+    assert time.monotonic() - started < 2
+
+
+def test_sync_mode_runs_inline(client_for):
+    client, _ = client_for(False)
+    response = client.post('/liedetect', json={'sessionId': 's1'})
+    assert response.status_code == 200
+    assert response.get_json() == {'sessionId': 's1', 'summary': {'lieProbability': 0.4}}
+    assert 'Location' not in response.headers
+    assert client.get('/jobs/anything').status_code == 404
+
+
+def test_sync_mode_keeps_the_old_error_contract(client_for):
+    client, runner = client_for(False)
+
+    def failing(error):
+        def handler(session_id, report):
+            raise error
+        return handler
+
+    runner.handlers['transcript'] = failing(RuntimeError('whisper unavailable'))
+    assert client.post('/transcript', json={'sessionId': 's1'}).status_code == 400
+    runner.handlers['liedetect'] = failing(RuntimeError('All model endpoints failed'))
+    assert client.post('/liedetect', json={'sessionId': 's1'}).status_code == 502
+    runner.handlers['liedetect'] = failing(KeyError('summary'))
+    assert client.post('/liedetect', json={'sessionId': 's1'}).status_code == 500
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from liedetect.services.media_cache import MediaCache
+
+
+def _writer(payload, calls=None, delay=0.0):
+    def download(destination):
+        if calls is not None:
+            calls.append(destination)
+        time.sleep(delay)
+        destination.write_bytes(payload)
+    return download
+
+
+def _fetch(cache, bucket, key, etag, download):
+    with cache.lease(bucket, key, etag, download) as path:
+        return path
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=1024)
+    calls = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        paths = list(pool.map(lambda _: _fetch(cache, 'b', 'k.mp4', 'etag', _writer(b'abc', calls, 0.1)), range(4)))
+
+    assert len(calls) == 1
+    assert len(set(paths)) == 1 and paths[0].suffix == '.mp4'
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['coalesced'] == 3
+
+    _fetch(cache, 'b', 'k.mp4', 'etag', _writer(b'abc', calls))
+    assert cache.stats()['hits'] == 1
+    assert len(calls) == 1
+
+
+def test_new_etag_is_a_new_entry(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=1024)
+    first = _fetch(cache, 'b', 'k.mp4', 'v1', _writer(b'old'))
+    second = _fetch(cache, 'b', 'k.mp4', 'v2', _writer(b'new'))
+    assert first != second
+    assert second.read_bytes() == b'new'
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=10)
+    a = _fetch(cache, 'b', 'a', 'e', _writer(b'x' * 4))
+    b = _fetch(cache, 'b', 'b', 'e', _writer(b'x' * 4))
+    _fetch(cache, 'b', 'a', 'e', _writer(b'x' * 4))
+    _fetch(cache, 'b', 'c', 'e', _writer(b'x' * 4))
+
+    assert a.exists() and not b.exists()
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] == 8
+
+
+def test_failed_download_propagates_to_waiters(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=1024)
+    started = threading.Event()
+
+    def failing(destination):
+        started.set()
+        time.sleep(0.1)
+        raise OSError('s3 unavailable')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        owner = pool.submit(_fetch, cache, 'b', 'k', 'e', failing)
+        started.wait()
+        waiter = pool.submit(_fetch, cache, 'b', 'k', 'e', _writer(b'unused'))
+        for future in (owner, waiter):
+            with pytest.raises(OSError):
+                future.result()
+
+    assert _fetch(cache, 'b', 'k', 'e', _writer(b'ok')).read_bytes() == b'ok'
+
+
+def test_existing_entries_are_reloaded(tmp_path):
+    _fetch(MediaCache(tmp_path, max_bytes=1024), 'b', 'k', 'e', _writer(b'abc'))
+    reloaded = MediaCache(tmp_path, max_bytes=1024)
+    assert reloaded.stats()['entries'] == 1
+    _fetch(reloaded, 'b', 'k', 'e', _writer(b'unused'))
+    assert reloaded.stats()['hits'] == 1
+
+
+def test_leased_entries_are_not_evicted(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=6)
+    with cache.lease('b', 'a', 'e', _writer(b'x' * 4)) as a:
+        with cache.lease('b', 'b', 'e', _writer(b'x' * 4)) as b:
+            assert a.read_bytes() == b'x' * 4 and b.exists()
+            assert cache.stats()['pinned'] == 2
+        assert a.exists()
+        assert not b.exists()
+    stats = cache.stats()
+    assert stats['pinned'] == 0 and stats['bytes'] <= 6
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from liedetect.config import settings
+from liedetect.services import lie_llm
+from liedetect.services.lie_llm import LieLLMService
+from liedetect.utils.memo_cache import MemoCache
+
+
+class RecordingStore:
+    def __init__(self):
+        self.vectors = {}
+
+    def set_llm_vector(self, session_id, vector):
+        self.vectors[session_id] = vector
+
+
+@pytest.fixture
+def memo(tmp_path):
+    cache = MemoCache(tmp_path / 'memo.db', ttl_s=60, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_hit_reports_saved_latency(memo):
+    assert memo.get('k') is None
+    memo.put('k', {'angry': 0.5}, cost_ms=120.0)
+    assert memo.get('k') == {'angry': 0.5}
+    stats = memo.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hitRate'] == 0.5
+    assert stats['savedMs'] == 120.0
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    cache = MemoCache(tmp_path / 'lazy' / 'memo.db', ttl_s=60, max_entries=3)
+    assert not (tmp_path / 'lazy').exists()
+    assert cache.stats()['entries'] == 0
+    cache.put('k', 1, cost_ms=1.0)
+    assert (tmp_path / 'lazy' / 'memo.db').exists()
+    cache.close()
+
+
+def test_ttl_expires_entries(memo):
+    memo.put('k', 1, cost_ms=1.0)
+    memo.ttl_s = 0.01
+    time.sleep(0.05)
+    assert memo.get('k') is None
+    assert memo.stats()['expired'] == 1
+
+
+def test_evicts_least_recently_used(memo):
+    for key in ('a', 'b', 'c'):
+        memo.put(key, key, cost_ms=1.0)
+        time.sleep(0.01)
+    memo.get('a')
+    memo.put('d', 'd', cost_ms=1.0)
+    assert memo.get('b') is None
+    assert memo.get('a') == 'a'
+    assert memo.stats()['entries'] == 3
+
+
+def test_emotion_weights_memoised_per_transcript(memo, monkeypatch):
+    monkeypatch.setattr(settings, 'use_mock_services', False)
+    monkeypatch.setattr(lie_llm, 'session_store', RecordingStore())
+    service = LieLLMService(memo)
+    service._api_key = 'test-key'
+    calls = []
+    monkeypatch.setattr(service, '_invoke_openai', lambda transcript: calls.append(transcript) or {'calm': 0.9})
+
+    assert service.emotion_weights('same words', 's1') == {'calm': 0.9}
+    assert service.emotion_weights('same words', 's2') == {'calm': 0.9}
+    assert service.emotion_weights('other words', 's1') == {'calm': 0.9}
+    assert calls == ['same words', 'other words']
+    assert lie_llm.session_store.vectors == {'s1': {'calm': 0.9}, 's2': {'calm': 0.9}}
+
+    service._model = 'another-model'
+    service.emotion_weights('same words', 's3')
+    assert len(calls) == 3
@@ -0,0 +1,37 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from ml.common.emotions import BAD_EMOTIONS, EMOTION_TO_INDEX  # noqa: E402
+from ml.common.scoring import lie_score, lie_scores  # noqa: E402
+
+
+def _legacy_lie_score(vector):
+    # The per-element loop previously used by compute_lie_score and _compute_lie_score.
+    emotions = sorted(EMOTION_TO_INDEX.keys())
+    score = 0.0
+    for idx, emotion in enumerate(emotions):
+        weight = 1.0 if emotion in BAD_EMOTIONS else 0.5
+        score += weight * float(vector[idx])
+    max_score = len(BAD_EMOTIONS) * 1.0 + (len(emotions) - len(BAD_EMOTIONS)) * 0.5
+    return round(score / max_score, 4)
+
+
+def test_lie_score_matches_legacy_loop():
+    generator = torch.Generator().manual_seed(0)
+    probabilities = torch.softmax(torch.randn(256, len(EMOTION_TO_INDEX), generator=generator), dim=1)
+    for vector in probabilities:
+        assert lie_score(vector) == _legacy_lie_score(vector)
+
+
+def test_lie_scores_batch_matches_single_vectors():
+    generator = torch.Generator().manual_seed(1)
+    probabilities = torch.softmax(torch.randn(64, len(EMOTION_TO_INDEX), generator=generator), dim=1)
+    batch = lie_scores(probabilities)
+    assert batch.shape == (64,)
+    assert [round(float(score), 4) for score in batch] == [lie_score(vector) for vector in probabilities]
+
+
+def test_lie_score_bounds():
+    assert lie_score([1.0] * len(EMOTION_TO_INDEX)) == 1.0
+    assert lie_score([0.0] * len(EMOTION_TO_INDEX)) == 0.0
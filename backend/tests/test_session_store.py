@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from liedetect.utils.migrate_sessions import migrate
+from liedetect.utils.session_backends import FileSessionBackend, SqliteSessionBackend
+from liedetect.utils.session_store import MediaRecord, SessionStore
+
+
+def _record(session_id):
+    return MediaRecord(session_id, 'answerer', f'sessions/{session_id}/answerer.mp4', None, None, 'video/mp4')
+
+
+def test_write_behind_coalesces_mutations(tmp_path):
+    store = SessionStore(FileSessionBackend(tmp_path), cache_size=8, flush_interval_s=60)
+    store.update_media('s1', 'answerer', _record('s1'))
+    store.set_transcript('s1', 'hello')
+    store.set_summary('s1', {'lieProbability': 0.4})
+
+    assert not (tmp_path / 's1.json').exists()
+    assert store.get('s1')['transcript'] == 'hello'
+
+    assert store.flush() == 1
+    on_disk = json.loads((tmp_path / 's1.json').read_text(encoding='utf-8'))
+    assert on_disk['summary'] == {'lieProbability': 0.4}
+    assert store.flush() == 0
+    store.close()
+
+
+def test_write_through_when_interval_is_zero(tmp_path):
+    store = SessionStore(FileSessionBackend(tmp_path), cache_size=8, flush_interval_s=0)
+    store.set_transcript('s1', 'hello')
+    assert json.loads((tmp_path / 's1.json').read_text(encoding='utf-8'))['transcript'] == 'hello'
+
+
+def test_uncached_stores_see_each_others_writes(tmp_path):
+    web = SessionStore(FileSessionBackend(tmp_path), cache_size=0, flush_interval_s=0)
+    worker = SessionStore(FileSessionBackend(tmp_path), cache_size=0, flush_interval_s=0)
+    web.update_media('s1', 'answerer', _record('s1'))
+    assert worker.get('s1')['media']['answerer']['key'] == 'sessions/s1/answerer.mp4'
+
+    worker.set_summary('s1', {'lieProbability': 0.4})
+    web.set_transcript('s1', 'hello')
+    assert worker.get('s1')['transcript'] == 'hello'
+    assert web.get('s1')['summary'] == {'lieProbability': 0.4}
+
+
+def test_lru_evicts_only_clean_sessions(tmp_path):
+    store = SessionStore(FileSessionBackend(tmp_path), cache_size=2, flush_interval_s=60)
+    for session_id in ('a', 'b', 'c'):
+        store.set_transcript(session_id, session_id)
+    assert len(store._cache) == 3
+
+    store.flush()
+    assert list(store._cache) == ['b', 'c']
+    assert store.get('a')['transcript'] == 'a'
+    store.close()
+
+
+def test_get_returns_isolated_copy(tmp_path):
+    store = SessionStore(FileSessionBackend(tmp_path), cache_size=8, flush_interval_s=0)
+    store.set_summary('s1', {'lieProbability': 0.4})
+    snapshot = store.get('s1')
+    snapshot['summary']['lieProbability'] = 1.0
+    assert store.get('s1')['summary']['lieProbability'] == 0.4
+
+
+def test_close_flushes_and_concurrent_mutations_survive(tmp_path):
+    store = SessionStore(FileSessionBackend(tmp_path), cache_size=4, flush_interval_s=0.01)
+
+    def worker(role):
+        for idx in range(50):
+            store.update_media('s1', role, _record('s1'))
+            store.set_transcript('s1', f'{role}-{idx}')
+
+    threads = [threading.Thread(target=worker, args=(role,)) for role in ('answerer', 'questioner')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    on_disk = json.loads((tmp_path / 's1.json').read_text(encoding='utf-8'))
+    assert set(on_disk['media']) == {'answerer', 'questioner'}
+    assert on_disk['transcript'].endswith('-49')
+
+
+def test_sqlite_backend_flushes_only_changed_fields(tmp_path):
+    backend = SqliteSessionBackend(tmp_path / 'sessions.db')
+    store = SessionStore(backend, cache_size=8, flush_interval_s=60)
+    store.update_media('s1', 'answerer', _record('s1'))
+    store.set_transcript('s1', 'hello')
+    store.flush()
+
+    backend.update_fields('s1', {'llmVector': {'calm': 0.5}})
+    store.set_summary('s1', {'lieProbability': 0.4, 'failed': None})
+    store.flush()
+    store.close()
+
+    stored = SqliteSessionBackend(tmp_path / 'sessions.db').get('s1')
+    assert stored['transcript'] == 'hello'
+    assert stored['llmVector'] == {'calm': 0.5}
+    assert stored['summary'] == {'lieProbability': 0.4, 'failed': None}
+    assert stored['media']['answerer']['localPath'] is None
+
+
+def test_migrate_imports_json_tree(tmp_path):
+    source = FileSessionBackend(tmp_path / 'meta')
+    for idx in range(7):
+        source.put(f's{idx}', {'sessionId': f's{idx}', 'media': {}})
+    target = SqliteSessionBackend(tmp_path / 'sessions.db')
+
+    assert migrate(source, target, batch_size=3) == 7
+    assert set(target.get_many(['s0', 's6', 'missing'])) == {'s0', 's6'}
+    assert sorted(target.iter_ids()) == sorted(source.iter_ids())
+
+
+def test_sqlite_close_releases_every_thread_connection(tmp_path):
+    backend = SqliteSessionBackend(tmp_path / 'sessions.db')
+    threads = [threading.Thread(target=backend.put, args=(f's{idx}', {'idx': idx})) for idx in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections = list(backend._connections)
+    assert len(connections) == 4
+
+    backend.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert backend.get('s2') == {'idx': 2}
+    backend.close()
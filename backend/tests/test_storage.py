@@ -0,0 +1,155 @@
+import hashlib
+import io
+
+import boto3
+import pytest
+
+from liedetect.config import settings
+from liedetect.services import storage
+from liedetect.services.storage import StorageService
+from liedetect.utils.session_backends import FileSessionBackend
+from liedetect.utils.session_store import SessionStore
+
+moto = pytest.importorskip('moto')
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SessionStore(FileSessionBackend(tmp_path / 'meta'), flush_interval_s=0)
+    monkeypatch.setattr(storage, 'session_store', store)
+    monkeypatch.setattr(settings, 'local_media_root', tmp_path)
+    return store
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setattr(settings, 's3_bucket', 'liedetect-test')
+    monkeypatch.setattr(settings, 'use_mock_services', False)
+    with moto.mock_s3():
+        client = boto3.client('s3', region_name=settings.aws_region)
+        client.create_bucket(Bucket='liedetect-test')
+        yield client
+
+
+def test_stream_to_local_file_hashes_body(store, tmp_path):
+    body = b'frame' * 300_000
+    record = StorageService().save_media_stream('s1', 'answerer', io.BytesIO(body))
+
+    assert (tmp_path / record.key).read_bytes() == body
+    assert record.sha256 == hashlib.sha256(body).hexdigest()
+    assert store.get_media_record('s1', 'answerer').sha256 == record.sha256
+
+
+def test_stream_to_s3_uses_concurrent_multipart_parts(store, s3_bucket, monkeypatch):
+    monkeypatch.setattr(settings, 'upload_part_mb', 5)
+    monkeypatch.setattr(settings, 'upload_concurrency', 2)
+    body = bytes(range(256)) * (12 * 1024 * 1024 // 256)
+
+    record = StorageService().save_media_stream('s1', 'answerer', io.BytesIO(body))
+
+    stored = s3_bucket.get_object(Bucket='liedetect-test', Key=record.key)
+    assert stored['Body'].read() == body
+    assert stored['ContentType'] == 'video/mp4'
+    assert record.sha256 == hashlib.sha256(body).hexdigest()
+    assert s3_bucket.head_object(Bucket='liedetect-test', Key=record.key)['ETag'].endswith('-3"')
+
+
+def test_empty_stream_is_rejected(store, s3_bucket):
+    with pytest.raises(ValueError):
+        StorageService().save_media_stream('s1', 'answerer', io.BytesIO(b''))
+    assert s3_bucket.list_multipart_uploads(Bucket='liedetect-test').get('Uploads') is None
+
+
+def test_stream_upload_route(store, tmp_path):
+    from liedetect import create_app
+
+    client = create_app().test_client()
+    response = client.put('/upload/s1/Answerer', data=b'video-bytes', content_type='video/mp4')
+
+    assert response.status_code == 201
+    assert response.get_json()['sha256'] == hashlib.sha256(b'video-bytes').hexdigest()
+    assert (tmp_path / 'sessions/s1/answerer.mp4').read_bytes() == b'video-bytes'
+
+
+def test_presigned_multipart_flow_registers_media(store, s3_bucket, monkeypatch):
+    import requests
+
+    from liedetect import create_app
+    from liedetect.routes import media
+
+    monkeypatch.setattr(settings, 'upload_part_mb', 5)
+    service = StorageService()
+    monkeypatch.setattr(media, 'storage_service', service)
+    client = create_app().test_client()
+    body = b'x' * (6 * 1024 * 1024)
+
+    presigned = client.post('/upload/presign', json={'sessionId': 's1', 'role': 'answerer', 'sizeBytes': len(body)}).get_json()
+    assert len(presigned['parts']) == 2
+
+    parts = []
+    for part in presigned['parts']:
+        start = (part['partNumber'] - 1) * presigned['partSize']
+        response = requests.put(part['url'], data=body[start:start + presigned['partSize']])
+        response.raise_for_status()
+        parts.append({'partNumber': part['partNumber'], 'etag': response.headers['ETag']})
+
+    completed = client.post('/upload/complete', json={'sessionId': 's1', 'role': 'answerer', 'uploadId': presigned['uploadId'], 'parts': parts})
+
+    assert completed.status_code == 201
+    assert s3_bucket.get_object(Bucket='liedetect-test', Key=presigned['videoKey'])['Body'].read() == body
+    assert store.get_media_record('s1', 'answerer').key == presigned['videoKey']
+
+
+def test_presign_and_complete_enforce_upload_limit(store, s3_bucket, monkeypatch):
+    import requests
+
+    from liedetect import create_app
+    from liedetect.routes import media
+
+    monkeypatch.setattr(settings, 'upload_part_mb', 5)
+    monkeypatch.setattr(settings, 'max_upload_mb', 6)
+    service = StorageService()
+    monkeypatch.setattr(media, 'storage_service', service)
+    client = create_app().test_client()
+
+    too_big = client.post('/upload/presign', json={'sessionId': 's1', 'role': 'answerer', 'sizeBytes': 7 * 1024 * 1024})
+    assert too_big.status_code == 400
+
+    # A client that declares a small size but uploads more parts' worth is caught on completion.
+    presigned = service.create_presigned_upload('s1', 'answerer', 1024)
+    part = requests.put(presigned['parts'][0]['url'], data=b'x' * (7 * 1024 * 1024))
+    part.raise_for_status()
+    completed = client.post('/upload/complete', json={
+        'sessionId': 's1', 'role': 'answerer', 'uploadId': presigned['uploadId'],
+        'parts': [{'partNumber': 1, 'etag': part.headers['ETag']}]
+    })
+
+    assert completed.status_code == 400
+    assert s3_bucket.list_objects_v2(Bucket='liedetect-test').get('KeyCount') == 0
+    assert store.get_media_record('s1', 'answerer') is None
+
+
+def test_presign_requires_s3(store):
+    with pytest.raises(ValueError):
+        StorageService().create_presigned_upload('s1', 'answerer', 1024)
+
+
+def test_local_media_downloads_through_cache(store, s3_bucket, tmp_path, monkeypatch):
+    from liedetect.services.media_cache import MediaCache
+
+    service = StorageService()
+    record = service.save_media_stream('s1', 'answerer', io.BytesIO(b'video'))
+    cache = MediaCache(tmp_path / 'cache', max_bytes=1024)
+    assert record.etag
+
+    with service.local_media(record, cache) as first:
+        assert first.read_bytes() == b'video'
+    heads = []
+    monkeypatch.setattr(service._s3_client, 'head_object', lambda **kwargs: heads.append(kwargs))
+    with service.local_media(store.get_media_record('s1', 'answerer'), cache) as second:
+        assert second == first
+
+    assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+    assert heads == []
@@ -0,0 +1,109 @@
+import json
+import threading
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from liedetect.services.http_client import HttpClient
+from liedetect.services import transcription
+from liedetect.services.transcription import Segment, TranscriptionPipeline, plan_segments, stitch
+
+
+def test_plan_cuts_at_nearest_silence():
+    silences = [(50.0, 51.0), (118.0, 120.0), (230.0, 231.0)]
+    segments = plan_segments(300.0, silences, target_s=120, max_s=180, overlap_s=1.0)
+    assert [round(segment.core_start_s, 1) for segment in segments] == [0.0, 119.0, 230.5]
+    assert segments[0].start_s == 0.0
+    # Cuts in silence split no word, so those segments carry no overlap.
+    assert [segment.start_s for segment in segments] == [segment.core_start_s for segment in segments]
+    assert segments[-1].end_s == 300.0
+
+
+def test_plan_hard_cuts_without_silence():
+    segments = plan_segments(400.0, [], target_s=120, max_s=180, overlap_s=2.0)
+    assert [(segment.core_start_s, segment.end_s) for segment in segments] == [(0.0, 180.0), (180.0, 360.0), (360.0, 400.0)]
+    assert all(segment.end_s - segment.start_s <= 182.0 for segment in segments)
+
+
+def test_plan_overlaps_only_after_hard_cuts():
+    segments = plan_segments(400.0, [(100.0, 102.0)], target_s=120, max_s=180, overlap_s=2.0)
+    assert [(segment.start_s, segment.core_start_s) for segment in segments] == [(0.0, 0.0), (101.0, 101.0), (279.0, 281.0)]
+
+
+def test_stitch_offsets_and_assigns_pieces_by_midpoint():
+    segments = [Segment(0, 0.0, 0.0, 10.0), Segment(1, 9.0, 10.0, 20.0)]
+    responses = [
+        {'segments': [{'start': 0.0, 'end': 4.0, 'text': ' hello'}, {'start': 4.0, 'end': 10.0, 'text': ' there'}]},
+        # "there" straddles the cut and ends past it, but most of it lies in segment 0.
+        {'segments': [{'start': 0.0, 'end': 1.3, 'text': ' there'}, {'start': 1.4, 'end': 5.0, 'text': ' friend'}]}
+    ]
+    result = stitch(segments, responses)
+    assert result['text'] == 'hello there friend'
+    assert result['segments'][-1] == {'start': 10.4, 'end': 14.0, 'text': 'friend'}
+
+
+def test_transcribe_without_ffmpeg_uploads_whole_file(whisper_stub, tmp_path, monkeypatch):
+    base_url, server = whisper_stub
+    media_path = tmp_path / 'clip.mp4'
+    media_path.write_bytes(b'not really a video')
+    monkeypatch.setattr(transcription.shutil, 'which', lambda name: None)
+
+    pipeline = TranscriptionPipeline(client=HttpClient(), base_url=base_url, api_key='test')
+    result = pipeline.transcribe(media_path, 'video/mp4')
+
+    assert result['chunks'] == server.calls == 1
+    assert result['text'] == 'clip.mp4 #1'
+
+
+class WhisperStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.calls += 1
+            order = self.server.calls
+        name = body.split(b'filename="', 1)[1].split(b'"', 1)[0].decode()
+        payload = json.dumps({'text': name, 'segments': [{'start': 1.5, 'end': 3.0, 'text': f'{name} #{order}'}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def whisper_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), WhisperStub)
+    server.lock = threading.Lock()
+    server.calls = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/v1', server
+    server.shutdown()
+    server.server_close()
+
+
+def test_transcribe_wav_uploads_segments_in_parallel(whisper_stub, tmp_path):
+    base_url, server = whisper_stub
+    audio_path = tmp_path / 'audio.wav'
+    with wave.open(str(audio_path), 'wb') as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(16000)
+        audio.writeframes(b'\x00\x00' * 16000 * 25)
+
+    pipeline = TranscriptionPipeline(client=HttpClient(), base_url=base_url, api_key='test', workers=3)
+    segments = plan_segments(25.0, [], target_s=8, max_s=10, overlap_s=1.0)
+    result = pipeline.transcribe_wav(audio_path, segments, tmp_path)
+
+    assert result['chunks'] == server.calls == 3
+    assert [piece['text'].split(' ')[0] for piece in result['segments']] == [
+        'segment-0000.wav', 'segment-0001.wav', 'segment-0002.wav'
+    ]
+    assert [piece['start'] for piece in result['segments']] == [1.5, 10.5, 20.5]
+    with wave.open(str(tmp_path / 'segment-0001.wav'), 'rb') as cut:
+        assert cut.getnframes() == 16000 * 11
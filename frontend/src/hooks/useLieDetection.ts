@@ -1,21 +1,24 @@
 import { useCallback, useState } from 'react';
 import { uploadSessionMedia, runLieDetect, getTranscript } from '@/services/api';
-import { LieDetectResponse, ParticipantRole } from '@/types/lieDetection';
+import { LieDetectPartial, LieDetectResponse, ParticipantRole } from '@/types/lieDetection';
 
 type UseLieDetectionOptions = {
   onComplete?: (response: LieDetectResponse) => void;
+  onPartial?: (partial: LieDetectPartial) => void;
   onError?: (error: Error) => void;
 };
 
-export const useLieDetection = ({ onComplete, onError }: UseLieDetectionOptions = {}) => {
+export const useLieDetection = ({ onComplete, onPartial, onError }: UseLieDetectionOptions = {}) => {
   const [isUploading, setIsUploading] = useState(false);
   const [isAnalyzing, setIsAnalyzing] = useState(false);
+  const [partial, setPartial] = useState<LieDetectPartial | null>(null);
 
   const submit = useCallback(
     async (videoUri: string, role: ParticipantRole) => {
       const sessionId = `${Date.now()}-${Math.floor(Math.random() * 1_000_000)}`;
 
       try {
+        setPartial(null);
         setIsUploading(true);
         await uploadSessionMedia(videoUri, role, sessionId);
       } catch (error) {
@@ -30,7 +33,10 @@ export const useLieDetection = ({ onComplete, onError }: UseLieDetectionOptions
         setIsAnalyzing(true);
 
         const [analysis, transcript] = await Promise.all([
-          runLieDetect(sessionId),
+          runLieDetect(sessionId, (update) => {
+            setPartial(update);
+            onPartial?.(update);
+          }),
           getTranscript(sessionId)
         ]);
 
@@ -53,11 +59,12 @@ export const useLieDetection = ({ onComplete, onError }: UseLieDetectionOptions
         setIsAnalyzing(false);
       }
     },
-    [onComplete, onError]
+    [onComplete, onPartial, onError]
   );
 
   return {
     submit,
+    partial,
     isUploading,
     isAnalyzing,
     isBusy: isUploading || isAnalyzing
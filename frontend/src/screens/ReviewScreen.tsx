@@ -8,17 +8,26 @@ import { typography } from '@/theme/typography';
 import { LoadingOverlay } from '@/components/LoadingOverlay';
 import { useLieDetection } from '@/hooks/useLieDetection';
 import { Button } from '@/components/ui/Button';
+import { EndpointScore } from '@/types/lieDetection';
 
 type Props = NativeStackScreenProps<CameraStackParamList, 'Review'>;
 
 export const ReviewScreen = ({ route, navigation }: Props) => {
   const { videoUri, role } = route.params;
-  const { submit, isBusy } = useLieDetection({
+  const { submit, partial, isBusy } = useLieDetection({
     onError: (error) => {
       Alert.alert('LieDetect failed', error.message);
     }
   });
 
+  // Per-model scores arrive while the analysis job is still running.
+  const scored = Object.values(partial?.endpoints ?? {}).filter(
+    (endpoint): endpoint is EndpointScore => Boolean(endpoint && !endpoint.error)
+  );
+  const progressMessage = scored.length
+    ? `Analyzing… ${scored.map((endpoint) => `${endpoint.name} ${Math.round(endpoint.lieScore * 100)}%`).join(', ')}`
+    : 'Uploading and analyzing session…';
+
   const handleLieDetect = async () => {
     try {
       const response = await submit(videoUri, role);
@@ -51,7 +60,7 @@ export const ReviewScreen = ({ route, navigation }: Props) => {
         <Button title="Run LieDetect" onPress={handleLieDetect} disabled={isBusy} />
       </View>
 
-      {isBusy && <LoadingOverlay message="Uploading and analyzing session…" />}
+      {isBusy && <LoadingOverlay message={progressMessage} />}
     </SafeAreaView>
   );
 };
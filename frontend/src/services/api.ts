@@ -1,6 +1,9 @@
 import { env } from '@/config/env';
 import {
+  JobResponse,
+  LieDetectPartial,
   LieDetectResponse,
+  LieDetectStreamEvent,
   ParticipantRole,
   TranscriptResponse,
   UploadMediaResponse
@@ -11,6 +14,9 @@ const jsonHeaders = {
   'Content-Type': 'application/json'
 };
 
+const JOB_WAIT_S = 25;
+const NDJSON = 'application/x-ndjson';
+
 const handleResponse = async <T>(response: Response): Promise<T> => {
   if (!response.ok) {
     const errorBody = await response.text();
@@ -19,6 +25,114 @@ const handleResponse = async <T>(response: Response): Promise<T> => {
   return response.json() as Promise<T>;
 };
 
+const isJob = <T>(body: JobResponse<T> | T): body is JobResponse<T> =>
+  typeof body === 'object' && body !== null && 'jobId' in body;
+
+// With background jobs enabled the backend answers with a job to long-poll until it settles;
+// otherwise (e.g. on Lambda) the response already is the result. With onPartial, each poll
+// returns as soon as the job changes so partial results are shown as they land.
+const awaitJob = async <T>(
+  response: Response,
+  onPartial?: (partial: LieDetectPartial) => void
+): Promise<T> => settleJob(await handleResponse<JobResponse<T> | T>(response), onPartial);
+
+const settleJob = async <T>(
+  body: JobResponse<T> | T,
+  onPartial?: (partial: LieDetectPartial) => void
+): Promise<T> => {
+  if (!isJob(body)) {
+    return body;
+  }
+  let job = body;
+  while (job.status === 'queued' || job.status === 'running') {
+    if (onPartial && job.partial) {
+      onPartial(job.partial);
+    }
+    const since = onPartial ? `&version=${job.version}` : '';
+    const poll = await fetch(`${env.apiBaseUrl}/jobs/${job.jobId}?wait=${JOB_WAIT_S}${since}`, {
+      headers: { Accept: 'application/json' }
+    });
+    job = await handleResponse<JobResponse<T>>(poll);
+  }
+  if (job.status === 'failed' || !job.result) {
+    throw new Error(`Job ${job.kind} failed: ${job.error ?? 'no result'}`);
+  }
+  return job.result;
+};
+
+// Inline mode (jobs off) streams one NDJSON event per line when asked. React Native's fetch
+// does not expose the body as a stream, so the lines are read from XHR progress events. A job
+// or plain JSON answer (jobs on, or an older backend) falls back to settleJob.
+const streamLieDetect = (
+  sessionId: string,
+  onPartial: (partial: LieDetectPartial) => void
+): Promise<LieDetectResponse> =>
+  new Promise((resolve, reject) => {
+    const xhr = new XMLHttpRequest();
+    const partial: LieDetectPartial = { endpoints: {} };
+    let consumed = 0;
+    let settled = false;
+
+    const isStream = () => (xhr.getResponseHeader('Content-Type') ?? '').startsWith(NDJSON);
+
+    const handleEvent = (line: string) => {
+      const { event, data } = JSON.parse(line) as LieDetectStreamEvent;
+      if (event === 'endpoint') {
+        partial.endpoints = { ...partial.endpoints, [data.name]: data };
+        onPartial({ ...partial });
+      } else if (event === 'vector') {
+        partial.comparisonVector = data.comparisonVector;
+        onPartial({ ...partial });
+      } else if (event === 'summary') {
+        settled = true;
+        resolve({ sessionId, summary: data });
+      } else {
+        settled = true;
+        reject(new Error(`Lie detection failed: ${data.error}`));
+      }
+    };
+
+    const drain = () => {
+      const end = xhr.responseText.lastIndexOf('\n') + 1;
+      if (end <= consumed) {
+        return;
+      }
+      const lines = xhr.responseText.slice(consumed, end).split('\n');
+      consumed = end;
+      lines.filter(line => line.trim()).forEach(handleEvent);
+    };
+
+    xhr.onprogress = () => {
+      if (xhr.status === 200 && isStream()) {
+        drain();
+      }
+    };
+    xhr.onerror = () => reject(new Error('API request failed'));
+    xhr.onload = () => {
+      if (xhr.status < 200 || xhr.status >= 300) {
+        reject(new Error(`API ${xhr.status}: ${xhr.responseText}`));
+        return;
+      }
+      try {
+        if (!isStream()) {
+          settleJob<LieDetectResponse>(JSON.parse(xhr.responseText), onPartial).then(resolve, reject);
+          return;
+        }
+        drain();
+        if (!settled) {
+          reject(new Error('Lie detection stream ended without a result'));
+        }
+      } catch (error) {
+        reject(error);
+      }
+    };
+
+    xhr.open('POST', `${env.apiBaseUrl}/liedetect`);
+    xhr.setRequestHeader('Accept', `${NDJSON}, application/json;q=0.9`);
+    xhr.setRequestHeader('Content-Type', 'application/json');
+    xhr.send(JSON.stringify({ sessionId }));
+  });
+
 export const uploadSessionMedia = async (
   videoUri: string,
   role: ParticipantRole,
@@ -44,14 +158,20 @@ export const uploadSessionMedia = async (
   return handleResponse<UploadMediaResponse>(response);
 };
 
-export const runLieDetect = async (sessionId: string): Promise<LieDetectResponse> => {
+export const runLieDetect = async (
+  sessionId: string,
+  onPartial?: (partial: LieDetectPartial) => void
+): Promise<LieDetectResponse> => {
+  if (onPartial) {
+    return streamLieDetect(sessionId, onPartial);
+  }
   const response = await fetch(`${env.apiBaseUrl}/liedetect`, {
     method: 'POST',
     headers: jsonHeaders,
     body: JSON.stringify({ sessionId })
   });
 
-  return handleResponse<LieDetectResponse>(response);
+  return awaitJob<LieDetectResponse>(response, onPartial);
 };
 
 export const getTranscript = async (sessionId: string): Promise<TranscriptResponse> => {
@@ -61,6 +181,6 @@ export const getTranscript = async (sessionId: string): Promise<TranscriptRespon
     body: JSON.stringify({ sessionId })
   });
 
-  return handleResponse<TranscriptResponse>(response);
+  return awaitJob<TranscriptResponse>(response);
 };
 
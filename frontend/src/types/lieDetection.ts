@@ -30,3 +30,39 @@ export type TranscriptResponse = {
   summary?: LieDetectSummary | null;
 };
 
+
+export type EndpointScore = {
+  name: 'audio' | 'macro' | 'micro';
+  lieScore: number;
+  emotionVector: number[];
+  latencyMs: number;
+  error?: string;
+};
+
+export type LieDetectPartial = {
+  endpoints: Partial<Record<EndpointScore['name'], EndpointScore>>;
+  comparisonVector?: number[];
+};
+
+// One line of the inline /liedetect stream (Accept: application/x-ndjson); the stream ends
+// with `summary` or `error`.
+export type LieDetectStreamEvent =
+  | { event: 'endpoint'; data: EndpointScore }
+  | { event: 'vector'; data: { comparisonVector: number[] } }
+  | { event: 'summary'; data: LieDetectSummary }
+  | { event: 'error'; data: { error: string } };
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export type JobResponse<T> = {
+  jobId: string;
+  kind: 'liedetect' | 'transcript';
+  sessionId: string;
+  status: JobStatus;
+  stage: string | null;
+  progress: number;
+  version: number;
+  partial: LieDetectPartial | null;
+  result: T | null;
+  error: string | null;
+};
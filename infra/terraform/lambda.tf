@@ -6,10 +6,15 @@ resource "aws_lambda_function" "liedetect" {
   filename      = var.lambda_artifact_path
   timeout       = 60
   memory_size   = 1024
+  # Transcription extracts and segments audio with ffmpeg, found on PATH under /opt/bin when
+  # the layer is attached. Without it the backend uploads whole files to Whisper instead.
+  layers = var.ffmpeg_layer_arn == null ? [] : [var.ffmpeg_layer_arn]
 
   environment {
     variables = {
       FLASK_ENV            = "production"
+      # Lambda has no long-lived process for job worker threads; requests run the work inline.
+      JOBS_ENABLED         = "false"
       AWS_REGION           = var.aws_region
       S3_BUCKET_NAME       = aws_s3_bucket.media.bucket
       AUDIO_MODEL_ENDPOINT = var.audio_endpoint_name
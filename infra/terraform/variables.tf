@@ -35,3 +35,9 @@ variable "openai_api_key" {
   description = "OpenAI API key for Whisper/LieLLM"
   sensitive   = true
 }
+
+variable "ffmpeg_layer_arn" {
+  type        = string
+  description = "ARN of a Lambda layer providing a static ffmpeg binary in /opt/bin (optional)"
+  default     = null
+}
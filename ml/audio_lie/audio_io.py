@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from .config import config
+
+
+def decode(path: Path, offset_s: float = 0.0, duration_s: float | None = None) -> np.ndarray:
+    """Decode ``[offset_s, offset_s + duration_s)`` of ``path`` to mono float32 at ``config.sample_rate``.
+
+    Formats libsndfile understands (wav, flac, ogg, mp3) are read directly, seeking to the
+    requested range, and resampled with ``config.resampler``. Containers it cannot open
+    (mp4, webm, ...) are piped through ffmpeg, which decodes and resamples in one pass,
+    falling back to ``librosa.load`` when ffmpeg is not installed.
+    """
+    try:
+        return _decode_soundfile(path, offset_s, duration_s)
+    except sf.LibsndfileError:
+        pass
+    if shutil.which('ffmpeg'):
+        return _decode_ffmpeg(path, offset_s, duration_s)
+    signal, _ = librosa.load(path, sr=config.sample_rate, offset=offset_s, duration=duration_s, res_type=config.resampler)
+    return signal.astype(np.float32, copy=False)
+
+
+def _decode_soundfile(path: Path, offset_s: float, duration_s: float | None) -> np.ndarray:
+    with sf.SoundFile(str(path)) as audio:
+        native_rate = audio.samplerate
+        start = int(offset_s * native_rate)
+        if start:
+            audio.seek(min(start, audio.frames))
+        frames = -1 if duration_s is None else int(duration_s * native_rate)
+        signal = audio.read(frames, dtype='float32', always_2d=True).mean(axis=1)
+    if native_rate != config.sample_rate:
+        signal = librosa.resample(signal, orig_sr=native_rate, target_sr=config.sample_rate, res_type=config.resampler)
+    return signal.astype(np.float32, copy=False)
+
+
+def _decode_ffmpeg(path: Path, offset_s: float, duration_s: float | None) -> np.ndarray:
+    command = ['ffmpeg', '-nostdin', '-loglevel', 'error']
+    if offset_s:
+        command += ['-ss', f'{offset_s:.3f}']
+    if duration_s is not None:
+        command += ['-t', f'{duration_s:.3f}']
+    command += ['-i', str(path), '-vn', '-ac', '1', '-ar', str(config.sample_rate), '-f', 'f32le', '-']
+    result = subprocess.run(command, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {path}: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return np.frombuffer(result.stdout, dtype=np.float32).copy()
+
+
+class PcmCache:
+    """Decoded float32 PCM per source file at the target rate, evicted LRU beyond ``max_bytes``.
+
+    Entries are keyed by path, size, mtime, sample rate and resampler, and are memory-mapped
+    on read, so a time range costs only the pages it touches. ``max_bytes <= 0`` disables it.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def entry_path(self, path: Path) -> Path:
+        stat = path.stat()
+        key = f'{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{config.sample_rate}:{config.resampler}'
+        return self.root / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.npy"
+
+    def get(self, path: Path) -> Optional[np.ndarray]:
+        entry = self.entry_path(path)
+        try:
+            pcm = np.load(entry, mmap_mode='r')
+            os.utime(entry)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return pcm
+
+    def load(self, path: Path) -> np.ndarray:
+        """Memory-mapped PCM for ``path``, decoding and storing it on first use."""
+        pcm = self.get(path)
+        if pcm is not None:
+            return pcm
+        entry = self.entry_path(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_file = entry.with_name(f'.{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_file, 'wb') as handle:
+            np.save(handle, decode(path))
+        os.replace(tmp_file, entry)
+        self._account(entry)
+        return np.load(entry, mmap_mode='r')
+
+    def stats(self) -> Dict[str, int]:
+        entries = list(self.root.glob('*.npy')) if self.root.is_dir() else []
+        return {
+            'entries': len(entries),
+            'bytes': sum(entry.stat().st_size for entry in entries if entry.exists()),
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _account(self, entry: Path) -> None:
+        # A running total, seeded by one scan, keeps a store under budget from being globbed on
+        # every load; the directory is only walked again when the total crosses the budget.
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += entry.stat().st_size
+            over = self._bytes is None or self._bytes > self.max_bytes
+        if over:
+            self._enforce_budget(keep=entry)
+
+    def _enforce_budget(self, keep: Path) -> None:
+        entries = []
+        for entry in self.root.glob('*.npy'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry != keep:
+                entry.unlink(missing_ok=True)
+                total -= size
+        with self._lock:
+            self._bytes = total
+
+
+pcm_cache = PcmCache(config.processed_dir / 'pcm_cache', config.pcm_cache_mb * 1024 * 1024)
+
+
+def load_pcm(path: Path, offset_s: float = 0.0, duration_s: float | None = None, use_cache: bool = True) -> np.ndarray:
+    """Mono float32 PCM at ``config.sample_rate`` for a time range of ``path`` (whole file by default).
+
+    With the PCM cache enabled the file is decoded once and later calls slice the cached
+    copy; otherwise only the requested range is decoded. Pass ``use_cache=False`` for
+    throwaway inputs such as downloaded temp files.
+    """
+    if not (use_cache and pcm_cache.enabled):
+        return decode(path, offset_s, duration_s)
+    pcm = pcm_cache.load(path)
+    start = int(offset_s * config.sample_rate)
+    stop = None if duration_s is None else start + int(duration_s * config.sample_rate)
+    return np.array(pcm[start:stop])
@@ -10,10 +10,17 @@ class AudioConfig:
     raw_dataset_dir: Path = Path(os.getenv('AUDIO_DATASET_DIR', 'data/raw/ravdess'))
     processed_dir: Path = Path(os.getenv('AUDIO_PROCESSED_DIR', 'data/processed/audio'))
     sample_rate: int = int(os.getenv('AUDIO_SAMPLE_RATE', '22050'))
+    resampler: str = os.getenv('AUDIO_RESAMPLER', 'soxr_hq')
+    pcm_cache_mb: int = int(os.getenv('AUDIO_PCM_CACHE_MB', '0'))
     n_mfcc: int = int(os.getenv('AUDIO_N_MFCC', '40'))
     frame_length: int = int(os.getenv('AUDIO_FRAME_LENGTH', '2048'))
     hop_length: int = int(os.getenv('AUDIO_HOP_LENGTH', '512'))
+    prepare_workers: int = int(os.getenv('AUDIO_PREPARE_WORKERS', str(os.cpu_count() or 1)))
     batch_size: int = int(os.getenv('AUDIO_BATCH_SIZE', '32'))
+    inference_batch_size: int = int(os.getenv('AUDIO_INFERENCE_BATCH_SIZE', '32'))
+    # Windowed scoring span and hop in seconds; 0 means the model input span and half of it.
+    window_s: float = float(os.getenv('AUDIO_WINDOW_S', '0'))
+    hop_s: float = float(os.getenv('AUDIO_HOP_S', '0'))
     num_epochs: int = int(os.getenv('AUDIO_NUM_EPOCHS', '30'))
     learning_rate: float = float(os.getenv('AUDIO_LEARNING_RATE', '0.001'))
 
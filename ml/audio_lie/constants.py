@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from ml.common.emotions import EMOTIONS, EMOTION_TO_INDEX
+from ml.common.emotions import BAD_EMOTIONS, EMOTIONS, EMOTION_TO_INDEX, GOOD_EMOTIONS  # noqa: F401
 
 EMOTION_CODE_MAP = {
     '01': 'neutral',
@@ -13,9 +13,6 @@ EMOTION_CODE_MAP = {
     '08': 'surprised'
 }
 
-BAD_EMOTIONS = {'angry', 'fearful', 'disgust', 'sad'}
-GOOD_EMOTIONS = {'happy', 'surprised', 'calm', 'neutral'}
-
 EMOTION_INDEX = EMOTION_TO_INDEX
 
 AUDIO_EMOTIONS = EMOTIONS
@@ -3,13 +3,16 @@ from __future__ import annotations
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
 
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
 
 from .config import config
 from .constants import BAD_EMOTIONS, EMOTION_CODE_MAP, EMOTION_INDEX
+from .feature_store import AudioFeatureStore
 from .features import extract_and_pad
 
 
@@ -61,14 +64,28 @@ def load_dataset(directory: Path) -> List[AudioSample]:
 
 
 class AudioEmotionDataset(Dataset):
-    def __init__(self, samples: Iterable[AudioSample], max_frames: int = 200) -> None:
+    """MFCC dataset over RAVDESS samples.
+
+    Without ``store`` every item is extracted from its wav file. With an
+    ``AudioFeatureStore`` built for the samples, items are read from the memory-mapped
+    feature array and an index list (see ``batch_loader``) returns a whole batch at once.
+    """
+
+    def __init__(self, samples: Iterable[AudioSample], max_frames: int = 200, store: AudioFeatureStore | None = None) -> None:
         self.samples = list(samples)
         self.max_frames = max_frames
+        self.store = store
+        if store is not None:
+            self.rows = store.rows_for(sample.path for sample in self.samples)
+            self.labels = torch.tensor([EMOTION_INDEX[sample.emotion] for sample in self.samples], dtype=torch.long)
+            self.lie_scores = torch.tensor([sample.lie_label for sample in self.samples], dtype=torch.float32)
 
     def __len__(self) -> int:
         return len(self.samples)
 
-    def __getitem__(self, index: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    def __getitem__(self, index: Union[int, Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        if self.store is not None:
+            return self._from_store(index)
         sample = self.samples[index]
         features = extract_and_pad(sample.path, self.max_frames)
         tensor = torch.from_numpy(features).unsqueeze(0)  # (1, n_mfcc, frames)
@@ -76,6 +93,23 @@ class AudioEmotionDataset(Dataset):
         lie_score = torch.tensor(sample.lie_label, dtype=torch.float32)
         return tensor, label_index, lie_score
 
+    def _from_store(self, index: Union[int, Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        if isinstance(index, (int, np.integer)):
+            features = np.array(self.store.features[self.rows[index]])
+            return torch.from_numpy(features).unsqueeze(0), self.labels[index], self.lie_scores[index]
+        indices = np.asarray(index)
+        # Read rows in file order; batch order does not matter for SGD.
+        indices = indices[np.argsort(self.rows[indices], kind='stable')]
+        features = np.array(self.store.features[self.rows[indices]])
+        batch = torch.from_numpy(indices)
+        return torch.from_numpy(features).unsqueeze(1), self.labels[batch], self.lie_scores[batch]
+
+
+def batch_loader(dataset: AudioEmotionDataset, batch_size: int, shuffle: bool = False) -> DataLoader:
+    """Loader that hands whole index batches to a store-backed dataset instead of collating single items."""
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
+
 
 def split_samples(samples: List[AudioSample], train_ratio: float = 0.8) -> Tuple[List[AudioSample], List[AudioSample]]:
     count = len(samples)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Set
+
+import numpy as np
+from tqdm import tqdm
+
+from .config import config
+from .features import extract_and_pad
+
+DEFAULT_MAX_FRAMES = 200
+
+
+def feature_params(max_frames: int = DEFAULT_MAX_FRAMES) -> Dict[str, object]:
+    """Every setting that changes the content of a stored MFCC row."""
+    return {
+        'sample_rate': config.sample_rate,
+        'resampler': config.resampler,
+        'n_mfcc': config.n_mfcc,
+        'frame_length': config.frame_length,
+        'hop_length': config.hop_length,
+        'max_frames': max_frames
+    }
+
+
+def params_fingerprint(params: Dict[str, object]) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def source_signature(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _extract_shard(path: str, shard_path: str, max_frames: int) -> None:
+    # Runs in a worker process; the rename makes each finished shard durable on its own.
+    shard = Path(shard_path)
+    tmp_file = shard.with_name(f'.{shard.name}.{os.getpid()}.tmp')
+    with open(tmp_file, 'wb') as handle:
+        np.save(handle, extract_and_pad(Path(path), max_frames))
+    os.replace(tmp_file, shard)
+
+
+class AudioFeatureStore:
+    """Padded MFCCs for a set of audio files in one uncompressed ``.npy`` plus ``index.json``.
+
+    ``build`` runs in stages. ``scan`` stats the sources and ``hash`` digests the ones whose
+    size or mtime changed. ``extract`` computes a shard per missing (content hash, MFCC
+    parameters) pair across worker processes, each written as soon as it is done, so an
+    interrupted run resumes. ``merge`` copies the shards into one memory-mappable array.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or (config.processed_dir / 'feature_store')
+        self.features: np.ndarray | None = None
+        self.rows: Dict[str, int] = {}
+        self.last_build: Dict[str, object] = {}
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / 'index.json'
+
+    def shard_dir(self, params: Dict[str, object]) -> Path:
+        return self.root / 'shards' / params_fingerprint(params)
+
+    def build(self, paths: Iterable[Path], max_frames: int = DEFAULT_MAX_FRAMES, workers: int | None = None) -> AudioFeatureStore:
+        params = feature_params(max_frames)
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        paths = list(dict.fromkeys(str(path) for path in paths))
+        signatures = {path: source_signature(Path(path)) for path in paths}
+        index = self._read_index()
+        known = {
+            entry['path']: entry['sha256']
+            for entry in (index or {}).get('entries', [])
+            if 'sha256' in entry and signatures.get(entry['path']) == {'size': entry['size'], 'mtime_ns': entry['mtime_ns']}
+        }
+        timings['scan'] = _lap(started)
+
+        started = time.perf_counter()
+        digests = {path: known.get(path) or file_digest(Path(path)) for path in paths}
+        timings['hash'] = _lap(started)
+
+        current = index and index['params'] == params and (self.root / index['features']).exists()
+        if current and all(path in known for path in paths):
+            self.last_build = {'files': len(paths), 'computed': 0, 'failed': {}, 'merged': False, 'timings': timings}
+            return self._open(index)
+
+        started = time.perf_counter()
+        shard_dir = self.shard_dir(params)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        pending: Dict[str, str] = {}
+        queued: Set[str] = set()
+        for path in paths:
+            digest = digests[path]
+            # Identical files share one shard.
+            if digest not in queued and not (shard_dir / f'{digest}.npy').exists():
+                pending[path] = digest
+                queued.add(digest)
+        failed = self._extract(pending, shard_dir, max_frames, workers or config.prepare_workers)
+        timings['extract'] = _lap(started)
+        if failed:
+            self.last_build = {'files': len(paths), 'computed': len(pending) - len(failed), 'failed': failed, 'timings': timings}
+            raise RuntimeError(f"MFCC extraction failed for {len(failed)} file(s); finished shards are kept: {sorted(failed)[:5]}")
+
+        started = time.perf_counter()
+        features_name = f'features-{uuid.uuid4().hex}.npy'
+        features = np.lib.format.open_memmap(
+            self.root / features_name, mode='w+', dtype=np.float32, shape=(len(paths), config.n_mfcc, max_frames)
+        )
+        for row, path in enumerate(paths):
+            features[row] = np.load(shard_dir / f'{digests[path]}.npy')
+        features.flush()
+        del features
+
+        new_index = {
+            'params': params,
+            'features': features_name,
+            'entries': [{'path': path, 'sha256': digests[path], **signatures[path]} for path in paths]
+        }
+        # The index names its features file, so swapping the index commits the build atomically.
+        tmp_index = self.index_path.with_name(f'.index.{os.getpid()}.tmp')
+        tmp_index.write_text(json.dumps(new_index), encoding='utf-8')
+        os.replace(tmp_index, self.index_path)
+        if index and index['features'] != features_name:
+            (self.root / index['features']).unlink(missing_ok=True)
+        timings['merge'] = _lap(started)
+
+        self.last_build = {'files': len(paths), 'computed': len(pending), 'failed': {}, 'merged': True, 'timings': timings}
+        return self._open(new_index)
+
+    def _extract(self, pending: Dict[str, str], shard_dir: Path, max_frames: int, workers: int) -> Dict[str, str]:
+        failed: Dict[str, str] = {}
+        if not pending:
+            return failed
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=context) as pool:
+            futures = {
+                pool.submit(_extract_shard, path, str(shard_dir / f'{digest}.npy'), max_frames): path
+                for path, digest in pending.items()
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc='Extracting MFCC', unit='file'):
+                try:
+                    future.result()
+                except Exception as exc:
+                    failed[futures[future]] = str(exc)
+        return failed
+
+    def rows_for(self, paths: Iterable[Path]) -> np.ndarray:
+        return np.array([self.rows[str(path)] for path in paths], dtype=np.int64)
+
+    def _open(self, index: dict) -> AudioFeatureStore:
+        self.features = np.load(self.root / index['features'], mmap_mode='r')
+        self.rows = {entry['path']: row for row, entry in enumerate(index['entries'])}
+        return self
+
+    def _read_index(self) -> dict | None:
+        try:
+            return json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+
+def build_feature_store(
+    paths: Iterable[Path],
+    max_frames: int = DEFAULT_MAX_FRAMES,
+    root: Path | None = None,
+    workers: int | None = None
+) -> AudioFeatureStore:
+    return AudioFeatureStore(root).build(paths, max_frames, workers)
+
+
+def _lap(started: float) -> float:
+    return round(time.perf_counter() - started, 3)
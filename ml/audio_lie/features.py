@@ -1,16 +1,60 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, Tuple
 
 import librosa
 import numpy as np
+import soundfile as sf
 
+from .audio_io import load_pcm
 from .config import config
 
 
-def extract_mfcc(path: Path) -> np.ndarray:
-    signal, _ = librosa.load(path, sr=config.sample_rate)
+def load_signal(path: Path, use_cache: bool = True) -> np.ndarray:
+    return load_pcm(path, use_cache=use_cache)
+
+
+def iter_signal_windows(path: Path, window_s: float, hop_s: float) -> Iterator[Tuple[float, np.ndarray]]:
+    """Yield ``(start_s, mono signal at config.sample_rate)`` for overlapping windows of ``path``.
+
+    Files libsndfile can read are streamed block by block, so memory is bounded by one window
+    regardless of the recording length, and each window is resampled on its own like a
+    standalone clip. Other containers are decoded once through the audio ingest layer and
+    sliced. The PCM cache is deliberately not consulted, so a file's windows are the same
+    whether or not it has been cached.
+    """
+    try:
+        audio = sf.SoundFile(str(path))
+    except sf.LibsndfileError:
+        pcm = load_pcm(path, use_cache=False)
+    else:
+        with audio:
+            yield from _stream_windows(audio, window_s, hop_s)
+        return
+
+    window = max(int(round(window_s * config.sample_rate)), 1)
+    hop = min(max(int(round(hop_s * config.sample_rate)), 1), window)
+    for start in range(0, max(len(pcm) - window + hop, 1), hop):
+        yield start / config.sample_rate, np.array(pcm[start:start + window])
+
+
+def _stream_windows(audio: sf.SoundFile, window_s: float, hop_s: float) -> Iterator[Tuple[float, np.ndarray]]:
+    native_rate = audio.samplerate
+    window = max(int(round(window_s * native_rate)), 1)
+    hop = min(max(int(round(hop_s * native_rate)), 1), window)
+    for index, block in enumerate(audio.blocks(blocksize=window, overlap=window - hop, always_2d=True, dtype='float32')):
+        signal = block.mean(axis=1)
+        if native_rate != config.sample_rate:
+            signal = librosa.resample(signal, orig_sr=native_rate, target_sr=config.sample_rate, res_type=config.resampler)
+        yield index * hop / native_rate, signal
+
+
+def extract_mfcc(path: Path, use_cache: bool = True) -> np.ndarray:
+    return mfcc_from_signal(load_signal(path, use_cache))
+
+
+def mfcc_from_signal(signal: np.ndarray) -> np.ndarray:
     mfcc = librosa.feature.mfcc(
         y=signal,
         sr=config.sample_rate,
@@ -30,6 +74,6 @@ def pad_features(features: np.ndarray, max_frames: int = 200) -> np.ndarray:
     return np.pad(features, ((0, 0), (0, pad_width)), mode='constant')
 
 
-def extract_and_pad(path: Path, max_frames: int = 200) -> np.ndarray:
-    mfcc = extract_mfcc(path)
+def extract_and_pad(path: Path, max_frames: int = 200, use_cache: bool = True) -> np.ndarray:
+    mfcc = extract_mfcc(path, use_cache)
     return pad_features(mfcc, max_frames)
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List
 
+import numpy as np
 import torch
 
 from .config import config
-from .constants import BAD_EMOTIONS, EMOTION_INDEX
+from ml.common.scoring import lie_score, lie_scores
+from .constants import EMOTION_INDEX
 from .dataset import parse_filename
-from .features import extract_and_pad
+from .features import extract_and_pad, iter_signal_windows, mfcc_from_signal, pad_features
 from .model import AudioEmotionNet
 
+MAX_FRAMES = 200
+
 
 def load_model(weights_path: Path | None = None) -> AudioEmotionNet:
     model = AudioEmotionNet(num_emotions=len(EMOTION_INDEX))
@@ -22,33 +27,115 @@ def load_model(weights_path: Path | None = None) -> AudioEmotionNet:
     return model
 
 
+class AudioInferenceEngine:
+    """Scores many clips, or many windows of one long clip, with one loaded model in padded batches."""
+
+    def __init__(
+        self,
+        model: AudioEmotionNet | None = None,
+        batch_size: int = config.inference_batch_size,
+        max_frames: int = MAX_FRAMES
+    ) -> None:
+        self.model = model or load_model()
+        self.model.eval()
+        self.batch_size = max(batch_size, 1)
+        self.max_frames = max_frames
+        # One throwaway pass so the first real request does not pay for allocator and kernel setup.
+        self._run_batch([np.zeros((config.n_mfcc, max_frames), dtype=np.float32)])
+
+    def _run_batch(self, features: List[np.ndarray]) -> torch.Tensor:
+        batch = torch.from_numpy(np.stack([pad_features(item, self.max_frames) for item in features])).unsqueeze(1)
+        with torch.inference_mode():
+            return self.model.predict_emotion_vector(batch)
+
+    def predict_features(self, features: Iterable[np.ndarray]) -> torch.Tensor:
+        """Emotion probabilities (N, emotions) for MFCC matrices of any length."""
+        batches: List[torch.Tensor] = []
+        pending: List[np.ndarray] = []
+        for item in features:
+            pending.append(item)
+            if len(pending) == self.batch_size:
+                batches.append(self._run_batch(pending))
+                pending = []
+        if pending:
+            batches.append(self._run_batch(pending))
+        return torch.cat(batches) if batches else torch.zeros(0, len(EMOTION_INDEX))
+
+    def analyze_clips(self, paths: Iterable[Path]) -> List[Dict[str, object]]:
+        """One ``{'emotion_vector', 'lie_score'}`` per clip, in input order."""
+        probabilities = self.predict_features(extract_and_pad(Path(path), self.max_frames) for path in paths)
+        return _results(probabilities)
+
+    def analyze_windows(self, path: Path, window_s: float | None = None, hop_s: float | None = None) -> Dict[str, object]:
+        """Score a long recording as a time series of overlapping windows.
+
+        Audio is streamed from disk one window at a time (see ``iter_signal_windows``). The
+        window defaults to the model input span (``max_frames`` MFCC frames) and the hop to
+        half of it. Returns per-window results plus the mean vector and score summaries.
+        """
+        window_s = window_s or self.max_frames * config.hop_length / config.sample_rate
+        hop_s = hop_s or window_s / 2
+        starts: List[float] = []
+
+        def windows() -> Iterator[np.ndarray]:
+            for start_s, signal in iter_signal_windows(path, window_s, hop_s):
+                starts.append(start_s)
+                yield mfcc_from_signal(signal)
+
+        probabilities = self.predict_features(windows())
+        results = _results(probabilities)
+        if not results:
+            return {'emotion_vector': [0.0] * len(EMOTION_INDEX), 'lie_score': 0.0, 'max_lie_score': 0.0, 'peak_s': None, 'windows': []}
+        scores = [result['lie_score'] for result in results]
+        peak = int(np.argmax(scores))
+        return {
+            'emotion_vector': probabilities.mean(dim=0).tolist(),
+            'lie_score': round(float(np.mean(scores)), 4),
+            'max_lie_score': scores[peak],
+            'peak_s': round(starts[peak], 3),
+            'windows': [
+                {'start_s': round(start, 3), 'end_s': round(start + window_s, 3), **result}
+                for start, result in zip(starts, results)
+            ]
+        }
+
+
+@lru_cache(maxsize=1)
+def default_engine() -> AudioInferenceEngine:
+    return AudioInferenceEngine()
+
+
+def _results(probabilities: torch.Tensor) -> List[Dict[str, object]]:
+    scores = lie_scores(probabilities)
+    return [
+        {'emotion_vector': vector, 'lie_score': round(float(score), 4)}
+        for vector, score in zip(probabilities.tolist(), scores)
+    ]
+
+
 def emotion_vector_from_audio(path: Path, model: AudioEmotionNet | None = None) -> torch.Tensor:
-    model = model or load_model()
-    features = extract_and_pad(path)
-    tensor = torch.from_numpy(features).unsqueeze(0).unsqueeze(0)
-    with torch.no_grad():
-        probs = model.predict_emotion_vector(tensor)
-    return probs.squeeze(0)
+    if model is None:
+        return default_engine().predict_features([extract_and_pad(path)])[0]
+    tensor = torch.from_numpy(extract_and_pad(path)).unsqueeze(0).unsqueeze(0)
+    with torch.inference_mode():
+        return model.predict_emotion_vector(tensor).squeeze(0)
 
 
 def compute_lie_score(vector: torch.Tensor) -> float:
-    emotion_list = sorted(EMOTION_INDEX.keys())
-    score = 0.0
-    for idx, emotion in enumerate(emotion_list):
-        weight = 1.0 if emotion in BAD_EMOTIONS else 0.5
-        score += weight * float(vector[idx])
-    max_score = len(BAD_EMOTIONS) * 1.0 + (len(emotion_list) - len(BAD_EMOTIONS)) * 0.5
-    return round(score / max_score, 4)
+    return lie_score(vector)
+
+
+def analyze_recording(path: Path, window_s: float | None = None, hop_s: float | None = None) -> Dict[str, object]:
+    """Windowed analysis of a long recording with the default engine."""
+    return default_engine().analyze_windows(path, window_s, hop_s)
 
 
 def analyze_file(path: Path) -> Dict[str, object]:
-    model = load_model()
-    vector = emotion_vector_from_audio(path, model)
-    lie_score = compute_lie_score(vector)
+    result = default_engine().analyze_clips([path])[0]
     metadata = parse_filename(path)
     return {
-        'emotion_vector': vector.tolist(),
-        'lie_score': lie_score,
+        'emotion_vector': result['emotion_vector'],
+        'lie_score': result['lie_score'],
         'metadata': {
             'emotion': metadata.emotion,
             'intensity': metadata.intensity,
@@ -1,37 +1,34 @@
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
 
-import numpy as np
-from tqdm import tqdm
-
 from .config import config
 from .dataset import load_dataset
-from .features import extract_and_pad
+from .feature_store import build_feature_store
 
 
-def prepare() -> Path:
+def prepare(workers: int | None = None) -> Path:
     samples = load_dataset(config.raw_dataset_dir)
-    features = []
-    labels = []
-    for sample in tqdm(samples, desc='Extracting MFCC', unit='file'):
-        features.append(extract_and_pad(sample.path))
-        labels.append({
+    store = build_feature_store((sample.path for sample in samples), workers=workers)
+    labels = [
+        {
             'path': str(sample.path),
             'emotion': sample.emotion,
             'lie_label': sample.lie_label
-        })
-
-    feature_array = np.stack(features)
-    npz_path = config.processed_dir / 'audio_features.npz'
-    np.savez_compressed(npz_path, features=feature_array, metadata=labels)
+        }
+        for sample in samples
+    ]
 
     meta_path = config.processed_dir / 'audio_metadata.json'
     meta_path.write_text(json.dumps(labels, indent=2), encoding='utf-8')
-    return npz_path
+    print(json.dumps(store.last_build, indent=2))
+    return store.index_path
 
 
 if __name__ == '__main__':
-    output = prepare()
+    parser = argparse.ArgumentParser(description='Extract RAVDESS MFCCs into the audio feature store')
+    parser.add_argument('--workers', type=int, default=config.prepare_workers)
+    output = prepare(parser.parse_args().workers)
     print(f'Saved features to {output}')
@@ -11,7 +11,8 @@ from tqdm import tqdm
 
 from .config import config
 from .constants import BAD_EMOTIONS, EMOTION_INDEX
-from .dataset import AudioEmotionDataset, load_dataset, split_samples
+from .dataset import AudioEmotionDataset, batch_loader, load_dataset, split_samples
+from .feature_store import build_feature_store
 from .model import AudioEmotionNet
 
 
@@ -20,8 +21,10 @@ def train() -> Dict[str, float]:
     samples = load_dataset(config.raw_dataset_dir)
     train_samples, val_samples = split_samples(samples)
 
-    train_loader = DataLoader(AudioEmotionDataset(train_samples), batch_size=config.batch_size, shuffle=True)
-    val_loader = DataLoader(AudioEmotionDataset(val_samples), batch_size=config.batch_size)
+    # MFCCs are extracted once into the feature store; epochs then only read memory-mapped rows.
+    store = build_feature_store(sample.path for sample in samples)
+    train_loader = batch_loader(AudioEmotionDataset(train_samples, store=store), config.batch_size, shuffle=True)
+    val_loader = batch_loader(AudioEmotionDataset(val_samples, store=store), config.batch_size)
 
     model = AudioEmotionNet(num_emotions=len(EMOTION_INDEX)).to(device)
     optimizer = torch.optim.Adam(model.parameters(), lr=config.learning_rate)
@@ -0,0 +1,50 @@
+"""CPU clips/sec of the old per-call audio path vs AudioInferenceEngine at several batch sizes.
+
+Run from the repository root: ``python -m ml.benchmarks.audio_inference --clips 256``.
+MFCC matrices are synthetic so the numbers isolate model loading and batching.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from ml.audio_lie.config import config
+from ml.audio_lie.inference import MAX_FRAMES, AudioInferenceEngine, load_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clips', type=int, default=256)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--threads', type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    rng = np.random.default_rng(0)
+    # Mixed lengths exercise the padding path like real clips do.
+    clips = [rng.standard_normal((config.n_mfcc, int(rng.integers(100, MAX_FRAMES + 1))), dtype=np.float32) for _ in range(args.clips)]
+
+    started = time.perf_counter()
+    for clip in clips:
+        # What analyze_file used to do per call: build/load the model, then score one clip.
+        model = load_model()
+        padded = np.pad(clip, ((0, 0), (0, MAX_FRAMES - clip.shape[1])))
+        with torch.no_grad():
+            model.predict_emotion_vector(torch.from_numpy(padded)[None, None])
+    legacy = args.clips / (time.perf_counter() - started)
+    print(f'{"per-call load (bs=1)":<24}{legacy:>10.1f} clips/s')
+
+    model = load_model()
+    for batch_size in args.batch_sizes:
+        engine = AudioInferenceEngine(model, batch_size=batch_size)
+        started = time.perf_counter()
+        engine.predict_features(iter(clips))
+        rate = args.clips / (time.perf_counter() - started)
+        print(f'{f"engine (bs={batch_size})":<24}{rate:>10.1f} clips/s  x{rate / legacy:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""FER2013 loader throughput: per-row CSV parsing vs the memory-mapped uint8 store.
+
+Run from the repository root: ``python -m ml.benchmarks.fer_loader --csv data/raw/fer2013/fer2013.csv``.
+Without ``--csv`` a synthetic CSV of ``--rows`` images is generated first. Both paths
+include the batch transform, so the numbers are what a training epoch sees on CPU.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader, Dataset
+from torchvision import transforms
+
+from ml.video_lie.config import config
+from ml.video_lie.macro.dataset import IMAGE_SIDE, Fer2013Dataset, convert_fer2013
+from ml.video_lie.macro.train import batch_loader, build_batch_transform, to_model_input
+
+
+class LegacyFer2013Dataset(Dataset):
+    """The original string-parsing dataset, kept here as the baseline."""
+
+    def __init__(self, csv_path: Path, usage: str = 'Training') -> None:
+        subset = pd.read_csv(csv_path)
+        subset = subset[subset['Usage'] == usage]
+        self.pixels = subset['pixels'].tolist()
+        self.labels = subset['emotion'].tolist()
+
+    def __len__(self) -> int:
+        return len(self.pixels)
+
+    def __getitem__(self, index: int):
+        image = np.fromstring(self.pixels[index], dtype=np.float32, sep=' ').reshape(IMAGE_SIDE, IMAGE_SIDE) / 255.0
+        image = np.stack([image, image, image], axis=0)
+        return torch.from_numpy(image), torch.tensor(self.labels[index], dtype=torch.long)
+
+
+def synthesize(path: Path, rows: int) -> Path:
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (rows, IMAGE_SIDE * IMAGE_SIDE))
+    pd.DataFrame({
+        'emotion': rng.integers(0, 7, rows),
+        'pixels': [' '.join(map(str, row)) for row in pixels],
+        'Usage': 'Training'
+    }).to_csv(path, index=False)
+    return path
+
+
+def time_epoch(loader, prepare) -> float:
+    started = time.perf_counter()
+    for inputs, _ in loader:
+        prepare(inputs)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', type=Path)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=config.batch_size)
+    parser.add_argument('--epochs', type=int, default=2)
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = args.csv or synthesize(Path(tmpdir) / 'fer2013.csv', args.rows)
+        store_dir = Path(tmpdir) / 'store'
+
+        started = time.perf_counter()
+        convert_fer2013(csv_path, store_dir)
+        print(f'one-time conversion: {time.perf_counter() - started:.2f}s')
+
+        legacy_transform = transforms.Compose([
+            transforms.Resize((config.image_size, config.image_size)),
+            transforms.RandomHorizontalFlip(),
+            transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
+        ])
+        legacy = DataLoader(LegacyFer2013Dataset(csv_path), batch_size=args.batch_size, shuffle=True)
+        batch_transform = build_batch_transform()
+        store = batch_loader(Fer2013Dataset(csv_path, store_dir=store_dir), shuffle=True, batch_size=args.batch_size)
+
+        images = len(legacy.dataset)
+        print(f"{'epoch':>6}{'csv img/s':>14}{'memmap img/s':>14}{'speedup':>9}")
+        for epoch in range(1, args.epochs + 1):
+            legacy_s = time_epoch(legacy, legacy_transform)
+            store_s = time_epoch(store, lambda batch: to_model_input(batch, batch_transform, device))
+            print(f'{epoch:>6}{images / legacy_s:>14.0f}{images / store_s:>14.0f}{legacy_s / store_s:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
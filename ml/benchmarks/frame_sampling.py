@@ -0,0 +1,56 @@
+"""Decode time of each frame sampling mode at several sampling strides.
+
+Run from the repository root: ``python -m ml.benchmarks.frame_sampling --video long.mp4``.
+Without ``--video`` a synthetic clip of ``--seconds`` is generated first.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ml.video_lie.frame_extractor import SAMPLING_MODES, iter_sampled_frames
+
+
+def synthesize(path: Path, seconds: int, fps: int = 30, size: tuple = (640, 480)) -> Path:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    for idx in range(seconds * fps):
+        writer.write(np.roll(base, idx * 4, axis=1))
+    writer.release()
+    return path
+
+
+def time_mode(video: Path, step: int, mode: str) -> tuple[float, int]:
+    capture = cv2.VideoCapture(str(video))
+    started = time.perf_counter()
+    count = sum(1 for _ in iter_sampled_frames(capture, step, mode))
+    elapsed = time.perf_counter() - started
+    capture.release()
+    return elapsed, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--video', type=Path)
+    parser.add_argument('--seconds', type=int, default=120)
+    parser.add_argument('--steps', type=int, nargs='+', default=[1, 2, 5, 15, 30])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video = args.video or synthesize(Path(tmpdir) / 'synthetic.mp4', args.seconds)
+        print(f"{'step':>6}" + ''.join(f'{mode:>14}' for mode in SAMPLING_MODES) + f"{'frames':>9}")
+        for step in args.steps:
+            timings = {mode: time_mode(video, step, mode) for mode in SAMPLING_MODES}
+            baseline = timings['decode'][0]
+            cells = ''.join(f'{elapsed:>8.2f}s x{baseline / elapsed:<4.1f}' for elapsed, _ in timings.values())
+            print(f'{step:>6}{cells}{timings["decode"][1]:>9}')
+
+
+if __name__ == '__main__':
+    main()
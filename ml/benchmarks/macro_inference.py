@@ -0,0 +1,55 @@
+"""CPU frames/sec of per-frame analyze_frame vs the batched MacroInferenceEngine.
+
+Run from the repository root: ``python -m ml.benchmarks.macro_inference --frames 128``.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from ml.video_lie.config import config
+from ml.video_lie.macro.inference import MacroInferenceEngine, analyze_frame
+from ml.video_lie.macro.model import create_macro_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=128)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--threads', type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    model = create_macro_model(pretrained=False).eval()
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (config.image_size, config.image_size, 3), dtype=np.uint8) for _ in range(args.frames)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for idx, frame in enumerate(frames):
+            path = Path(tmpdir) / f'{idx:06d}.jpg'
+            cv2.imwrite(str(path), frame)
+            paths.append(path)
+        started = time.perf_counter()
+        for path in paths:
+            analyze_frame(path, model)
+        legacy = args.frames / (time.perf_counter() - started)
+    print(f'{"analyze_frame (jpeg, bs=1)":<28}{legacy:>10.1f} frames/s')
+
+    for batch_size in args.batch_sizes:
+        engine = MacroInferenceEngine(model, batch_size=batch_size)
+        engine.predict(frames[:batch_size])
+        started = time.perf_counter()
+        engine.predict(iter(frames))
+        rate = args.frames / (time.perf_counter() - started)
+        print(f'{f"engine (bs={batch_size})":<28}{rate:>10.1f} frames/s  x{rate / legacy:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Per-frame vs vectorized MicroLie landmark math: time, peak memory and parity.
+
+Uses synthetic landmark streams so MediaPipe is not needed.
+Run from the repository root: ``python -m ml.benchmarks.micro_features --frames 18000``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, List
+
+import numpy as np
+
+from ml.video_lie.micro.features import (
+    BROW,
+    EYE_CORNERS,
+    FACE_MESH_LANDMARKS,
+    LEFT_EYE,
+    RIGHT_EYE,
+    MicroFeatureAccumulator,
+    MicroFeatures,
+    landmarks_to_array
+)
+
+
+def _legacy_aspect_ratio(landmarks: np.ndarray, indices: List[int]) -> float:
+    p1, p2, p3, p4, p5, p6 = (landmarks[idx] for idx in indices)
+    vertical = np.linalg.norm(p2 - p6) + np.linalg.norm(p3 - p5)
+    horizontal = np.linalg.norm(p1 - p4)
+    return 0.0 if horizontal == 0 else vertical / (2.0 * horizontal)
+
+
+def legacy_features(frames) -> MicroFeatures:
+    """The original per-frame implementation, kept here as the reference."""
+    previous = None
+    deltas, ear_values, brow_values = [], [], []
+    for frame in frames:
+        landmarks = np.array([(lm.x, lm.y, lm.z) for lm in frame])
+        if previous is not None:
+            deltas.append(landmarks - previous)
+            ear_values.append(_legacy_aspect_ratio(landmarks, LEFT_EYE) + _legacy_aspect_ratio(landmarks, RIGHT_EYE))
+            brow = np.mean(landmarks[BROW], axis=0) - np.mean(landmarks[EYE_CORNERS], axis=0)
+            brow_values.append(float(np.linalg.norm(brow)))
+        previous = landmarks
+    return MicroFeatures(
+        landmark_deltas=np.mean(np.abs(np.stack(deltas)), axis=0).flatten().astype(np.float32),
+        eye_aspect_ratio_variance=float(np.var(ear_values)),
+        brow_lift_variance=float(np.var(brow_values))
+    )
+
+
+def vectorized_features(frames) -> MicroFeatures:
+    accumulator = MicroFeatureAccumulator()
+    for frame in frames:
+        accumulator.add(landmarks_to_array(frame))
+    return accumulator.finalize()
+
+
+def synthetic_frames(count: int, seed: int = 0):
+    """Yield MediaPipe-like landmark lists following a small random walk."""
+    rng = np.random.default_rng(seed)
+    points = rng.random((FACE_MESH_LANDMARKS, 3))
+    for _ in range(count):
+        points = points + rng.normal(scale=1e-3, size=points.shape)
+        yield [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()]
+
+
+def measure(fn: Callable, frames: int) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(synthetic_frames(frames))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, nargs='+', default=[900, 9000])
+    args = parser.parse_args()
+
+    print(f"{'frames':>8}{'impl':>12}{'seconds':>10}{'peak MiB':>10}")
+    for frames in args.frames:
+        legacy, legacy_s, legacy_peak = measure(legacy_features, frames)
+        fast, fast_s, fast_peak = measure(vectorized_features, frames)
+        print(f'{frames:>8}{"per-frame":>12}{legacy_s:>10.2f}{legacy_peak / 2**20:>10.1f}')
+        print(f'{frames:>8}{"vectorized":>12}{fast_s:>10.2f}{fast_peak / 2**20:>10.1f}')
+        drift = max(
+            float(np.abs(legacy.landmark_deltas - fast.landmark_deltas).max()),
+            abs(legacy.eye_aspect_ratio_variance - fast.eye_aspect_ratio_variance),
+            abs(legacy.brow_lift_variance - fast.brow_lift_variance)
+        )
+        print(f'{"":>8}{"max drift":>12}{drift:>10.2e}')
+
+
+if __name__ == '__main__':
+    main()
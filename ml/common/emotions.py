@@ -12,3 +12,7 @@ EMOTIONS = [
 ]
 
 EMOTION_TO_INDEX = {emotion: idx for idx, emotion in enumerate(EMOTIONS)}
+
+# Emotions that count towards deception in the lie-score weighting.
+BAD_EMOTIONS = {'angry', 'fearful', 'disgust', 'sad'}
+GOOD_EMOTIONS = {'happy', 'surprised', 'calm', 'neutral'}
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import torch
+
+from .emotions import BAD_EMOTIONS, EMOTIONS
+
+BAD_WEIGHT = 1.0
+GOOD_WEIGHT = 0.5
+
+# Weight per column of the canonical emotion vector, normalised to sum to 1.
+LIE_WEIGHTS = torch.tensor([BAD_WEIGHT if emotion in BAD_EMOTIONS else GOOD_WEIGHT for emotion in EMOTIONS], dtype=torch.float64)
+LIE_WEIGHTS = LIE_WEIGHTS / LIE_WEIGHTS.sum()
+
+
+def lie_scores(probabilities: torch.Tensor) -> torch.Tensor:
+    """Lie score for each row of an (N, emotions) probability batch, in one float64 matmul."""
+    return probabilities.to(LIE_WEIGHTS.dtype) @ LIE_WEIGHTS
+
+
+def lie_score(vector: Union[torch.Tensor, Sequence[float]]) -> float:
+    """Lie score of a single emotion vector, rounded to 4 places."""
+    return round(float(lie_scores(torch.as_tensor(vector).unsqueeze(0))[0]), 4)
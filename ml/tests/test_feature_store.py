@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip('soundfile')
+
+from ml.audio_lie.config import config
+from ml.audio_lie.feature_store import AudioFeatureStore
+
+
+@pytest.fixture
+def clips(tmp_path):
+    paths = []
+    for index in range(2):
+        path = tmp_path / f'clip-{index}.wav'
+        sf.write(path, np.random.default_rng(index).uniform(-0.5, 0.5, 44100).astype(np.float32), 44100)
+        paths.append(path)
+    return paths
+
+
+def test_changing_resampler_rebuilds_store(clips, tmp_path, monkeypatch):
+    store = AudioFeatureStore(tmp_path / 'store')
+    store.build(clips, max_frames=20, workers=1)
+    assert store.last_build['computed'] == 2
+
+    store.build(clips, max_frames=20, workers=1)
+    assert store.last_build['computed'] == 0 and not store.last_build['merged']
+
+    # Extraction runs in spawned workers, which read the setting from the environment.
+    monkeypatch.setattr(config, 'resampler', 'polyphase')
+    monkeypatch.setenv('AUDIO_RESAMPLER', 'polyphase')
+    store.build(clips, max_frames=20, workers=1)
+    assert store.last_build['computed'] == 2 and store.last_build['merged']
+    assert len(list((tmp_path / 'store' / 'shards').iterdir())) == 2
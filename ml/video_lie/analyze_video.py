@@ -1,16 +1,16 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
 import numpy as np
 
-from ml.common.vector_ops import expand_emotion_vector
-from ml.common.emotions import EMOTIONS
 from .config import config
-from .frame_extractor import extract_frames
-from .macro.inference import analyze_frame, load_macro_model
-from .micro.inference import load_micro_model, predict_lie_score
+from .frame_extractor import FrameConsumer, decode_once, resize_frames
+from .macro.inference import MacroInferenceEngine, load_macro_model
+from .micro.features import DEFAULT_FRAME_STEP, features_from_track, iter_face_landmarks, micro_features_from_frames
+from .micro.inference import load_micro_model, score_micro_features
+from .micro.landmark_store import landmark_store, video_digest
 
 
 def analyze_video(
@@ -18,21 +18,46 @@ def analyze_video(
     macro_weights: Path | None = None,
     micro_weights: Path | None = None
 ) -> Dict[str, object]:
-    frames = extract_frames(video_path)
-    macro_model = load_macro_model(macro_weights)
-
-    macro_vectors: List[List[float]] = []
-    for frame_path in frames:
-        result = analyze_frame(frame_path, macro_model)
-        macro_vectors.append(result['emotion_vector'])
+    engine = MacroInferenceEngine(load_macro_model(macro_weights))
+    micro_assets = load_micro_model(micro_weights or (config.processed_dir / 'micro_model.npz'))
+    debug_dir = config.debug_frames_dir / video_path.stem if config.debug_frames_dir else None
 
-    if macro_vectors:
-        macro_vector = np.mean(np.array(macro_vectors), axis=0).tolist()
+    consumers = [
+        FrameConsumer(
+            'macro',
+            lambda frames: engine.predict(frame for _, frame in resize_frames(frames, config.image_size, debug_dir)),
+            fps=config.frame_rate
+        )
+    ]
+    micro_features = None
+    if landmark_store.enabled:
+        # Stored landmarks skip FaceMesh entirely; otherwise record them while scoring. decode_once
+        # reads every frame in order, so these tracks belong to the sequential frame set.
+        digest = video_digest(video_path)
+        track = landmark_store.load(digest, DEFAULT_FRAME_STEP, 'sequential')
+        if track is not None:
+            micro_features = features_from_track(track)
+        else:
+            consumers.append(FrameConsumer(
+                'micro',
+                lambda frames: features_from_track(
+                    landmark_store.save(digest, DEFAULT_FRAME_STEP, iter_face_landmarks(frame for _, frame in frames), 'sequential')
+                ),
+                frame_step=DEFAULT_FRAME_STEP
+            ))
     else:
-        macro_vector = [0.0] * len(EMOTIONS)
+        consumers.append(FrameConsumer(
+            'micro',
+            lambda frames: micro_features_from_frames(frame for _, frame in frames),
+            frame_step=DEFAULT_FRAME_STEP
+        ))
 
-    micro_assets = load_micro_model(micro_weights or (config.processed_dir / 'micro_model.npz'))
-    micro_score = predict_lie_score(video_path, micro_assets)
+    # One decode feeds every consumer; each samples at its own stride on its own thread.
+    results = decode_once(video_path, consumers)
+    if micro_features is None:
+        micro_features = results['micro']
+    macro_vector = results['macro']['emotion_vector']
+    micro_score = score_micro_features(micro_features, micro_assets)
 
     return {
         'macro_vector': macro_vector,
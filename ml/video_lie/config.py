@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass
@@ -10,10 +11,17 @@ class VideoConfig:
     raw_dataset_dir: Path = Path(os.getenv('VIDEO_DATASET_DIR', 'data/raw/video'))
     processed_dir: Path = Path(os.getenv('VIDEO_PROCESSED_DIR', 'data/processed/video'))
     frame_rate: int = int(os.getenv('VIDEO_FRAME_RATE', '1'))
+    frame_sampling: str = os.getenv('VIDEO_FRAME_SAMPLING', 'grab')
+    micro_workers: int = int(os.getenv('VIDEO_MICRO_WORKERS', str(os.cpu_count() or 1)))
+    fanout_queue_size: int = int(os.getenv('VIDEO_FANOUT_QUEUE_SIZE', '64'))
+    landmark_cache_mb: int = int(os.getenv('VIDEO_LANDMARK_CACHE_MB', '4096'))
+    landmark_cache_dir: Optional[Path] = Path(os.environ['VIDEO_LANDMARK_CACHE_DIR']) if os.getenv('VIDEO_LANDMARK_CACHE_DIR') else None
     image_size: int = int(os.getenv('VIDEO_IMAGE_SIZE', '224'))
     batch_size: int = int(os.getenv('VIDEO_BATCH_SIZE', '32'))
+    inference_batch_size: int = int(os.getenv('VIDEO_INFERENCE_BATCH_SIZE', '32'))
     num_epochs: int = int(os.getenv('VIDEO_NUM_EPOCHS', '40'))
     learning_rate: float = float(os.getenv('VIDEO_LEARNING_RATE', '0.0005'))
+    debug_frames_dir: Optional[Path] = Path(os.environ['VIDEO_DEBUG_FRAMES_DIR']) if os.getenv('VIDEO_DEBUG_FRAMES_DIR') else None
 
     def ensure_dirs(self) -> None:
         self.processed_dir.mkdir(parents=True, exist_ok=True)
@@ -1,17 +1,108 @@
 from __future__ import annotations
 
+import queue
+import threading
+from dataclasses import dataclass
+from functools import reduce
+from math import gcd
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
 
 import cv2
+import numpy as np
 
 from .config import config
 
+SAMPLING_MODES = ('decode', 'grab', 'seek')
+# Below this stride a seek (back to the previous keyframe, then decode forward) costs more than grabbing.
+SEEK_MIN_STEP = 15
+
+
+def sampling_key(frame_step: int, mode: str | None = None) -> str:
+    """Name of the frame set ``iter_sampled_frames`` yields for this stride and mode.
+
+    ``decode`` and ``grab`` return the same decoded frames, so they share ``sequential``;
+    ``seek`` lands on frames produced by seeking, which are only guaranteed to match other
+    seek reads.
+    """
+    mode = mode or config.frame_sampling
+    return 'seek' if mode == 'seek' and max(frame_step, 1) >= SEEK_MIN_STEP else 'sequential'
+
+
+def iter_sampled_frames(capture: cv2.VideoCapture, frame_step: int, mode: str | None = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(frame_index, frame)`` for every ``frame_step``-th frame of an open capture.
+
+    ``decode`` reads every frame. ``grab`` advances with ``grab()`` and only ``retrieve()``s
+    sampled frames, skipping colour conversion and copies for the rest. ``seek`` jumps
+    straight to each sampled index, which pays off for sparse sampling of streams with
+    short keyframe intervals; it falls back to ``grab`` for strides under ``SEEK_MIN_STEP``
+    or when the frame count is unknown.
+    """
+    mode = mode or config.frame_sampling
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown frame sampling mode: {mode}")
+    frame_step = max(frame_step, 1)
+
+    if mode == 'seek' and frame_step >= SEEK_MIN_STEP:
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count > 0:
+            for frame_idx in range(0, frame_count, frame_step):
+                if frame_idx:
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                success, frame = capture.read()
+                if not success:
+                    return
+                yield frame_idx, frame
+            return
+        mode = 'grab'
+
+    frame_idx = 0
+    if mode == 'grab':
+        while capture.grab():
+            if frame_idx % frame_step == 0:
+                success, frame = capture.retrieve()
+                if not success:
+                    return
+                yield frame_idx, frame
+            frame_idx += 1
+        return
+
+    while True:
+        success, frame = capture.read()
+        if not success:
+            return
+        if frame_idx % frame_step == 0:
+            yield frame_idx, frame
+        frame_idx += 1
+
+
+def resize_frames(
+    frames: Iterable[Tuple[int, np.ndarray]],
+    image_size: int | None = None,
+    debug_dir: Path | None = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Resize ``(frame_index, frame)`` pairs to ``image_size``; optionally dump each as a JPEG."""
+    size = image_size or config.image_size
+    if debug_dir:
+        debug_dir.mkdir(parents=True, exist_ok=True)
+    for frame_idx, frame in frames:
+        resized = cv2.resize(frame, (size, size))
+        if debug_dir:
+            cv2.imwrite(str(debug_dir / f'{frame_idx:06d}.jpg'), resized)
+        yield frame_idx, resized
 
-def extract_frames(video_path: Path, output_dir: Path | None = None, fps: int | None = None) -> List[Path]:
-    output_dir = output_dir or (config.processed_dir / 'frames' / video_path.stem)
-    output_dir.mkdir(parents=True, exist_ok=True)
 
+def iter_frames(
+    video_path: Path,
+    fps: int | None = None,
+    image_size: int | None = None,
+    debug_dir: Path | None = None,
+    sampling: str | None = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(frame_index, frame)`` for sampled frames, resized to ``image_size`` (BGR uint8).
+
+    Frames stay in memory; pass ``debug_dir`` to also dump each one as a JPEG.
+    """
     capture = cv2.VideoCapture(str(video_path))
     if not capture.isOpened():
         raise RuntimeError(f"Failed to open video: {video_path}")
@@ -20,18 +111,100 @@ def extract_frames(video_path: Path, output_dir: Path | None = None, fps: int |
     target_fps = fps or config.frame_rate
     frame_interval = max(int(original_fps / target_fps), 1)
 
-    frame_idx = 0
-    saved_frames: List[Path] = []
-    while True:
-        success, frame = capture.read()
-        if not success:
-            break
-        if frame_idx % frame_interval == 0:
-            resized = cv2.resize(frame, (config.image_size, config.image_size))
-            output_path = output_dir / f'{frame_idx:06d}.jpg'
-            cv2.imwrite(str(output_path), resized)
-            saved_frames.append(output_path)
-        frame_idx += 1
+    try:
+        yield from resize_frames(iter_sampled_frames(capture, frame_interval, sampling), image_size, debug_dir)
+    finally:
+        capture.release()
+
+
+def extract_frames(video_path: Path, output_dir: Path | None = None, fps: int | None = None) -> List[Path]:
+    output_dir = output_dir or (config.processed_dir / 'frames' / video_path.stem)
+    return [output_dir / f'{frame_idx:06d}.jpg' for frame_idx, _ in iter_frames(video_path, fps, debug_dir=output_dir)]
+
+
+@dataclass
+class FrameConsumer:
+    """A consumer of ``decode_once``: ``handler`` receives an iterator of ``(frame_index, frame)``.
+
+    The stride is ``frame_step`` frames, or derived from ``fps`` and the source frame rate.
+    Frames are shared between consumers and must not be modified in place.
+    """
+
+    name: str
+    handler: Callable[[Iterator[Tuple[int, np.ndarray]]], Any]
+    frame_step: int | None = None
+    fps: float | None = None
+
+
+_END_OF_STREAM = object()
+
+
+def decode_once(
+    video_path: Path,
+    consumers: Sequence[FrameConsumer],
+    queue_size: int | None = None,
+    sampling: str | None = None
+) -> Dict[str, Any]:
+    """Decode ``video_path`` once and fan frames out to consumers running on their own threads.
+
+    Each consumer is fed through a bounded queue so a slow consumer throttles the decoder
+    instead of buffering the whole clip. Returns ``{consumer.name: handler result}``.
+    """
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+
+    original_fps = capture.get(cv2.CAP_PROP_FPS) or 30
+    steps = {
+        consumer.name: max(consumer.frame_step or int(original_fps / (consumer.fps or config.frame_rate)), 1)
+        for consumer in consumers
+    }
+    queues: Dict[str, queue.Queue] = {consumer.name: queue.Queue(maxsize=queue_size or config.fanout_queue_size) for consumer in consumers}
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+
+    def run(consumer: FrameConsumer) -> None:
+        frames = queues[consumer.name]
+        finished = False
+
+        def stream() -> Iterator[Tuple[int, np.ndarray]]:
+            nonlocal finished
+            while True:
+                item = frames.get()
+                if item is _END_OF_STREAM:
+                    finished = True
+                    return
+                yield item
+
+        try:
+            results[consumer.name] = consumer.handler(stream())
+        except BaseException as exc:
+            errors[consumer.name] = exc
+        finally:
+            # Keep draining so a consumer that stopped early never blocks the decoder.
+            while not finished:
+                finished = frames.get() is _END_OF_STREAM
+
+    threads = [threading.Thread(target=run, args=(consumer,), name=f'frames-{consumer.name}', daemon=True) for consumer in consumers]
+    for thread in threads:
+        thread.start()
+
+    try:
+        # Decode at the coarsest stride that still covers every consumer's samples.
+        base_step = reduce(gcd, steps.values(), 0) or 1
+        for frame_idx, frame in iter_sampled_frames(capture, base_step, sampling):
+            for name, step in steps.items():
+                if frame_idx % step == 0:
+                    queues[name].put((frame_idx, frame))
+    finally:
+        capture.release()
+        for frames in queues.values():
+            frames.put(_END_OF_STREAM)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        name, error = next(iter(errors.items()))
+        raise RuntimeError(f"Frame consumer '{name}' failed: {error}") from error
+    return results
 
-    capture.release()
-    return saved_frames
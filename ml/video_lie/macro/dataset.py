@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
+import os
+import shutil
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -21,22 +24,95 @@ EMOTION_LABELS = {
 }
 
 
+IMAGE_SIDE = 48
+USAGES = ('Training', 'PublicTest', 'PrivateTest')
+_CSV_CHUNK_ROWS = 4096
+
+
+def default_store_dir() -> Path:
+    return config.processed_dir / 'fer2013'
+
+
+def convert_fer2013(csv_path: Path, store_dir: Path | None = None) -> Path:
+    """Decode the FER2013 CSV once into per-usage ``uint8`` (N, 48, 48) image and label ``.npy`` files.
+
+    The conversion is skipped when ``store_dir`` already holds arrays for the same CSV
+    (size and mtime); otherwise it is rebuilt in a staging directory and swapped in.
+    """
+    if not csv_path.exists():
+        raise FileNotFoundError(f"FER2013 csv not found at {csv_path}")
+    store_dir = store_dir or default_store_dir()
+    stat = csv_path.stat()
+    source = {'csv': str(csv_path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    meta_path = store_dir / 'meta.json'
+    if meta_path.exists() and json.loads(meta_path.read_text(encoding='utf-8')).get('source') == source:
+        return store_dir
+
+    counts = {str(usage): int(count) for usage, count in pd.read_csv(csv_path, usecols=['Usage'])['Usage'].value_counts().items()}
+    staging = store_dir.with_name(f'.{store_dir.name}.{os.getpid()}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    images: Dict[str, np.ndarray] = {}
+    labels: Dict[str, np.ndarray] = {}
+    filled = {usage: 0 for usage in counts}
+    try:
+        for usage, count in counts.items():
+            images[usage] = np.lib.format.open_memmap(
+                staging / f'{usage}_images.npy', mode='w+', dtype=np.uint8, shape=(count, IMAGE_SIDE, IMAGE_SIDE)
+            )
+            labels[usage] = np.lib.format.open_memmap(staging / f'{usage}_labels.npy', mode='w+', dtype=np.int64, shape=(count,))
+        for chunk in pd.read_csv(csv_path, chunksize=_CSV_CHUNK_ROWS):
+            for usage, rows in chunk.groupby('Usage', sort=False):
+                start = filled[usage]
+                stop = start + len(rows)
+                pixels = np.fromstring(' '.join(rows['pixels']), dtype=np.uint8, sep=' ')
+                images[usage][start:stop] = pixels.reshape(-1, IMAGE_SIDE, IMAGE_SIDE)
+                labels[usage][start:stop] = rows['emotion'].to_numpy()
+                filled[usage] = stop
+        for array in (*images.values(), *labels.values()):
+            array.flush()
+        images.clear()
+        labels.clear()
+        (staging / 'meta.json').write_text(json.dumps({'source': source, 'counts': counts}, indent=2), encoding='utf-8')
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.replace(staging, store_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return store_dir
+
+
 class Fer2013Dataset(Dataset):
-    def __init__(self, csv_path: Path, usage: str = 'Training') -> None:
-        if not csv_path.exists():
-            raise FileNotFoundError(f"FER2013 csv not found at {csv_path}")
-        df = pd.read_csv(csv_path)
-        subset = df[df['Usage'] == usage]
-        self.pixels = subset['pixels'].tolist()
-        self.labels = subset['emotion'].tolist()
+    """Zero-copy view over one usage split of the converted FER2013 store.
+
+    Items are ``uint8`` (1, 48, 48) images. Indexing with a list of indices (e.g. from a
+    ``BatchSampler`` with ``batch_size=None`` on the loader) returns a whole (B, 1, 48, 48)
+    batch in one memmap read; scaling and 3-channel expansion are left to the batch
+    transform so they run once per batch, on the training device.
+    """
+
+    def __init__(self, csv_path: Path, usage: str = 'Training', store_dir: Path | None = None) -> None:
+        store_dir = convert_fer2013(csv_path, store_dir)
+        images_path = store_dir / f'{usage}_images.npy'
+        if images_path.exists():
+            self.images = np.load(images_path, mmap_mode='r')
+            self.labels = np.load(store_dir / f'{usage}_labels.npy')
+        else:
+            self.images = np.zeros((0, IMAGE_SIDE, IMAGE_SIDE), dtype=np.uint8)
+            self.labels = np.zeros(0, dtype=np.int64)
 
     def __len__(self) -> int:
-        return len(self.pixels)
-
-    def __getitem__(self, index: int) -> Tuple[torch.Tensor, torch.Tensor]:
-        pixel_array = np.fromstring(self.pixels[index], dtype=np.float32, sep=' ')
-        image = pixel_array.reshape(48, 48) / 255.0
-        image = np.stack([image, image, image], axis=0)  # convert to 3 channels
-        image = torch.from_numpy(image)
-        label = torch.tensor(self.labels[index], dtype=torch.long)
-        return image, label
+        return len(self.labels)
+
+    def __getitem__(self, index: Union[int, Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor]:
+        if isinstance(index, (int, np.integer)):
+            image = torch.from_numpy(np.array(self.images[index]))
+            return image.unsqueeze(0), torch.tensor(self.labels[index], dtype=torch.long)
+
+        indices = np.asarray(index)
+        if len(indices) and np.array_equal(indices, np.arange(indices[0], indices[0] + len(indices))):
+            batch = slice(int(indices[0]), int(indices[0]) + len(indices))
+        else:
+            # Sorted reads touch the memmap front to back; batch order does not matter for SGD.
+            batch = np.sort(indices)
+        images = torch.from_numpy(np.array(self.images[batch]))
+        return images.unsqueeze(1), torch.from_numpy(self.labels[batch])
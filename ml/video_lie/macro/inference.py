@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List
 
+import cv2
+import numpy as np
 import torch
 from PIL import Image
 from torchvision import transforms
 
 from ..config import config
+from ml.common.emotions import EMOTION_TO_INDEX
 from ml.common.vector_ops import expand_emotion_vector
 from .dataset import EMOTION_LABELS
 from .model import create_macro_model, emotion_vector
 
+NORMALIZE_MEAN = 0.5
+NORMALIZE_STD = 0.5
+
+FRAME_TRANSFORM = transforms.Compose([
+    transforms.Resize((config.image_size, config.image_size)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[NORMALIZE_MEAN] * 3, std=[NORMALIZE_STD] * 3)
+])
+
+# Column of the canonical 8-emotion vector for each of the model's 7 FER outputs.
+CANONICAL_COLUMNS = torch.tensor([EMOTION_TO_INDEX[EMOTION_LABELS[idx]] for idx in range(len(EMOTION_LABELS))])
+
 
 def load_macro_model(weights_path: Path | None = None) -> torch.nn.Module:
     model = create_macro_model()
@@ -25,13 +40,8 @@ def load_macro_model(weights_path: Path | None = None) -> torch.nn.Module:
 
 def analyze_frame(image_path: Path, model: torch.nn.Module | None = None) -> Dict[str, object]:
     model = model or load_macro_model()
-    transform = transforms.Compose([
-        transforms.Resize((config.image_size, config.image_size)),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
-    ])
     image = Image.open(image_path).convert('RGB')
-    tensor = transform(image).unsqueeze(0)
+    tensor = FRAME_TRANSFORM(image).unsqueeze(0)
     probabilities = emotion_vector(model, tensor).squeeze(0)
     labels = [EMOTION_LABELS[idx] for idx in range(len(probabilities))]
     canonical_vector = expand_emotion_vector(labels, probabilities.tolist())
@@ -39,3 +49,57 @@ def analyze_frame(image_path: Path, model: torch.nn.Module | None = None) -> Dic
         'emotion_vector': canonical_vector,
         'max_emotion_index': int(torch.argmax(probabilities).item())
     }
+
+
+def preprocess_frames(frames: List[np.ndarray], image_size: int = config.image_size) -> torch.Tensor:
+    """Convert BGR uint8 frames (H, W, 3) into one normalized RGB batch (N, 3, S, S)."""
+    resized = [
+        frame if frame.shape[:2] == (image_size, image_size) else cv2.resize(frame, (image_size, image_size))
+        for frame in frames
+    ]
+    batch = torch.from_numpy(np.stack(resized)[..., ::-1].copy())
+    batch = batch.permute(0, 3, 1, 2).float().div_(255.0)
+    return batch.sub_(NORMALIZE_MEAN).div_(NORMALIZE_STD)
+
+
+class MacroInferenceEngine:
+    """Runs the macro ResNet over a stream of in-memory frames in fixed-size batches."""
+
+    def __init__(
+        self,
+        model: torch.nn.Module | None = None,
+        batch_size: int = config.inference_batch_size,
+        image_size: int = config.image_size
+    ) -> None:
+        self.model = model or load_macro_model()
+        self.model.eval()
+        self.batch_size = max(batch_size, 1)
+        self.image_size = image_size
+
+    def _run_batch(self, frames: List[np.ndarray]) -> torch.Tensor:
+        with torch.inference_mode():
+            logits = self.model(preprocess_frames(frames, self.image_size))
+            return torch.softmax(logits, dim=1)
+
+    def predict(self, frames: Iterable[np.ndarray]) -> Dict[str, object]:
+        batches: List[torch.Tensor] = []
+        pending: List[np.ndarray] = []
+        for frame in frames:
+            pending.append(frame)
+            if len(pending) == self.batch_size:
+                batches.append(self._run_batch(pending))
+                pending = []
+        if pending:
+            batches.append(self._run_batch(pending))
+
+        if not batches:
+            return {'frame_vectors': [], 'emotion_vector': [0.0] * len(EMOTION_TO_INDEX), 'max_emotion_indices': []}
+
+        probabilities = torch.cat(batches)
+        canonical = torch.zeros(probabilities.shape[0], len(EMOTION_TO_INDEX))
+        canonical[:, CANONICAL_COLUMNS] = probabilities
+        return {
+            'frame_vectors': canonical.tolist(),
+            'emotion_vector': canonical.mean(dim=0).tolist(),
+            'max_emotion_indices': probabilities.argmax(dim=1).tolist()
+        }
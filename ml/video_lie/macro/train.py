@@ -6,7 +6,7 @@ from typing import Dict
 
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader
+from torch.utils.data import BatchSampler, DataLoader, RandomSampler, SequentialSampler
 from torchvision import transforms
 from tqdm import tqdm
 
@@ -17,17 +17,13 @@ from .model import create_macro_model
 
 def train(csv_path: Path) -> Dict[str, float]:
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    transform = transforms.Compose([
-        transforms.Resize((config.image_size, config.image_size)),
-        transforms.RandomHorizontalFlip(),
-        transforms.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
-    ])
+    transform = build_batch_transform()
 
     train_dataset = Fer2013Dataset(csv_path, usage='Training')
     val_dataset = Fer2013Dataset(csv_path, usage='PublicTest')
 
-    train_loader = DataLoader(train_dataset, batch_size=config.batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=config.batch_size)
+    train_loader = batch_loader(train_dataset, shuffle=True)
+    val_loader = batch_loader(val_dataset)
 
     model = create_macro_model().to(device)
     optimizer = torch.optim.Adam(model.parameters(), lr=config.learning_rate)
@@ -42,7 +38,7 @@ def train(csv_path: Path) -> Dict[str, float]:
         correct = 0
         total = 0
         for inputs, labels in tqdm(train_loader, desc=f"Macro epoch {epoch}", leave=False):
-            inputs = transform(inputs).to(device)
+            inputs = to_model_input(inputs, transform, device)
             labels = labels.to(device)
 
             optimizer.zero_grad()
@@ -77,6 +73,27 @@ def train(csv_path: Path) -> Dict[str, float]:
     return metrics
 
 
+def build_batch_transform() -> transforms.Compose:
+    # Runs on single-channel batches; the grey channel is expanded to RGB afterwards.
+    return transforms.Compose([
+        transforms.Resize((config.image_size, config.image_size)),
+        transforms.RandomHorizontalFlip(),
+        transforms.Normalize(mean=[0.5], std=[0.5])
+    ])
+
+
+def batch_loader(dataset: Fer2013Dataset, shuffle: bool = False, batch_size: int | None = None) -> DataLoader:
+    """Loader that hands whole index batches to the dataset instead of collating single items."""
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size or config.batch_size, drop_last=False), batch_size=None)
+
+
+def to_model_input(images: torch.Tensor, transform, device) -> torch.Tensor:
+    """uint8 (B, 1, 48, 48) batch -> normalised (B, 3, S, S) float batch on ``device``."""
+    inputs = transform(images.to(device).float().div_(255))
+    return inputs.expand(-1, 3, -1, -1)
+
+
 def evaluate(model: nn.Module, loader: DataLoader, criterion: nn.Module, transform, device) -> tuple[float, float]:
     model.eval()
     total_loss = 0.0
@@ -84,7 +101,7 @@ def evaluate(model: nn.Module, loader: DataLoader, criterion: nn.Module, transfo
     total = 0
     with torch.no_grad():
         for inputs, labels in loader:
-            inputs = transform(inputs).to(device)
+            inputs = to_model_input(inputs, transform, device)
             labels = labels.to(device)
             outputs = model(inputs)
             loss = criterion(outputs, labels)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Tuple
@@ -9,7 +10,7 @@ import numpy as np
 import torch
 from torch.utils.data import Dataset
 
-from .features import MicroFeatures, extract_micro_features
+from .features import extract_micro_features
 
 
 @dataclass
@@ -28,6 +29,18 @@ def load_manifest(manifest_path: Path) -> List[MicroSample]:
     return samples
 
 
+def feature_cache_path(cache_dir: Path, video_path: Path) -> Path:
+    return cache_dir / f"{video_path.stem}.npy"
+
+
+def save_feature_cache(cache_file: Path, vector: np.ndarray) -> None:
+    # Write then rename so a crashed or concurrent writer never leaves a truncated cache entry.
+    tmp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'wb') as handle:
+        np.save(handle, vector)
+    os.replace(tmp_file, cache_file)
+
+
 class MicroExpressionDataset(Dataset):
     def __init__(self, manifest_path: Path, cache_dir: Path | None = None) -> None:
         self.samples = load_manifest(manifest_path)
@@ -47,14 +60,10 @@ class MicroExpressionDataset(Dataset):
 
     def _load_or_compute(self, path: Path) -> np.ndarray:
         if self.cache_dir:
-            cache_file = self.cache_dir / f"{path.stem}.npy"
+            cache_file = feature_cache_path(self.cache_dir, path)
             if cache_file.exists():
                 return np.load(cache_file)
-        micro = extract_micro_features(path)
-        combined = np.concatenate([
-            micro.landmark_deltas,
-            np.array([micro.eye_aspect_ratio_variance, micro.brow_lift_variance], dtype=np.float32)
-        ])
+        combined = extract_micro_features(path).to_vector()
         if self.cache_dir:
-            np.save(cache_file, combined)
+            save_feature_cache(cache_file, combined)
         return combined
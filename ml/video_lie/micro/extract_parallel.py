@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from tqdm import tqdm
+
+from ..config import config
+from .dataset import MicroSample, feature_cache_path, load_manifest, save_feature_cache
+from .features import extract_micro_features, get_face_mesh
+
+
+def _init_worker() -> None:
+    # Build this process's FaceMesh up front so the first task does not pay for it.
+    get_face_mesh()
+
+
+def _extract_one(video_path: str, cache_file: str) -> float:
+    started = time.perf_counter()
+    features = extract_micro_features(Path(video_path))
+    save_feature_cache(Path(cache_file), features.to_vector())
+    return time.perf_counter() - started
+
+
+def extract_features_parallel(samples: Iterable[MicroSample], cache_dir: Path, workers: int | None = None) -> Dict[str, object]:
+    """Fill ``cache_dir`` with one ``.npy`` feature vector per sample using worker processes.
+
+    Samples whose cache file already exists are skipped, so an interrupted run resumes where
+    it stopped. Each worker owns its own FaceMesh instance.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    samples = list(samples)
+    pending: List[MicroSample] = [sample for sample in samples if not feature_cache_path(cache_dir, sample.video_path).exists()]
+    workers = max(workers or config.micro_workers, 1)
+
+    failed: Dict[str, str] = {}
+    video_seconds = 0.0
+    started = time.perf_counter()
+    if pending:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(_extract_one, str(sample.video_path), str(feature_cache_path(cache_dir, sample.video_path))): sample
+                for sample in pending
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc='Micro features', unit='video'):
+                try:
+                    video_seconds += future.result()
+                except Exception as exc:
+                    failed[str(futures[future].video_path)] = str(exc)
+    elapsed = time.perf_counter() - started
+
+    computed = len(pending) - len(failed)
+    return {
+        'samples': len(samples),
+        'cached': len(samples) - len(pending),
+        'computed': computed,
+        'failed': failed,
+        'workers': workers,
+        'elapsed_s': round(elapsed, 2),
+        'videos_per_s': round(computed / elapsed, 3) if elapsed and computed else 0.0,
+        'mean_video_s': round(video_seconds / computed, 3) if computed else 0.0
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract MicroLie features for a manifest in parallel')
+    parser.add_argument('--manifest', type=Path, default=Path('data/raw/micro/manifest.json'))
+    parser.add_argument('--cache-dir', type=Path, default=config.processed_dir / 'micro_cache')
+    parser.add_argument('--workers', type=int, default=config.micro_workers)
+
+    args = parser.parse_args()
+    stats = extract_features_parallel(load_manifest(args.manifest), args.cache_dir, args.workers)
+    print(json.dumps(stats, indent=2))
+    raise SystemExit(1 if stats['failed'] else 0)
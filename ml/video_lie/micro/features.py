@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
 import cv2
 import mediapipe as mp
 import numpy as np
 
+from ..frame_extractor import iter_sampled_frames, sampling_key
+from .landmark_store import LandmarkStore, LandmarkTrack, landmark_store
 
-mp_face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
+DEFAULT_FRAME_STEP = 2
+# refine_landmarks=True adds 10 iris points to the 468-point mesh.
+FACE_MESH_LANDMARKS = 478
+BLOCK_FRAMES = 256
+
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+BROW = [70, 63, 105, 66, 107]
+EYE_CORNERS = [33, 133, 362, 263]
+
+_local = threading.local()
+
+
+def get_face_mesh():
+    """FaceMesh instance owned by the calling thread; MediaPipe graphs are not thread-safe."""
+    face_mesh = getattr(_local, 'face_mesh', None)
+    if face_mesh is None:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
+        _local.face_mesh = face_mesh
+    return face_mesh
 
 
 @dataclass
@@ -18,79 +40,180 @@ class MicroFeatures:
     eye_aspect_ratio_variance: float
     brow_lift_variance: float
 
-
-def extract_micro_features(video_path: Path, frame_step: int = 2) -> MicroFeatures:
+    def to_vector(self) -> np.ndarray:
+        return np.concatenate([
+            self.landmark_deltas,
+            np.array([self.eye_aspect_ratio_variance, self.brow_lift_variance], dtype=np.float32)
+        ])
+
+
+def extract_micro_features(video_path: Path, frame_step: int = DEFAULT_FRAME_STEP, sampling: str | None = None) -> MicroFeatures:
+    if landmark_store.enabled:
+        return features_from_track(load_landmark_track(video_path, frame_step, sampling))
+    capture = _open_capture(video_path)
+    try:
+        return micro_features_from_frames(frame for _, frame in iter_sampled_frames(capture, frame_step, sampling))
+    finally:
+        capture.release()
+
+
+def load_landmark_track(
+    video_path: Path,
+    frame_step: int = DEFAULT_FRAME_STEP,
+    sampling: str | None = None,
+    store: LandmarkStore | None = None
+) -> LandmarkTrack:
+    """Landmarks for every ``frame_step``-th frame, from the store or by running FaceMesh once and storing them."""
+    def compute() -> Iterator[Optional[np.ndarray]]:
+        capture = _open_capture(video_path)
+        try:
+            yield from iter_face_landmarks(frame for _, frame in iter_sampled_frames(capture, frame_step, sampling))
+        finally:
+            capture.release()
+
+    return (store or landmark_store).get_or_compute(video_path, frame_step, compute, sampling_key(frame_step, sampling))
+
+
+def _open_capture(video_path: Path) -> cv2.VideoCapture:
     capture = cv2.VideoCapture(str(video_path))
     if not capture.isOpened():
         raise RuntimeError(f"Failed to open video: {video_path}")
+    return capture
 
-    previous_landmarks: np.ndarray | None = None
-    deltas: List[np.ndarray] = []
-    ear_values: List[float] = []
-    brow_values: List[float] = []
-    frame_index = 0
-
-    while True:
-        success, frame = capture.read()
-        if not success:
-            break
-        if frame_index % frame_step != 0:
-            frame_index += 1
-            continue
 
+def iter_face_landmarks(frames: Iterable[np.ndarray]) -> Iterator[Optional[np.ndarray]]:
+    """Yield an (N, 3) landmark array per BGR frame, or ``None`` where no face is found."""
+    face_mesh = get_face_mesh()
+    for frame in frames:
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = mp_face_mesh.process(rgb)
-        if not result.multi_face_landmarks:
-            frame_index += 1
-            continue
-        landmarks = np.array([(lm.x, lm.y, lm.z) for lm in result.multi_face_landmarks[0].landmark])
-
-        if previous_landmarks is not None:
-            deltas.append(landmarks - previous_landmarks)
-            ear_values.append(_eye_aspect_ratio(landmarks))
-            brow_values.append(_brow_distance(landmarks))
-
-        previous_landmarks = landmarks
-        frame_index += 1
-
-    capture.release()
-
-    if not deltas:
-        deltas.append(np.zeros((468, 3)))
-    landmark_deltas = np.mean(np.abs(np.stack(deltas)), axis=0).flatten()
-    ear_variance = float(np.var(ear_values)) if ear_values else 0.0
-    brow_variance = float(np.var(brow_values)) if brow_values else 0.0
-
-    return MicroFeatures(
-        landmark_deltas=landmark_deltas.astype(np.float32),
-        eye_aspect_ratio_variance=ear_variance,
-        brow_lift_variance=brow_variance
-    )
-
-
-def _eye_aspect_ratio(landmarks: np.ndarray) -> float:
-    left_indices = [33, 160, 158, 133, 153, 144]
-    right_indices = [362, 385, 387, 263, 373, 380]
-    return _aspect_ratio(landmarks, left_indices) + _aspect_ratio(landmarks, right_indices)
-
-
-def _brow_distance(landmarks: np.ndarray) -> float:
-    brow_indices = [70, 63, 105, 66, 107]
-    eye_indices = [33, 133, 362, 263]
-    brow_avg = np.mean(landmarks[brow_indices], axis=0)
-    eye_avg = np.mean(landmarks[eye_indices], axis=0)
-    return float(np.linalg.norm(brow_avg - eye_avg))
-
-
-def _aspect_ratio(landmarks: np.ndarray, indices: List[int]) -> float:
-    p2 = landmarks[indices[1]]
-    p6 = landmarks[indices[5]]
-    p3 = landmarks[indices[2]]
-    p5 = landmarks[indices[4]]
-    p1 = landmarks[indices[0]]
-    p4 = landmarks[indices[3]]
-    vertical = np.linalg.norm(p2 - p6) + np.linalg.norm(p3 - p5)
-    horizontal = np.linalg.norm(p1 - p4)
-    if horizontal == 0:
-        return 0.0
-    return vertical / (2.0 * horizontal)
+        result = face_mesh.process(rgb)
+        yield landmarks_to_array(result.multi_face_landmarks[0].landmark) if result.multi_face_landmarks else None
+
+
+def micro_features_from_frames(frames: Iterable[np.ndarray]) -> MicroFeatures:
+    """Compute MicroFeatures from already-sampled BGR frames."""
+    accumulator = MicroFeatureAccumulator()
+    for landmarks in iter_face_landmarks(frames):
+        if landmarks is not None:
+            accumulator.add(landmarks)
+    return accumulator.finalize()
+
+
+def features_from_track(track: LandmarkTrack) -> MicroFeatures:
+    """Compute MicroFeatures from stored landmarks without running FaceMesh."""
+    accumulator = MicroFeatureAccumulator()
+    for block in track.detected_blocks(accumulator.block_frames):
+        accumulator.add_block(block)
+    return accumulator.finalize()
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """Flatten a MediaPipe landmark list into an (N, 3) array without per-point tuples."""
+    count = len(landmarks)
+    coords = np.fromiter((value for lm in landmarks for value in (lm.x, lm.y, lm.z)), dtype=np.float64, count=count * 3)
+    return coords.reshape(count, 3)
+
+
+def eye_aspect_ratios(landmarks: np.ndarray) -> np.ndarray:
+    """Summed left + right eye aspect ratio for each frame of a (T, N, 3) block."""
+    return _aspect_ratios(landmarks[:, LEFT_EYE]) + _aspect_ratios(landmarks[:, RIGHT_EYE])
+
+
+def brow_distances(landmarks: np.ndarray) -> np.ndarray:
+    """Distance between the mean brow and mean eye-corner point for each frame of a (T, N, 3) block."""
+    brow_avg = landmarks[:, BROW].mean(axis=1)
+    eye_avg = landmarks[:, EYE_CORNERS].mean(axis=1)
+    return np.linalg.norm(brow_avg - eye_avg, axis=-1)
+
+
+def _aspect_ratios(eye: np.ndarray) -> np.ndarray:
+    # eye is (T, 6, 3) ordered p1..p6 around the eye contour.
+    vertical = np.linalg.norm(eye[:, 1] - eye[:, 5], axis=-1) + np.linalg.norm(eye[:, 2] - eye[:, 4], axis=-1)
+    horizontal = np.linalg.norm(eye[:, 0] - eye[:, 3], axis=-1)
+    return np.divide(vertical, 2.0 * horizontal, out=np.zeros_like(vertical), where=horizontal != 0)
+
+
+class RunningMoments:
+    """Streaming mean/variance merged one block at a time (Welford/Chan)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        block_count = values.size
+        block_mean = float(values.mean())
+        block_m2 = float(np.square(values - block_mean).sum())
+        total = self.count + block_count
+        delta = block_mean - self.mean
+        self.mean += delta * block_count / total
+        self.m2 += block_m2 + delta * delta * self.count * block_count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+
+class MicroFeatureAccumulator:
+    """Builds MicroFeatures from a stream of per-frame landmarks in fixed-size blocks.
+
+    Deltas, EAR and brow distances are computed for a whole block at once, and only running
+    sums and moments are kept, so memory does not grow with clip length.
+    """
+
+    def __init__(self, block_frames: int = BLOCK_FRAMES) -> None:
+        self.block_frames = max(block_frames, 1)
+        self._pending: List[np.ndarray] = []
+        self._previous: np.ndarray | None = None
+        self._abs_delta_sum: np.ndarray | None = None
+        self._delta_count = 0
+        self._ear = RunningMoments()
+        self._brow = RunningMoments()
+
+    def add(self, landmarks: np.ndarray) -> None:
+        self._pending.append(landmarks)
+        if len(self._pending) >= self.block_frames:
+            self._flush()
+
+    def add_block(self, landmarks: np.ndarray) -> None:
+        """Add a (T, N, 3) block of consecutive detected frames."""
+        self._flush()
+        for start in range(0, len(landmarks), self.block_frames):
+            self._process(np.asarray(landmarks[start:start + self.block_frames], dtype=np.float64))
+
+    def _flush(self) -> None:
+        if self._pending:
+            block = np.stack(self._pending)
+            self._pending = []
+            self._process(block)
+
+    def _process(self, block: np.ndarray) -> None:
+        if len(block) == 0:
+            return
+        # Only frames with a detected predecessor contribute, matching the per-frame definition.
+        stacked = block if self._previous is None else np.concatenate([self._previous[None], block])
+        if len(stacked) > 1:
+            block_sum = np.abs(np.diff(stacked, axis=0)).sum(axis=0)
+            self._abs_delta_sum = block_sum if self._abs_delta_sum is None else self._abs_delta_sum + block_sum
+            self._delta_count += len(stacked) - 1
+            followers = stacked[1:]
+            self._ear.update(eye_aspect_ratios(followers))
+            self._brow.update(brow_distances(followers))
+        self._previous = block[-1]
+
+    def finalize(self) -> MicroFeatures:
+        self._flush()
+        if self._abs_delta_sum is None:
+            landmark_count = len(self._previous) if self._previous is not None else FACE_MESH_LANDMARKS
+            landmark_deltas = np.zeros(landmark_count * 3)
+        else:
+            landmark_deltas = (self._abs_delta_sum / self._delta_count).flatten()
+        return MicroFeatures(
+            landmark_deltas=landmark_deltas.astype(np.float32),
+            eye_aspect_ratio_variance=self._ear.variance,
+            brow_lift_variance=self._brow.variance
+        )
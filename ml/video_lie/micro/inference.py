@@ -6,7 +6,7 @@ from typing import Dict
 import numpy as np
 
 from ..config import config
-from .features import extract_micro_features
+from .features import MicroFeatures, extract_micro_features
 
 
 def load_micro_model(model_path: Path | None = None) -> Dict[str, np.ndarray]:
@@ -23,12 +23,11 @@ def load_micro_model(model_path: Path | None = None) -> Dict[str, np.ndarray]:
 
 
 def predict_lie_score(video_path: Path, model_assets: Dict[str, np.ndarray]) -> float:
-    features = extract_micro_features(video_path)
-    vector = np.concatenate([
-        features.landmark_deltas,
-        np.array([features.eye_aspect_ratio_variance, features.brow_lift_variance], dtype=np.float32)
-    ])
-    vector = (vector - model_assets['scaler_mean']) / model_assets['scaler_scale']
+    return score_micro_features(extract_micro_features(video_path), model_assets)
+
+
+def score_micro_features(features: MicroFeatures, model_assets: Dict[str, np.ndarray]) -> float:
+    vector = (features.to_vector() - model_assets['scaler_mean']) / model_assets['scaler_scale']
     logits = vector.dot(model_assets['coef'].T) + model_assets['intercept']
     prob = 1 / (1 + np.exp(-logits))
     return float(prob.squeeze())
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import config
+
+LANDMARK_DTYPE = np.float32
+_HASH_CHUNK = 1 << 20
+# Full scans of the store happen at most every this many saves (or once the running total
+# crosses the budget), and eviction goes down to LOW_WATER of the budget so a store sitting at
+# its limit is not rescanned on every save.
+_SCAN_EVERY = 64
+_LOW_WATER = 0.9
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def video_digest(video_path: Path) -> str:
+    """sha256 of the video contents, memoised per (path, size, mtime) for the life of the process."""
+    stat = video_path.stat()
+    key = (str(video_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(video_path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with _digest_lock:
+            _digests[key] = digest
+    return digest
+
+
+@dataclass
+class LandmarkTrack:
+    """FaceMesh landmarks for every ``frame_step``-th frame of a video.
+
+    ``landmarks`` is a memory-mapped (frames, N, 3) array; ``mask`` marks the frames where a
+    face was detected (other rows are zero).
+    """
+
+    landmarks: np.ndarray
+    mask: np.ndarray
+    frame_step: int
+
+    def __len__(self) -> int:
+        return len(self.mask)
+
+    def subsample(self, frame_step: int) -> LandmarkTrack:
+        if frame_step % self.frame_step:
+            raise ValueError(f"Stride {frame_step} is not a multiple of the stored stride {self.frame_step}")
+        ratio = frame_step // self.frame_step
+        return LandmarkTrack(self.landmarks[::ratio], self.mask[::ratio], frame_step)
+
+    def detected_blocks(self, block_frames: int) -> Iterator[np.ndarray]:
+        """Yield the detected landmarks in order, at most ``block_frames`` source rows at a time."""
+        for start in range(0, len(self.mask), block_frames):
+            mask = self.mask[start:start + block_frames]
+            if mask.any():
+                yield np.asarray(self.landmarks[start:start + block_frames][mask])
+
+
+class LandmarkStore:
+    """Content-addressed landmark tracks under ``root/<sha256>/<sampling>-step<k>/``, evicted LRU to ``max_bytes``.
+
+    ``sampling`` names the frame set a track was computed from (see
+    ``frame_extractor.sampling_key``); tracks are only shared within the same set. There, a
+    track sampled every ``k`` frames also serves any stride that is a multiple of ``k``, so
+    changing ``frame_step`` does not require running FaceMesh again. ``max_bytes <= 0``
+    disables the store.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+        self._saves_since_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def entry_dir(self, digest: str, frame_step: int, sampling: str = 'sequential') -> Path:
+        return self.root / digest / f'{sampling}-step{frame_step}'
+
+    def load(self, digest: str, frame_step: int, sampling: str = 'sequential') -> Optional[LandmarkTrack]:
+        candidates: List[Tuple[int, Path]] = []
+        video_dir = self.root / digest
+        if video_dir.is_dir():
+            for entry in video_dir.iterdir():
+                meta = _read_meta(entry)
+                if meta and meta.get('sampling') == sampling and frame_step % meta['frame_step'] == 0:
+                    candidates.append((meta['frame_step'], entry))
+        # The coarsest usable stride has the fewest rows to read.
+        for stored_step, entry in sorted(candidates, reverse=True):
+            try:
+                track = self._open(entry, stored_step)
+                os.utime(entry / 'meta.json')
+            except (OSError, ValueError):
+                # Evicted by another process between listing and opening.
+                continue
+            with self._lock:
+                self.hits += 1
+            return track.subsample(frame_step)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def save(
+        self,
+        digest: str,
+        frame_step: int,
+        landmarks: Iterable[Optional[np.ndarray]],
+        sampling: str = 'sequential'
+    ) -> LandmarkTrack:
+        """Store one (N, 3) array per sampled frame, ``None`` where no face was found.
+
+        Rows are streamed to disk as they arrive, so memory does not grow with clip length.
+        """
+        entry = self.entry_dir(digest, frame_step, sampling)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = entry.parent / f'.{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+        staging.mkdir()
+        try:
+            mask: List[bool] = []
+            row_shape: Tuple[int, ...] | None = None
+            raw_path = staging / 'landmarks.raw'
+            with open(raw_path, 'wb') as raw:
+                for points in landmarks:
+                    if points is not None and row_shape is None:
+                        # Row width is only known at the first detection; back-fill earlier misses.
+                        row_shape = points.shape
+                        raw.write(bytes(int(np.prod(row_shape)) * LANDMARK_DTYPE().itemsize * len(mask)))
+                    if row_shape is not None:
+                        row = np.zeros(row_shape, dtype=LANDMARK_DTYPE) if points is None else np.asarray(points, dtype=LANDMARK_DTYPE)
+                        raw.write(row.tobytes())
+                    mask.append(points is not None)
+            if row_shape is None:
+                rows = np.zeros((len(mask), 0, 3), dtype=LANDMARK_DTYPE)
+            else:
+                rows = np.memmap(raw_path, dtype=LANDMARK_DTYPE, mode='r', shape=(len(mask),) + row_shape)
+            np.save(staging / 'landmarks.npy', rows)
+            del rows
+            raw_path.unlink()
+            np.save(staging / 'mask.npy', np.array(mask, dtype=bool))
+            (staging / 'meta.json').write_text(json.dumps({
+                'frame_step': frame_step,
+                'sampling': sampling,
+                'frames': len(mask),
+                'detected': int(sum(mask))
+            }), encoding='utf-8')
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # A concurrent writer stored the same track first; keep theirs.
+                if not (entry / 'meta.json').exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._account(entry)
+        return self._open(entry, frame_step)
+
+    def get_or_compute(
+        self,
+        video_path: Path,
+        frame_step: int,
+        compute: Callable[[], Iterable[Optional[np.ndarray]]],
+        sampling: str = 'sequential'
+    ) -> LandmarkTrack:
+        digest = video_digest(video_path)
+        track = self.load(digest, frame_step, sampling)
+        if track is None:
+            track = self.save(digest, frame_step, compute(), sampling)
+        return track
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def _open(self, entry: Path, frame_step: int) -> LandmarkTrack:
+        return LandmarkTrack(
+            landmarks=np.load(entry / 'landmarks.npy', mmap_mode='r'),
+            mask=np.load(entry / 'mask.npy'),
+            frame_step=frame_step
+        )
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        if not self.root.is_dir():
+            return entries
+        for video_dir in self.root.iterdir():
+            if not video_dir.is_dir():
+                continue
+            for entry in video_dir.glob('*step*'):
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    used = (entry / 'meta.json').stat().st_mtime
+                    size = sum(path.stat().st_size for path in entry.iterdir())
+                except OSError:
+                    continue
+                entries.append((used, size, entry))
+        return entries
+
+    def _account(self, entry: Path) -> None:
+        # Keep a running byte total instead of walking the store on every save; other processes'
+        # writes are picked up by the periodic rescan.
+        try:
+            size = sum(path.stat().st_size for path in entry.iterdir())
+        except OSError:
+            size = 0
+        with self._lock:
+            self._saves_since_scan += 1
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            due = (
+                self._approx_bytes is None
+                or self._approx_bytes > self.max_bytes
+                or self._saves_since_scan >= _SCAN_EVERY
+            )
+        if due:
+            self._enforce_budget(keep=entry)
+
+    def _enforce_budget(self, keep: Path) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes if total <= self.max_bytes else int(self.max_bytes * _LOW_WATER)
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+            try:
+                entry.parent.rmdir()
+            except OSError:
+                pass
+        with self._lock:
+            self._approx_bytes = total
+            self._saves_since_scan = 0
+
+
+def _read_meta(entry: Path) -> Optional[dict]:
+    try:
+        return json.loads((entry / 'meta.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+landmark_store = LandmarkStore(
+    config.landmark_cache_dir or (config.processed_dir / 'landmarks'),
+    config.landmark_cache_mb * 1024 * 1024
+)
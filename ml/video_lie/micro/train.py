@@ -12,10 +12,15 @@ from sklearn.preprocessing import StandardScaler
 
 from ..config import config
 from .dataset import MicroExpressionDataset
+from .extract_parallel import extract_features_parallel
 
 
-def train(manifest_path: Path, cache_dir: Path | None = None) -> Dict[str, float]:
+def train(manifest_path: Path, cache_dir: Path | None = None, workers: int | None = None) -> Dict[str, float]:
     dataset = MicroExpressionDataset(manifest_path, cache_dir)
+    if cache_dir:
+        # Fill the cache across processes first; _stack_dataset then only loads .npy files.
+        extraction = extract_features_parallel(dataset.samples, cache_dir, workers)
+        print(json.dumps(extraction, indent=2))
     features, labels = _stack_dataset(dataset)
 
     x_train, x_test, y_train, y_test = train_test_split(features, labels, test_size=0.2, random_state=42)